@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Time the codemod fast path and check its output against the reference integration.
+
+The Flask recipe is applied to a fresh copy of auto_auth0_tests/python-web-app
+and the patched project's pre-scan index is compared with the one of
+auto_auth0_tests/auth0-python-web-app, the hand-written Auth0 integration of
+the same app. Needs no API keys.
+
+Usage:
+    python benchmarks/codemod_benchmark.py [--repeat 20]
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from autoauth0.codemod import apply_recipe  # noqa: E402
+from autoauth0.heuristics import scan_paths  # noqa: E402
+from autoauth0.prescan import scan_project  # noqa: E402
+
+TEST_APP = ROOT / "auto_auth0_tests" / "python-web-app"
+REFERENCE_APP = ROOT / "auto_auth0_tests" / "auth0-python-web-app"
+
+
+def features(project_path: Path) -> dict:
+    index = scan_project(str(project_path))
+    entrypoint = next(info for info in index.entrypoints if info.app_objects)
+    return {
+        "routes": sorted(route.path for route in entrypoint.routes),
+        "uses_oauth": entrypoint.uses_oauth,
+        "uses_dotenv": entrypoint.uses_dotenv,
+        "uses_session": entrypoint.uses_session,
+        "sets_secret_key": entrypoint.sets_secret_key,
+        "env_vars": sorted(entrypoint.env_vars),
+        "dependencies": sorted(dep for dep in index.dependencies if dep.lower() in ("authlib", "python-dotenv")),
+    }
+
+
+def bench(repeat: int):
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(repeat):
+            project_path = Path(tmp) / f"{TEST_APP.name}-{run}"
+            shutil.copytree(TEST_APP, project_path)
+            start = time.perf_counter()
+            result = apply_recipe(str(project_path), scan_project(str(project_path)))
+            timings.append(time.perf_counter() - start)
+            if result is None:
+                sys.exit(f"no recipe matched {TEST_APP}")
+        patched = features(project_path)
+        rerun = apply_recipe(str(project_path), scan_project(str(project_path)), write=False)
+        scan = scan_paths(str(project_path))
+    expected = features(REFERENCE_APP)
+
+    print(f"codemod: {statistics.median(timings) * 1000:.1f}ms median over {repeat} runs, "
+          f"{len(result.files)} files written")
+    mismatches = 0
+    for name, value in expected.items():
+        ok = patched[name] == value or (
+            isinstance(value, list) and set(value) <= set(patched[name])
+        )
+        mismatches += not ok
+        print(f"  {'ok' if ok else 'MISMATCH':<9}{name}: {patched[name]}" + ("" if ok else f" expected {value}"))
+    print(f"  {'ok' if rerun is None else 'MISMATCH':<9}second run is a no-op")
+    high = [finding for finding in scan.findings if finding.severity == "high"]
+    print(f"  {'ok' if not high else 'MISMATCH':<9}heuristic scan: {len(scan.findings)} findings, {len(high)} high")
+    return mismatches + (rerun is not None) + len(high)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(1 if bench(args.repeat) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Time and memory of building the LLM crew for a batch of projects.
+
+Builds ``--projects`` ``CodebaseAnalysisCrew`` instances with all their agents
+and tasks, as a batch run does, twice: with the process-wide registry shared
+across the crews, and with the registry cleared before each crew, which is
+what building everything per project costs. Reports the median construction
+time and the memory allocated per crew (tracemalloc), and how many of each
+shared instance were built. Makes no LLM call; the API key only has to be set.
+
+Usage:
+    python benchmarks/construction_benchmark.py [--projects 20]
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from autoauth0.analysis_crew import CodebaseAnalysisCrew  # noqa: E402
+from autoauth0.instrumentation import Tracer  # noqa: E402
+from autoauth0.overlay import Overlay  # noqa: E402
+from autoauth0.registry import REGISTRY  # noqa: E402
+
+TEST_APP = ROOT / "auto_auth0_tests" / "python-web-app"
+
+
+def build_crew() -> CodebaseAnalysisCrew:
+    analysis_crew = CodebaseAnalysisCrew(
+        str(TEST_APP),
+        tracer=Tracer(),
+        verbose=False,
+        overlay=Overlay(str(TEST_APP))
+    )
+    analysis_crew.crew()
+    analysis_crew.stage_crew([analysis_crew.task_for("analyze_codebase_task")])
+    analysis_crew.resolution_crew()
+    return analysis_crew
+
+
+def bench(projects: int, shared: bool) -> dict:
+    REGISTRY.clear()
+    # The first crew pays for the imports, time the batch after it
+    build_crew()
+    timings, allocated = [], []
+    crews = []
+    for _ in range(projects):
+        if not shared:
+            REGISTRY.clear()
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        crews.append(build_crew())
+        timings.append(time.perf_counter() - start)
+        allocated.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+    return {
+        "median": statistics.median(timings),
+        "memory": statistics.median(allocated),
+        "registry": REGISTRY.stats(),
+        "crew": crews[-1].instances.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=20)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-construction-benchmark")
+
+    print(f"{'registry':<10}{'per crew':>10}{'memory':>10}")
+    for shared in (False, True):
+        stats = bench(args.projects, shared)
+        print(f"{'shared' if shared else 'cleared':<10}{stats['median'] * 1000:>8.1f}ms{stats['memory'] / 2 ** 20:>8.2f}MB")
+        for kind, counts in sorted({**stats["registry"], **stats["crew"]}.items()):
+            print(f"  {kind:<22}{counts['builds']:>4} built{counts['hits']:>5} reused")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Compare LLM calls and latency of the hierarchical and dag execution modes.
+
+Each mode runs the LLM crew, not the codemod fast path, on a fresh copy of
+auto_auth0_tests/python-web-app with the response cache disabled. LLM calls
+and tokens are crewai's usage metrics. Needs OPENAI_API_KEY and SERPER_API_KEY.
+
+Usage:
+    python benchmarks/dag_benchmark.py [--modes hierarchical dag] [--repeat 1]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from autoauth0.checkpoint import CheckpointStore  # noqa: E402
+from autoauth0.crew import AutoAuth0Crew  # noqa: E402
+from autoauth0.planner import ThroughputStore  # noqa: E402
+
+TEST_APP = ROOT / "auto_auth0_tests" / "python-web-app"
+
+
+def bench_mode(mode: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        project_path = Path(tmp) / TEST_APP.name
+        shutil.copytree(TEST_APP, project_path)
+        # Checkpoints and throughput records stay in the temporary directory, not the working tree
+        crew = AutoAuth0Crew(
+            str(project_path),
+            mode=mode,
+            use_cache=False,
+            fast_path=False,
+            checkpoint_store=CheckpointStore(Path(tmp) / "runs"),
+            throughput_store=ThroughputStore(Path(tmp) / "runs" / "throughput.jsonl")
+        )
+        start = time.perf_counter()
+        crew.run()
+        wall_time = time.perf_counter() - start
+    # Per model, fan-out workers and schema repairs included
+    usage = crew.model_usage.values()
+    return {
+        "wall_time": wall_time,
+        "llm_calls": sum(stats["llm_requests"] for stats in usage),
+        "manager_llm_calls": crew.token_usage.get("manager_agent", {}).get("llm_requests", 0),
+        "tokens": sum(stats["prompt_tokens"] + stats["completion_tokens"] for stats in usage),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["hierarchical", "dag"], choices=AutoAuth0Crew.MODES)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'mode':<14}{'run':>4}{'wall':>9}{'llm calls':>11}{'manager':>9}{'tokens':>9}")
+    for mode in args.modes:
+        for run in range(1, args.repeat + 1):
+            stats = bench_mode(mode)
+            print(f"{mode:<14}{run:>4}{stats['wall_time']:>8.1f}s{stats['llm_calls']:>11}"
+                  f"{stats['manager_llm_calls']:>9}{stats['tokens']:>9}")
+
+
+if __name__ == "__main__":
+    main()
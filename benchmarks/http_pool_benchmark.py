@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Compare N sequential HTTP calls with pooled concurrent ones.
+
+A local stub server answers every request after a fixed delay, standing in for
+Serper or a documentation site. Three ways of making the same N calls are
+timed:
+
+- sequential: a new connection per call, as ``requests.request(...)`` does
+- pooled: one call after the other over the shared keep-alive pool
+- pooled concurrent: all calls at once over the pool, bounded by its size
+
+Usage:
+    python benchmarks/http_pool_benchmark.py [--calls 50] [--delay 0.05] [--max-connections 16]
+"""
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from autoauth0.http_pool import PooledHTTPClient  # noqa: E402
+
+
+def stub_server(delay: float, backlog: int) -> ThreadingHTTPServer:
+    body = b'{"organic": [{"title": "Auth0 Flask quickstart", "link": "https://auth0.com/docs", "snippet": "..."}]}'
+
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive needs HTTP/1.1 and a Content-Length
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        # The default listen backlog of 5 resets the connections a larger pool opens at once
+        request_queue_size = max(backlog, 5)
+
+    server = Server(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.05, help="server side latency per call, in seconds")
+    parser.add_argument("--max-connections", type=int, default=16)
+    args = parser.parse_args()
+
+    server = stub_server(args.delay, args.max_connections)
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    payloads = [{"q": f"auth0 flask query {n}"} for n in range(args.calls)]
+    client = PooledHTTPClient(max_connections=args.max_connections)
+
+    def sequential():
+        for payload in payloads:
+            httpx.post(url, json=payload).raise_for_status()
+
+    async def pooled_calls():
+        for payload in payloads:
+            (await client.request("POST", url, json=payload)).raise_for_status()
+
+    async def concurrent_calls():
+        responses = await client.gather(client.request("POST", url, json=payload) for payload in payloads)
+        for response in responses:
+            # gather returns a failed call's exception instead of raising it
+            if isinstance(response, BaseException):
+                raise response
+            response.raise_for_status()
+
+    # Open the pool's connections first so every pooled run measures reuse
+    client.run(concurrent_calls())
+    results = [
+        ("sequential", timed(sequential)),
+        ("pooled", timed(lambda: client.run(pooled_calls()))),
+        ("pooled concurrent", timed(lambda: client.run(concurrent_calls()))),
+    ]
+    client.close()
+    server.shutdown()
+
+    baseline = results[0][1]
+    print(f"{args.calls} calls, {args.delay * 1000:.0f}ms server latency, {args.max_connections} connections")
+    print(f"{'mode':<20}{'total':>9}{'per call':>10}{'speedup':>9}")
+    for name, total in results:
+        print(f"{name:<20}{total:>8.2f}s{total / args.calls * 1000:>8.1f}ms{baseline / total:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Check the import time of the CLI entry points with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter; the median cumulative import
+time over ``--repeat`` runs is compared with its threshold. The check fails
+(exit code 1) when a module is over its threshold or pulls in one of the heavy
+packages its path must not import, e.g. ``--help`` loading crewai.
+
+Usage:
+    python benchmarks/import_time_benchmark.py [--repeat 5] [--scale 1.0]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# module -> (threshold in ms, top level packages it must not import)
+CHECKS = {
+    "autoauth0.main": (150, ("crewai", "crewai_tools", "langchain", "langchain_core", "openai")),
+    "autoauth0.crew": (600, ("crewai", "crewai_tools", "langchain", "openai")),
+}
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time in microseconds of ``module`` and every module its import pulled in"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env={"PYTHONPATH": str(ROOT / "src"), "PATH": ""},
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr.splitlines()[-1]}")
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        entries.append((name.rstrip(), int(cumulative)))
+    # A module is listed after the imports it triggered, which are indented deeper
+    index = next(i for i, (name, _) in enumerate(entries) if name.strip() == module)
+    depth = len(entries[index][0]) - len(entries[index][0].lstrip())
+    times = {module: entries[index][1]}
+    for name, cumulative in reversed(entries[:index]):
+        if len(name) - len(name.lstrip()) <= depth:
+            break
+        times.setdefault(name.strip(), cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every threshold, e.g. on slow CI machines")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports listed per module")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'module':<20}{'median':>9}{'threshold':>11}  status")
+    for module, (threshold, forbidden) in CHECKS.items():
+        try:
+            runs = [import_times(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<20}{'-':>9}{'-':>11}  skipped, {e}")
+            continue
+        median = statistics.median(run[module] for run in runs) / 1000
+        limit = threshold * args.scale
+        heavy = sorted({name.split(".")[0] for name in runs[0]} & set(forbidden))
+        ok = median <= limit and not heavy
+        failures += not ok
+        status = "ok" if ok else "FAIL" + (f", imports {', '.join(heavy)}" if heavy else "")
+        print(f"{module:<20}{median:>7.0f}ms{limit:>9.0f}ms  {status}")
+        slowest = sorted(
+            ((name, time) for name, time in runs[0].items() if name != module),
+            key=lambda item: -item[1]
+        )
+        for name, time in slowest[:args.top]:
+            print(f"  {name:<30}{time / 1000:>7.0f}ms")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+"""Local OpenAI compatible chat completions server scripted per task.
+
+The server answers ``POST /v1/chat/completions`` like the OpenAI API, so a run
+pointed at it with ``OPENAI_API_BASE`` makes no network call and costs nothing.
+It recognizes the task of a conversation by the ``expected_output`` of
+config/tasks.yaml found in the prompt and follows a short script per task, in
+crewai's ReAct format: a few tool calls, then a final answer filling the task's
+JSON template. The integration task writes the files that the hand-written
+integration of auto_auth0_tests/auth0-python-web-app changed, mapped onto the
+project, through the ``File Writer Tool`` (a fan-out worker only those of its
+group). The crew's output therefore comes from another source than the codemod
+fast path, and checking it against the reference tests the crew's writes,
+staging and fan-out merge rather than the codemod again.
+
+Every call is recorded with its task and token counts (about 4 characters per
+token), which is what the regression suite reports per stage.
+
+Usage:
+    python benchmarks/mock_llm_server.py [--port 8089] [--latency 0.5]
+    OPENAI_API_BASE=http://127.0.0.1:8089/v1 OPENAI_API_KEY=mock autoauth0 --no-fast-path
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from codemod_benchmark import REFERENCE_APP  # noqa: E402
+
+TASKS_CONFIG = ROOT / "src" / "autoauth0" / "config" / "tasks.yaml"
+REQUIREMENTS_FILE = ROOT / "knowledge" / "auth0_integration.md"
+REFERENCE_LOGIN_APP = REFERENCE_APP / "01-Login"
+
+PLACEHOLDERS = {"string": "mock", "number": 0, "boolean": True}
+
+
+def _normalized(text: str) -> str:
+    return " ".join(text.split())
+
+
+def fill(template):
+    """A value matching the JSON template of an expected_output"""
+    if isinstance(template, dict):
+        return {key: fill(value) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill(template[0])] if template else []
+    return PLACEHOLDERS.get(template, template)
+
+
+@dataclass
+class Call:
+    task: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    start: float
+    duration: float
+
+
+class MockLLM:
+    """The scripted answers, and the record of the calls"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.templates = {
+            name: config["expected_output"]
+            for name, config in yaml.safe_load(TASKS_CONFIG.read_text()).items()
+            if config.get("expected_output")
+        }
+        self.calls: List[Call] = []
+        self._integrations: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def task_of(self, prompt: str) -> str:
+        normalized = _normalized(prompt)
+        for name, template in self.templates.items():
+            if _normalized(template) in normalized:
+                return name
+        return "unknown"
+
+    @staticmethod
+    def project_of(prompt: str) -> Optional[str]:
+        match = re.search(r"PROJECT PATH:\s*-+\s*(\S+)", prompt)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def file_group_of(prompt: str) -> Optional[List[str]]:
+        """Files of a fan-out worker's group, None for the whole integration"""
+        match = re.search(r"FILE GROUP:\s*-+\s*(.*?)\s*CODEBASE ANALYSIS OF THE GROUP:", prompt, re.DOTALL)
+        return [line.strip() for line in match.group(1).splitlines() if line.strip()] if match else None
+
+    def integration(self, project_path: str) -> Dict[str, str]:
+        """Content of the reference's 01-Login files that differ from the project's, by project relative path
+
+        Computed once per project: its files match the reference after they are staged or written.
+        """
+        with self._lock:
+            if project_path not in self._integrations:
+                root = Path(project_path)
+                prefix = Path("01-Login") if (root / "01-Login").is_dir() else Path()
+                files = {}
+                for reference in sorted(REFERENCE_LOGIN_APP.rglob("*")):
+                    file_path = prefix / reference.relative_to(REFERENCE_LOGIN_APP)
+                    target = root / file_path
+                    if reference.is_file() and target.is_file() and target.read_text() != reference.read_text():
+                        files[file_path.as_posix()] = reference.read_text()
+                self._integrations[project_path] = files
+            return self._integrations[project_path]
+
+    def actions(self, task: str, project_path: Optional[str], group: Optional[List[str]] = None) -> List[Tuple[str, dict]]:
+        if task == "analyze_requirements_task":
+            return [("Read a file's content", {"file_path": str(REQUIREMENTS_FILE)})]
+        files = self.integration(project_path) if project_path else {}
+        if not files:
+            return []
+        if task == "analyze_codebase_task":
+            entrypoint = next((file_path for file_path in files if file_path.endswith(".py")), next(iter(files)))
+            return [("Read a file's content", {"file_path": str(Path(project_path) / entrypoint)})]
+        if task == "integrate_auth0_task":
+            actions = [("Look up Auth0 documentation", {"query": "flask authlib oauth register"})]
+            for file_path, content in files.items():
+                if group is not None and file_path not in group:
+                    continue
+                path = Path(project_path) / file_path
+                actions.append(("File Writer Tool", {
+                    "filename": path.name,
+                    "directory": str(path.parent),
+                    "overwrite": True,
+                    "content": content
+                }))
+            return actions
+        return []
+
+    def final_answer(self, task: str, project_path: Optional[str], group: Optional[List[str]] = None) -> dict:
+        answer = fill(json.loads(self.templates[task])) if task in self.templates else {}
+        files = self.integration(project_path) if project_path else {}
+        if not files:
+            return answer
+        if task == "analyze_codebase_task":
+            answer["files_to_modify"] = [
+                {**answer["files_to_modify"][0], "file_path": file_path} for file_path in files
+            ]
+        elif task == "integrate_auth0_task":
+            answer["modified_files"] = [
+                {"file_path": file_path, "changes_made": ["Applied the reference Auth0 integration"], "status": "modified"}
+                for file_path in files
+                if group is None or file_path in group
+            ]
+        return answer
+
+    def complete(self, messages: List[dict]) -> Tuple[str, str]:
+        prompt = "\n".join(str(message.get("content") or "") for message in messages)
+        task = self.task_of(prompt)
+        project_path = self.project_of(prompt)
+        group = self.file_group_of(prompt)
+        if "EXPECTED STRUCTURE" in prompt:
+            # A repair call, answered with the JSON alone
+            return task, json.dumps(self.final_answer(task, project_path, group), indent=2)
+        # Every tool call of the agent adds one assistant message to the conversation
+        step = sum(message.get("role") == "assistant" for message in messages)
+        actions = self.actions(task, project_path, group)
+        if step < len(actions):
+            tool, arguments = actions[step]
+            return task, f"Thought: I need to use a tool.\nAction: {tool}\nAction Input: {json.dumps(arguments)}"
+        answer = json.dumps(self.final_answer(task, project_path, group), indent=2)
+        return task, f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    def handle(self, request: dict) -> dict:
+        start = time.time()
+        messages = request.get("messages", [])
+        task, content = self.complete(messages)
+        if self.latency:
+            time.sleep(self.latency)
+        prompt_tokens = sum(len(str(message.get("content") or "")) for message in messages) // 4
+        completion_tokens = len(content) // 4
+        with self._lock:
+            self.calls.append(Call(
+                task=task,
+                model=request.get("model", ""),
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                start=start,
+                duration=time.time() - start
+            ))
+            call_id = len(self.calls)
+        return {
+            "id": f"chatcmpl-mock-{call_id}",
+            "object": "chat.completion",
+            "created": int(start),
+            "model": request.get("model", ""),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+            self._integrations = {}
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        self.llm = MockLLM(latency)
+        super().__init__(("127.0.0.1", port), _Handler)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start(self) -> "MockLLMServer":
+        threading.Thread(target=self.serve_forever, name="mock-llm", daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        body = json.dumps(self.server.llm.handle(request)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every call, like a real LLM's")
+    args = parser.parse_args()
+    server = MockLLMServer(args.port, args.latency)
+    print(f"Mock LLM listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
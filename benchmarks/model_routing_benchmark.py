@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Compare the model routing of agents.yaml / tasks.yaml with running everything on one model.
+
+Each configuration runs the LLM crew (the codemod fast path is off) on a fresh
+copy of auto_auth0_tests/python-web-app with the response cache disabled, and
+reports wall time, tokens and the estimated cost per model, the repair calls,
+the escalations to the stronger model, the task outputs that still don't match
+their expected JSON, the validation status and how far the integrated project is from
+auto_auth0_tests/auth0-python-web-app. Needs OPENAI_API_KEY and SERPER_API_KEY.
+
+Usage:
+    python benchmarks/model_routing_benchmark.py [--baseline gpt-4] [--mode dag] [--repeat 1]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from autoauth0.checkpoint import CheckpointStore  # noqa: E402
+from autoauth0.crew import AutoAuth0Crew  # noqa: E402
+from autoauth0.planner import llm_cost  # noqa: E402
+from autoauth0.schema import validate_output  # noqa: E402
+from codemod_benchmark import REFERENCE_APP, TEST_APP, features  # noqa: E402
+
+TASKS_CONFIG = ROOT / "src" / "autoauth0" / "config" / "tasks.yaml"
+
+
+def cost(model_usage: dict) -> float:
+    return sum(
+        llm_cost(model, usage["prompt_tokens"], usage["completion_tokens"])
+        for model, usage in model_usage.items()
+    )
+
+
+def bench(mode: str, model_override: str = None) -> dict:
+    expected_outputs = {
+        name: config.get("expected_output")
+        for name, config in yaml.safe_load(TASKS_CONFIG.read_text()).items()
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        project_path = Path(tmp) / TEST_APP.name
+        shutil.copytree(TEST_APP, project_path)
+        crew = AutoAuth0Crew(
+            str(project_path),
+            mode=mode,
+            use_cache=False,
+            fast_path=False,
+            verbose=False,
+            checkpoint_store=CheckpointStore(Path(tmp) / "runs"),
+            model_override=model_override
+        )
+        start = time.perf_counter()
+        result = crew.run()
+        wall_time = time.perf_counter() - start
+        try:
+            patched = features(project_path)
+        except StopIteration:
+            patched = {}
+    expected = features(REFERENCE_APP)
+    schema_failures = [
+        name for name, task in crew.checkpoint.tasks.items()
+        if validate_output(task["output"], expected_outputs.get(name), name)
+    ]
+    return {
+        "wall_time": wall_time,
+        "tokens": sum(usage["prompt_tokens"] + usage["completion_tokens"] for usage in crew.model_usage.values()),
+        "cost": cost(crew.model_usage),
+        "model_usage": crew.model_usage,
+        "escalations": crew.escalations,
+        "repairs": crew.repairs,
+        "schema_failures": schema_failures,
+        "validation": "failed" if crew.validation_failed(result) else "passed",
+        "feature_mismatches": sorted(name for name, value in expected.items() if patched.get(name) != value),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default="gpt-4", help="model of every agent and task in the baseline run")
+    parser.add_argument("--mode", choices=AutoAuth0Crew.MODES, default="dag")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'config':<16}{'run':>4}{'wall':>9}{'tokens':>9}{'cost':>9}{'escalated':>11}{'schema':>8}"
+          f"{'validation':>12}{'mismatches':>12}")
+    for label, model_override in (("routed", None), (args.baseline, args.baseline)):
+        for run in range(1, args.repeat + 1):
+            stats = bench(args.mode, model_override)
+            print(
+                f"{label:<16}{run:>4}{stats['wall_time']:>8.1f}s{stats['tokens']:>9}{stats['cost']:>8.2f}$"
+                f"{len(stats['escalations']):>11}{len(stats['schema_failures']):>8}{stats['validation']:>12}"
+                f"{len(stats['feature_mismatches']):>12}"
+            )
+            for model, usage in sorted(stats["model_usage"].items()):
+                print(f"  {model:<20}{usage['prompt_tokens']:>9} prompt {usage['completion_tokens']:>9} completion")
+            for repair in stats["repairs"]:
+                print(f"  {'repaired' if repair['repaired'] else 'repair failed'} {repair['task']}: {repair['errors'][0]}")
+            for escalation in stats["escalations"]:
+                print(f"  escalated {escalation['task']} to {escalation['to']}: {escalation['errors'][0]}")
+            for name in stats["schema_failures"]:
+                print(f"  {name} doesn't match its expected output")
+            for name in stats["feature_mismatches"]:
+                print(f"  integration differs from the reference on {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""Compare crew runs with and without the static pre-scan index.
+
+Usage:
+    python benchmarks/prescan_benchmark.py          # pre-scan timings only
+    python benchmarks/prescan_benchmark.py --live   # also run the crew (needs OPENAI_API_KEY)
+
+The live runs use the LLM crew, not the codemod fast path, on a temporary
+copy of each app, so the fixtures stay untouched.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from autoauth0.checkpoint import CheckpointStore  # noqa: E402
+from autoauth0.prescan import scan_project  # noqa: E402
+
+TEST_APPS = [
+    ROOT / "auto_auth0_tests" / "python-web-app",
+    ROOT / "auto_auth0_tests" / "auth0-python-web-app",
+]
+
+
+class ToolCallCounter:
+    """Crew ``step_callback`` counting agent steps that invoked a tool."""
+
+    def __init__(self):
+        self.tool_calls = 0
+        self.steps = 0
+
+    def __call__(self, step):
+        self.steps += 1
+        if getattr(step, "tool", None):
+            self.tool_calls += 1
+
+
+def bench_scan(project_path: Path, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scan_project(str(project_path))
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_crew(project_path: Path, use_index: bool) -> dict:
+    from autoauth0.crew import AutoAuth0Crew
+
+    counter = ToolCallCounter()
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = Path(tmp) / project_path.name
+        shutil.copytree(project_path, copy)
+        start = time.perf_counter()
+        AutoAuth0Crew(
+            str(copy),
+            use_index=use_index,
+            step_callback=counter,
+            fast_path=False,
+            checkpoint_store=CheckpointStore(Path(tmp) / "runs")
+        ).run()
+        wall_time = time.perf_counter() - start
+    return {
+        "wall_time": wall_time,
+        "tool_calls": counter.tool_calls,
+        "steps": counter.steps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="run the crew with and without the index")
+    parser.add_argument("--repeat", type=int, default=50, help="pre-scan repetitions per app")
+    args = parser.parse_args()
+
+    for project_path in TEST_APPS:
+        index = scan_project(str(project_path))
+        print(f"{project_path.name}: framework={index.framework} files={index.file_count} "
+              f"context={len(index.to_context())} chars "
+              f"scan={bench_scan(project_path, args.repeat) * 1000:.2f} ms")
+        if not args.live:
+            continue
+        for use_index in (False, True):
+            stats = bench_crew(project_path, use_index)
+            label = "with index" if use_index else "without index"
+            print(f"  {label:>13}: wall={stats['wall_time']:.1f}s "
+                  f"tool_calls={stats['tool_calls']} steps={stats['steps']}")
+
+
+if __name__ == "__main__":
+    main()
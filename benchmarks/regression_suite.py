@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+"""Benchmark and regression suite of full runs against a local mock LLM.
+
+``AutoAuth0Crew`` runs on a copy of auto_auth0_tests/python-web-app and on
+generated Flask projects of 10, 100 and 1000 files, once through the LLM crew
+and once through the codemod fast path. The crew talks to the scripted
+mock server of mock_llm_server.py, which answers with the reference
+integration rather than the codemod's, and the tools run offline
+(``AUTOAUTH0_OFFLINE=1``), so the suite needs no API key and no network.
+
+Per stage it reports wall time, LLM calls and tokens (counted by the mock
+server), tool calls (from the run's spans) and peak traced memory
+(tracemalloc, shared by stages running concurrently). Correctness is checked
+by comparing the integrated project with auto_auth0_tests/auth0-python-web-app:
+its features, and the lines its entrypoint differs from the reference's.
+Every run is appended to ``--results`` and compared with the previous run of
+the same project and configuration, so trends show up across commits. Exits
+with 1 when an integration is incorrect, when its entrypoint differs from the
+reference by more lines than the previous run's or, with ``--max-slowdown``,
+when a run got slower than that factor.
+
+Usage:
+    python benchmarks/regression_suite.py [--sizes 10 100 1000] [--mode dag] [--latency 0.0]
+"""
+import argparse
+import difflib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from autoauth0.checkpoint import CheckpointStore  # noqa: E402
+from autoauth0.crew import AutoAuth0Crew  # noqa: E402
+from autoauth0.planner import ThroughputStore  # noqa: E402
+from codemod_benchmark import REFERENCE_APP, TEST_APP, features  # noqa: E402
+from mock_llm_server import MockLLMServer  # noqa: E402
+
+LOGIN_APP = TEST_APP / "01-Login"
+REFERENCE_ENTRYPOINT = REFERENCE_APP / "01-Login" / "server.py"
+DEFAULT_RESULTS_PATH = ROOT / ".autoauth0" / "benchmarks.jsonl"
+CONFIGURATIONS = {"crew": False, "fast_path": True}
+
+# Stage of the tool calls and task spans of each agent, named like the task timings
+AGENT_STAGES = {
+    "requirements_analysis_agent": "analyze_requirements",
+    "codebase_analysis_agent": "analyze_codebase",
+    "auth0_integration_agent": "integrate_auth0",
+    "validation_agent": "validate_integration",
+    "manager_agent": "resolve_validation_failure",
+}
+
+MODULE_TEMPLATE = '''"""Generated module {index} of a synthetic Flask project"""
+from dataclasses import dataclass
+
+
+@dataclass
+class Record{index}:
+    id: int
+    name: str
+
+
+def load_records_{index}(rows):
+    return [Record{index}(id=row["id"], name=row["name"]) for row in rows]
+
+
+def find_record_{index}(records, record_id):
+    for record in records:
+        if record.id == record_id:
+            return record
+    return None
+'''
+
+PARTIAL_TEMPLATE = '''<section class="partial-{index}">
+  <h2>Section {index}</h2>
+  <p>Generated template partial of a synthetic Flask project.</p>
+</section>
+'''
+
+
+def generate_flask_project(path: Path, n_files: int) -> Path:
+    """The 01-Login app of python-web-app grown to ``n_files`` files with modules and template partials"""
+    shutil.copytree(LOGIN_APP, path)
+    existing = sum(1 for file in path.rglob("*") if file.is_file())
+    for index in range(max(0, n_files - existing)):
+        if index % 4 == 3:
+            file = path / "templates" / "partials" / f"partial_{index}.html"
+            content = PARTIAL_TEMPLATE.format(index=index)
+        else:
+            file = path / "app_modules" / f"module_{index // 100}" / f"module_{index}.py"
+            content = MODULE_TEMPLATE.format(index=index)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(content)
+    return path
+
+
+class StageMemory:
+    """Tracer listener recording the peak traced memory of every stage"""
+
+    def __init__(self):
+        self.peaks: Dict[str, int] = defaultdict(int)
+
+    def on_span_start(self, span):
+        if span.kind in ("stage", "task"):
+            tracemalloc.reset_peak()
+
+    def on_span_end(self, span):
+        if span.kind in ("stage", "task"):
+            stage = span.name if span.kind == "stage" else AGENT_STAGES.get(span.agent, span.name)
+            self.peaks[stage] = max(self.peaks[stage], tracemalloc.get_traced_memory()[1])
+
+
+def reference_diff_lines(project_path: Path) -> Optional[int]:
+    """Lines added or removed between the integrated entrypoint and the reference one"""
+    entrypoints = [path for path in (project_path / "server.py", project_path / "01-Login" / "server.py") if path.exists()]
+    if not entrypoints:
+        return None
+    diff = difflib.unified_diff(
+        REFERENCE_ENTRYPOINT.read_text().splitlines(),
+        entrypoints[0].read_text().splitlines(),
+        lineterm=""
+    )
+    return sum(
+        1 for line in diff
+        if line[:1] in "+-" and not line.startswith(("+++", "---")) and line[1:].strip()
+    )
+
+
+def run_project(project_path: Path, fast_path: bool, mode: str, server: MockLLMServer, runs_dir: Path) -> dict:
+    server.llm.reset()
+    crew = AutoAuth0Crew(
+        str(project_path),
+        mode=mode,
+        use_cache=False,
+        fast_path=fast_path,
+        verbose=False,
+        checkpoint_store=CheckpointStore(runs_dir),
+        # The mock's instant answers would skew the planner's measured throughput
+        throughput_store=ThroughputStore(runs_dir / "throughput.jsonl")
+    )
+    memory = StageMemory()
+    crew.tracer.listeners.append(memory)
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        crew.run()
+    finally:
+        wall_time = time.perf_counter() - start
+        tracemalloc.stop()
+
+    stages = defaultdict(lambda: {"wall_time": 0.0, "llm_calls": 0, "tokens": 0, "tool_calls": 0, "peak_memory": 0})
+    for name, timing in crew.task_timings.items():
+        stages[name]["wall_time"] = timing["duration"]
+    for span in crew.tracer.spans:
+        if span.kind == "stage" and span.name not in crew.task_timings:
+            stages[span.name]["wall_time"] += span.duration
+        elif span.kind == "tool":
+            stages[AGENT_STAGES.get(span.agent, "other")]["tool_calls"] += 1
+    for call in server.llm.calls:
+        stage = stages[call.task.removesuffix("_task")]
+        stage["llm_calls"] += 1
+        stage["tokens"] += call.prompt_tokens + call.completion_tokens
+    for name, peak in memory.peaks.items():
+        stages[name]["peak_memory"] = peak
+
+    try:
+        integrated = features(project_path)
+    except StopIteration:
+        integrated = {}
+    expected = features(REFERENCE_APP)
+    mismatches = sorted(
+        name for name, value in expected.items()
+        if integrated.get(name) != value and not (
+            isinstance(value, list) and set(value) <= set(integrated.get(name) or [])
+        )
+    )
+    return {
+        "wall_time": wall_time,
+        "llm_calls": sum(stage["llm_calls"] for stage in stages.values()),
+        "tokens": sum(stage["tokens"] for stage in stages.values()),
+        "tool_calls": sum(stage["tool_calls"] for stage in stages.values()),
+        "peak_memory": max((stage["peak_memory"] for stage in stages.values()), default=0),
+        "stages": dict(stages),
+        "feature_mismatches": mismatches,
+        "reference_diff_lines": reference_diff_lines(project_path),
+        "correct": not mismatches,
+    }
+
+
+def git_commit() -> Optional[str]:
+    completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return completed.stdout.strip() or None
+
+
+def load_results(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def append_result(path: Path, record: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as results:
+        results.write(json.dumps(record) + "\n")
+
+
+def _change(current: float, previous: Optional[float]) -> str:
+    if not previous:
+        return ""
+    return f" ({(current - previous) / previous:+.0%})"
+
+
+def print_record(record: dict, previous: Optional[dict]):
+    previous = previous or {}
+    print(
+        f"{record['project']:<18}{record['configuration']:<11}"
+        f"{record['wall_time']:>8.2f}s{_change(record['wall_time'], previous.get('wall_time')):<8}"
+        f"{record['llm_calls']:>6}{record['tokens']:>9}{_change(record['tokens'], previous.get('tokens')):<8}"
+        f"{record['tool_calls']:>6}{record['peak_memory'] / 2 ** 20:>8.1f}MB"
+        f"  {'ok' if record['correct'] else 'INCORRECT ' + ', '.join(record['feature_mismatches'])}"
+    )
+    for name, stage in sorted(record["stages"].items()):
+        print(
+            f"  {name:<31}{stage['wall_time']:>8.2f}s{'':<8}{stage['llm_calls']:>6}{stage['tokens']:>9}{'':<8}"
+            f"{stage['tool_calls']:>6}{stage['peak_memory'] / 2 ** 20:>8.1f}MB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 100, 1000], help="files of the synthetic projects")
+    parser.add_argument("--mode", choices=AutoAuth0Crew.MODES, default="dag")
+    parser.add_argument("--configurations", nargs="+", choices=list(CONFIGURATIONS), default=list(CONFIGURATIONS))
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the mock LLM takes per call")
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS_PATH, help="JSON lines history of the runs")
+    parser.add_argument("--max-slowdown", type=float, help="fail when a run is this many times slower than the last")
+    args = parser.parse_args()
+
+    server = MockLLMServer(latency=args.latency).start()
+    os.environ.update({
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_API_BASE": server.base_url,
+        "OPENAI_BASE_URL": server.base_url,
+        "SERPER_API_KEY": "mock",
+        "AUTOAUTH0_OFFLINE": "1",
+        "OTEL_SDK_DISABLED": "true",
+    })
+    history = load_results(args.results)
+    commit = git_commit()
+    failures = 0
+    print(f"{'project':<18}{'config':<11}{'wall':>9}{'':<8}{'llm':>6}{'tokens':>9}{'':<8}{'tools':>6}{'memory':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        projects = [("python-web-app", lambda path: shutil.copytree(TEST_APP, path))]
+        projects += [
+            (f"synthetic-{size}", lambda path, size=size: generate_flask_project(path, size))
+            for size in args.sizes
+        ]
+        for project, create in projects:
+            for configuration in args.configurations:
+                project_path = Path(tmp) / f"{project}-{configuration}"
+                create(project_path)
+                stats = run_project(project_path, CONFIGURATIONS[configuration], args.mode, server, Path(tmp) / "runs")
+                record = {
+                    "timestamp": time.time(),
+                    "commit": commit,
+                    "project": project,
+                    "files": sum(1 for file in project_path.rglob("*") if file.is_file()),
+                    "configuration": configuration,
+                    "mode": args.mode,
+                    "latency": args.latency,
+                    **stats,
+                }
+                previous = next((
+                    old for old in reversed(history)
+                    if (old["project"], old["configuration"], old["mode"], old.get("latency"))
+                    == (project, configuration, args.mode, args.latency)
+                ), None)
+                print_record(record, previous)
+                append_result(args.results, record)
+                failures += not record["correct"]
+                diff_lines = record["reference_diff_lines"]
+                previous_diff_lines = previous.get("reference_diff_lines") if previous else None
+                if diff_lines is not None and previous_diff_lines is not None and diff_lines > previous_diff_lines:
+                    print(
+                        f"  DIFF to the reference grew from {previous_diff_lines} to {diff_lines} lines"
+                        f" since the last run at {previous.get('commit')}"
+                    )
+                    failures += 1
+                if args.max_slowdown and previous and record["wall_time"] > previous["wall_time"] * args.max_slowdown:
+                    print(f"  SLOWER than {args.max_slowdown}x the last run at {previous.get('commit')}")
+                    failures += 1
+    server.shutdown()
+    print(f"Results appended to {args.results}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,103 @@
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import requests
 from crewai import Agent, Task
 from langchain.tools import tool
 from unstructured.partition.html import partition_html
 
+# Reused across calls so repeated scrapes keep the connection to browserless alive
+session = requests.Session()
+
+# Chunks are summarized concurrently, at most this many LLM calls at a time
+MAX_CONCURRENT_SUMMARIES = 8
+CHUNK_TOKENS = 2000
+
+_summarizers = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SUMMARIES, thread_name_prefix="summarizer")
+_local = threading.local()
+
+
+def count_tokens(text):
+  try:
+    import tiktoken
+  except ImportError:
+    # About 4 characters per token for English text
+    return len(text) // 4
+  return len(tiktoken.get_encoding("cl100k_base").encode(text))
+
+
+def chunk_elements(elements, max_tokens=CHUNK_TOKENS):
+  """Pack the page's elements (paragraphs, titles, list items) into chunks of
+  at most ``max_tokens``, so chunks end on element boundaries instead of
+  cutting sentences at a fixed character offset."""
+  chunks, current, current_tokens = [], [], 0
+  for element in elements:
+    text = str(element).strip()
+    if not text:
+      continue
+    tokens = count_tokens(text)
+    if current and current_tokens + tokens > max_tokens:
+      chunks.append("\n\n".join(current))
+      current, current_tokens = [], 0
+    if tokens > max_tokens:
+      # A single huge element, e.g. a table, is split on lines
+      lines = text.splitlines()
+      middle = max(1, len(lines) // 2)
+      if len(lines) > 1:
+        chunks.extend(chunk_elements(["\n".join(lines[:middle]), "\n".join(lines[middle:])], max_tokens))
+      else:
+        size = max(1, len(text) * max_tokens // tokens)
+        chunks.extend(text[i:i + size] for i in range(0, len(text), size))
+      continue
+    current.append(text)
+    current_tokens += tokens
+  if current:
+    chunks.append("\n\n".join(current))
+  return chunks
+
+
+def researcher():
+  """One agent per worker thread, reused for every chunk it summarizes.
+  crewai keeps per-task state on the agent, so threads don't share one."""
+  if not hasattr(_local, "agent"):
+    _local.agent = Agent(
+        role='Principal Researcher',
+        goal=
+        'Do amazing researches and summaries based on the content you are working with',
+        backstory=
+        "You're a Principal Researcher at a big company and you need to do a research about a given topic.",
+        allow_delegation=False)
+  return _local.agent
+
+
+@lru_cache(maxsize=512)
+def summarize_chunk(chunk):
+  task = Task(
+      agent=researcher(),
+      description=
+      f'Analyze and summarize the content bellow, make sure to include the most relevant information in the summary, return only the summary nothing else.\n\nCONTENT\n----------\n{chunk}'
+  )
+  return str(task.execute())
+
+
+@lru_cache(maxsize=128)
+def _reduce(summaries):
+  task = Task(
+      agent=researcher(),
+      description=
+      f'Combine the partial summaries of one web page below into a single summary, keep every relevant fact and drop repetitions, return only the summary nothing else.\n\nSUMMARIES\n----------\n{summaries}'
+  )
+  return str(task.execute())
+
+
+def reduce_summaries(summaries):
+  if len(summaries) == 1:
+    return summaries[0]
+  return _reduce("\n\n".join(summaries))
+
 
 class BrowserTools():
 
@@ -15,24 +107,12 @@ class BrowserTools():
     url = f"https://chrome.browserless.io/content?token={os.environ['BROWSERLESS_API_KEY']}"
     payload = json.dumps({"url": website})
     headers = {'cache-control': 'no-cache', 'content-type': 'application/json'}
-    response = requests.request("POST", url, headers=headers, data=payload)
+    response = session.post(url, headers=headers, data=payload)
     elements = partition_html(text=response.text)
-    content = "\n\n".join([str(el) for el in elements])
-    content = [content[i:i + 8000] for i in range(0, len(content), 8000)]
-    summaries = []
-    for chunk in content:
-      agent = Agent(
-          role='Principal Researcher',
-          goal=
-          'Do amazing researches and summaries based on the content you are working with',
-          backstory=
-          "You're a Principal Researcher at a big company and you need to do a research about a given topic.",
-          allow_delegation=False)
-      task = Task(
-          agent=agent,
-          description=
-          f'Analyze and summarize the content bellow, make sure to include the most relevant information in the summary, return only the summary nothing else.\n\nCONTENT\n----------\n{chunk}'
-      )
-      summary = task.execute()
-      summaries.append(summary)
-    return "\n\n".join(summaries)
+    chunks = chunk_elements(elements)
+    if not chunks:
+      return f"No content found at {website}."
+    # Map: every chunk at once, so the latency is the slowest chunk's, not the sum
+    summaries = list(_summarizers.map(summarize_chunk, chunks))
+    # Reduce: one call merging the partial summaries, cached on their content
+    return reduce_summaries(summaries)
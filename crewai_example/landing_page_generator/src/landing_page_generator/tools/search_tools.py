@@ -3,6 +3,9 @@ import json
 import requests
 from langchain.tools import tool
 
+# Reused across calls so repeated searches keep the connection to serper alive
+session = requests.Session()
+
 
 class SearchTools():
 
@@ -16,7 +19,7 @@ class SearchTools():
         'X-API-KEY': os.environ['SERPER_API_KEY'],
         'content-type': 'application/json'
     }
-    response = requests.request("POST", url, headers=headers, data=payload)
+    response = session.post(url, headers=headers, data=payload)
     results = response.json()['organic']
     string = []
     for result in results:
@@ -0,0 +1,588 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Tuple
+
+from crewai import Agent, Crew, Process, Task
+from crewai.project import CrewBase, agent, crew, task
+
+from autoauth0.cache import ResponseCache
+from autoauth0.code_index import CodeIndex
+from autoauth0.compaction import TokenLedger
+from autoauth0.docstore import DEFAULT_DOCSTORE_PATH, DocStore
+from autoauth0.instrumentation import Tracer, instrument_agent
+from autoauth0.memory import (
+    DEFAULT_MEMORY_PATH, LongTermMemoryStorage, MemoryStorage, MemoryStore, project_namespace
+)
+from autoauth0.overlay import Overlay
+from autoauth0.planner import configured_model
+from autoauth0.registry import REGISTRY, Registry
+from autoauth0.schema import SchemaValidationError, output_model, parse_output
+from autoauth0.tools.compact_file_read_tool import CompactFileReadTool
+from autoauth0.tools.heuristic_scan_tool import HeuristicScanTool
+from autoauth0.tools.overlay_file_writer_tool import OverlayFileWriterTool
+
+# If you want to run a snippet of code before or after the crew starts,
+# you can use the @before_kickoff and @after_kickoff decorators
+# https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
+
+REPAIR_PROMPT = """Your answer below doesn't match the JSON structure the task expects.
+
+EXPECTED STRUCTURE
+----------
+{expected_output}
+
+ERRORS
+----------
+{errors}
+
+ANSWER
+----------
+{answer}
+
+Return only the corrected JSON object. Keep every value of the answer that is already correct,
+and use null for values the answer doesn't give instead of inventing them."""
+
+@CrewBase
+class CodebaseAnalysisCrew:
+    """Crew for analyzing codebase for Auth0 integration"""
+    agents_config = 'config/agents.yaml'
+    tasks_config = 'config/tasks.yaml'
+    agent_names = (
+        'manager_agent',
+        'requirements_analysis_agent',
+        'codebase_analysis_agent',
+        'auth0_integration_agent',
+        'validation_agent'
+    )
+    
+    def __init__(
+        self,
+        project_path: str = None,
+        step_callback=None,
+        cache: ResponseCache = None,
+        rate_limiter=None,
+        tracer: Tracer = None,
+        verbose: bool = True,
+        task_callback=None,
+        overlay: Overlay = None,
+        model_override: str = None,
+        memory: bool = False,
+        knowledge_path: str = "knowledge"
+    ):
+        super().__init__()
+        self.project_path = project_path
+        self.step_callback = step_callback
+        self.tracer = tracer
+        self.verbose = verbose
+        self.task_callback = task_callback
+        self.overlay = overlay
+        self.token_ledger = TokenLedger()
+        # The docs store is shared by every crew of the process, the tools and LLM
+        # clients built with this crew's ledger, overlay, cache, limiter and tracer by its agents only
+        self.doc_store = REGISTRY.get('doc_store', DEFAULT_DOCSTORE_PATH, DocStore)
+        self.instances = Registry()
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        # Every agent and task on this model, without escalation, e.g. to compare against the routing
+        self.model_override = model_override
+        self._llm_lock = threading.Lock()
+        # Task name of every task built from tasks.yaml, by id of the Task
+        self.task_names = {}
+        self.escalated = set()
+        self.escalations = []
+        self.repairs = []
+        self.model_usage = defaultdict(
+            lambda: {'prompt_tokens': 0, 'completion_tokens': 0, 'llm_requests': 0, 'seconds': 0.0}
+        )
+        self._executing = threading.local()
+        self.memory_store = None
+        if memory:
+            # One store per process, compacted as each crew starts; the knowledge files are loaded once
+            self.memory_store = REGISTRY.get('memory_store', DEFAULT_MEMORY_PATH, MemoryStore).maintain()
+            REGISTRY.get(
+                'knowledge',
+                str(Path(knowledge_path).resolve()),
+                lambda: self.memory_store.preload_knowledge(knowledge_path)
+            )
+
+    def llm_for(self, model: str):
+        """crewai LLM of this crew per model, with its response cache, rate limiter and tracer, shared by its agents"""
+        from autoauth0.llm import RunLLM
+
+        # Temperature 0.0 for the most deterministic outputs,
+        # which is also what makes the responses safe to cache
+        return self.instances.get(
+            'llm',
+            model,
+            lambda: RunLLM(
+                model=model,
+                temperature=0.0,
+                cache=self.cache,
+                rate_limiter=self.rate_limiter,
+                tracer=self.tracer
+            )
+        )
+
+    def model_for(self, agent_name: str, task_name: str = None, escalated: bool = False) -> str:
+        """Model ``agent_name`` runs ``task_name`` on; the task's keys take precedence over the agent's"""
+        if self.model_override is not None:
+            return self.model_override
+        return configured_model(self.agents_config, self.tasks_config, agent_name, task_name, escalated)
+
+    def route_agent(self, agent: Agent, name: str) -> Agent:
+        """Switch ``agent`` to the model of the task it is about to run, and count its tokens and time per model.
+
+        The task's own keys only apply when the agent is the task's agent, not
+        when the manager runs it in the hierarchical process.
+        """
+        if getattr(agent, '_autoauth0_routed', False):
+            return agent
+        execute_task = agent.execute_task
+
+        def routed_execute_task(task, *args, **kwargs):
+            executing = self._executing.__dict__.setdefault('agents', set())
+            if id(agent) in executing:
+                # crewai retrying inside the call, it stays on the model and is counted once
+                return execute_task(task, *args, **kwargs)
+            task_name = self.task_names.get(id(task))
+            model = self.model_for(
+                name,
+                task_name if task.agent is agent else None,
+                escalated=task_name in self.escalated
+            )
+            agent.llm = self.llm_for(model)
+            before = self._token_summary(agent)
+            start = time.perf_counter()
+            executing.add(id(agent))
+            try:
+                return execute_task(task, *args, **kwargs)
+            finally:
+                executing.discard(id(agent))
+                after = self._token_summary(agent)
+                with self._llm_lock:
+                    usage = self.model_usage[model]
+                    for key in after:
+                        usage[key] += after[key] - before[key]
+                    # Tool calls included, it's what a plan's wall time is estimated from
+                    usage['seconds'] += time.perf_counter() - start
+
+        object.__setattr__(agent, 'execute_task', routed_execute_task)
+        object.__setattr__(agent, '_autoauth0_routed', True)
+        return agent
+
+    @staticmethod
+    def _token_summary(agent: Agent) -> dict:
+        token_process = getattr(agent, '_token_process', None)
+        summary = token_process.get_summary() if token_process is not None else None
+        return {
+            'prompt_tokens': getattr(summary, 'prompt_tokens', 0),
+            'completion_tokens': getattr(summary, 'completion_tokens', 0),
+            'llm_requests': getattr(summary, 'successful_requests', 0)
+        }
+
+    def task_output_model(self, task_name: str):
+        """Pydantic model compiled from the task's ``expected_output``, None for a free text answer"""
+        return output_model(task_name, self.tasks_config[task_name].get('expected_output'))
+
+    def typed_output(self, task_name: str, raw: str):
+        """``raw`` as an instance of the task's output model, None if it has none or doesn't match"""
+        model_class = self.task_output_model(task_name)
+        return parse_output(raw, model_class)[0] if model_class is not None else None
+
+    def repair_output(self, task_name: str, agent_name: str, raw: str, errors: list):
+        """One LLM call fixing only the structure of the answer, instead of running the task again.
+
+        Returns the repaired answer as an instance of the task's model, or None.
+        """
+        model = self.model_for(agent_name, task_name, escalated=task_name in self.escalated)
+        prompt = REPAIR_PROMPT.format(
+            expected_output=self.tasks_config[task_name]['expected_output'],
+            errors="\n".join(errors[:20]),
+            answer=raw
+        )
+        from autoauth0.llm import UsageRecorder
+
+        usage = UsageRecorder()
+        start = time.perf_counter()
+        with self.tracer.span('stage', f'repair:{task_name}', agent=agent_name) if self.tracer else nullcontext():
+            response = self.llm_for(model).call(prompt, callbacks=[usage])
+        seconds = time.perf_counter() - start
+        repaired, remaining = parse_output(str(response), self.task_output_model(task_name))
+        with self._llm_lock:
+            # Nothing is counted for an answer from the response cache
+            self.model_usage[model]['prompt_tokens'] += usage.prompt_tokens
+            self.model_usage[model]['completion_tokens'] += usage.completion_tokens
+            self.model_usage[model]['llm_requests'] += usage.calls
+            self.model_usage[model]['seconds'] += seconds
+            self.repairs.append({'task': task_name, 'errors': errors, 'repaired': repaired is not None})
+        return repaired
+
+    def schema_guardrail(self, task_name: str, agent_name: str):
+        """crewai task guardrail validating the answer against the task's output model.
+
+        A mismatching answer first gets a repair call. If it still doesn't match,
+        the guardrail fails and crewai runs the task again, which ``route_agent``
+        puts on the escalation model. Without an escalation model, or when the
+        escalated answer doesn't match either, ``SchemaValidationError`` stops
+        the run before downstream tasks build on the malformed answer.
+
+        A valid answer is replaced by the model's JSON and the typed object is
+        kept as the output's ``pydantic``.
+        """
+        model_class = self.task_output_model(task_name)
+        if model_class is None:
+            return None
+
+        def guardrail(output) -> Tuple[bool, Any]:
+            parsed, errors = parse_output(output.raw, model_class)
+            if parsed is None:
+                parsed = self.repair_output(task_name, agent_name, output.raw, errors)
+            if parsed is not None:
+                # Downstream tasks get the validated JSON as context instead of the agent's prose
+                output.raw = parsed.model_dump_json(indent=2)
+                output.pydantic = parsed
+                return True, output
+            with self._llm_lock:
+                escalate = (
+                    task_name not in self.escalated
+                    and self.model_for(agent_name, task_name, escalated=True) != self.model_for(agent_name, task_name)
+                )
+                if escalate:
+                    self.escalated.add(task_name)
+                    self.escalations.append({
+                        'task': task_name,
+                        'from': self.model_for(agent_name, task_name),
+                        'to': self.model_for(agent_name, task_name, escalated=True),
+                        'errors': errors
+                    })
+            if not escalate:
+                raise SchemaValidationError(task_name, errors)
+            return False, (
+                "The answer doesn't match the JSON structure of the expected output: "
+                + "; ".join(errors[:10])
+            )
+
+        return guardrail
+
+    def register_task(self, task_name: str, task: Task) -> Task:
+        self.task_names[id(task)] = task_name
+        return task
+
+    def directory_read_tool(self):
+        def build():
+            # crewai_tools is slow to import, agents that list files import it on first use
+            from crewai_tools import DirectoryReadTool
+
+            return DirectoryReadTool(directory=self.project_path)
+
+        return self.instances.get('directory_read_tool', self.project_path, build)
+
+    def file_writer_tool(self):
+        """Writes are staged in the overlay until validation passes, if the run is transactional"""
+
+        def build():
+            if self.overlay is not None:
+                return OverlayFileWriterTool(overlay=self.overlay)
+            from crewai_tools import FileWriterTool
+
+            return FileWriterTool()
+
+        return self.instances.get('file_writer_tool', None, build)
+
+    def file_read_tool(self, owner: str) -> CompactFileReadTool:
+        """File reads return outlines by default and are charged to ``owner``'s task budget"""
+        return self.instances.get(
+            'file_read_tool',
+            owner,
+            lambda: CompactFileReadTool(ledger=self.token_ledger, owner=owner, overlay=self.overlay)
+        )
+
+    def code_search_tool(self, owner: str):
+        """Semantic search of the project's code index, charged to ``owner``'s task budget"""
+        from autoauth0.tools.code_search_tool import CodeSearchTool
+
+        index = self.instances.get('code_index', self.project_path, lambda: CodeIndex(self.project_path))
+        return self.instances.get(
+            'code_search_tool',
+            owner,
+            lambda: CodeSearchTool(index=index, ledger=self.token_ledger, owner=owner)
+        )
+
+    def memory_options(self) -> dict:
+        """Crew arguments putting its memories in the project's namespace of the managed store"""
+        if self.memory_store is None:
+            return {}
+
+        def build():
+            from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+
+            namespace = project_namespace(self.project_path)
+            return {
+                'memory': True,
+                # The knowledge files are searched along with the short-term memories
+                'short_term_memory': ShortTermMemory(
+                    storage=MemoryStorage(self.memory_store, namespace, 'short_term', knowledge=True)
+                ),
+                'entity_memory': EntityMemory(storage=MemoryStorage(self.memory_store, namespace, 'entity')),
+                'long_term_memory': LongTermMemory(storage=LongTermMemoryStorage(self.memory_store, namespace))
+            }
+
+        return self.instances.get('memory', self.project_path, build)
+
+    def output_callback(self, task_name: str):
+        """crewai task callback passing the task's output to ``task_callback(task_name, output)``"""
+        if self.task_callback is None:
+            return None
+        return lambda output: self.task_callback(task_name, output)
+
+    def set_token_budget(self, task_name: str, owner: str):
+        self.token_ledger.set_budget(owner, self.tasks_config[task_name].get('token_budget'))
+
+    @agent
+    def manager_agent(self) -> Agent:
+        return self.route_agent(Agent(
+            config=self.agents_config['manager_agent'],
+            allow_delegation=True,
+            verbose=self.verbose,
+            llm=self.llm_for(self.model_for('manager_agent'))
+        ), 'manager_agent')
+    
+    @agent
+    def requirements_analysis_agent(self) -> Agent:
+        return self.route_agent(Agent(
+            config=self.agents_config['requirements_analysis_agent'],
+            allow_delegation=False,
+            tools=[
+                self.directory_read_tool(),
+                self.file_read_tool('requirements_analysis_agent')
+            ],
+            verbose=self.verbose,
+            llm=self.llm_for(self.model_for('requirements_analysis_agent'))
+        ), 'requirements_analysis_agent')
+    
+    @agent
+    def codebase_analysis_agent(self) -> Agent:
+        from autoauth0.tools.concurrent_io_tools import ConcurrentFileReadTool
+
+        return self.route_agent(Agent(
+            config=self.agents_config['codebase_analysis_agent'],
+            allow_delegation=False,
+            tools=[
+                self.directory_read_tool(),
+                self.file_read_tool('codebase_analysis_agent'),
+                ConcurrentFileReadTool(reader=self.file_read_tool('codebase_analysis_agent')),
+                self.code_search_tool('codebase_analysis_agent')
+            ],
+            verbose=self.verbose,
+            llm=self.llm_for(self.model_for('codebase_analysis_agent'))
+        ), 'codebase_analysis_agent')
+
+    def integration_tools(self, file_read_tool, file_writer_tool) -> list:
+        from autoauth0.tools.auth0_docs_tools import Auth0DocsLookupTool
+        from autoauth0.tools.concurrent_io_tools import ConcurrentScrapeTool, ConcurrentSearchTool
+
+        return [
+            self.directory_read_tool(),
+            file_read_tool,
+            self.code_search_tool('auth0_integration_agent'),
+            file_writer_tool,
+            # CodeDocsSearchTool(),  # Not needed for now
+            # Auth0 docs are served from the local store, the web is only hit on a miss,
+            # over pooled keep-alive connections and several queries or pages per call
+            Auth0DocsLookupTool(store=self.doc_store),
+            ConcurrentSearchTool(store=self.doc_store),
+            ConcurrentScrapeTool(store=self.doc_store)
+        ]
+
+    @agent
+    def auth0_integration_agent(self) -> Agent:
+        return self.route_agent(Agent(
+            config=self.agents_config['auth0_integration_agent'],
+            allow_delegation=False,
+            tools=self.integration_tools(self.file_read_tool('auth0_integration_agent'), self.file_writer_tool()),
+            verbose=self.verbose,
+            llm=self.llm_for(self.model_for('auth0_integration_agent'))
+        ), 'auth0_integration_agent')
+
+    def integration_worker(self, overlay: Overlay) -> Agent:
+        """Integration agent of one fan-out worker, reading and staging its writes in ``overlay``.
+
+        Not an @agent: every worker needs its own, they run concurrently. Their
+        file reads are charged to the integration agent's budget.
+        """
+        worker = self.route_agent(Agent(
+            config=self.agents_config['auth0_integration_agent'],
+            allow_delegation=False,
+            tools=self.integration_tools(
+                CompactFileReadTool(ledger=self.token_ledger, owner='auth0_integration_agent', overlay=overlay),
+                OverlayFileWriterTool(overlay=overlay)
+            ),
+            verbose=self.verbose,
+            llm=self.llm_for(self.model_for('auth0_integration_agent'))
+        ), 'auth0_integration_agent')
+        if self.tracer is not None:
+            instrument_agent(worker, 'auth0_integration_agent', self.tracer)
+        return worker
+
+    @agent
+    def validation_agent(self) -> Agent:
+        return self.route_agent(Agent(
+            config=self.agents_config['validation_agent'],
+            allow_delegation=False,
+            tools=[
+                self.directory_read_tool(),
+                self.file_read_tool('validation_agent'),
+                HeuristicScanTool(overlay=self.overlay)
+            ],
+            verbose=self.verbose,
+            llm=self.llm_for(self.model_for('validation_agent'))
+        ), 'validation_agent')
+    
+    @task
+    def analyze_requirements(self) -> Task:
+        self.set_token_budget('analyze_requirements_task', 'requirements_analysis_agent')
+        return self.register_task('analyze_requirements_task', Task(
+            config=self.tasks_config['analyze_requirements_task'],
+            callback=self.output_callback('analyze_requirements_task'),
+            guardrail=self.schema_guardrail('analyze_requirements_task', 'requirements_analysis_agent'),
+            agent=self.requirements_analysis_agent(),
+            context=[{
+                "description": "Analyze Auth0 integration requirements from documentation",
+                "expected_output": "A structured JSON report containing Auth0 integration requirements and configurations",
+                "project_path": self.project_path
+            }]
+        ))
+    
+    @task
+    def analyze_codebase(self) -> Task:
+        self.set_token_budget('analyze_codebase_task', 'codebase_analysis_agent')
+        return self.register_task('analyze_codebase_task', Task(
+            config=self.tasks_config['analyze_codebase_task'],
+            callback=self.output_callback('analyze_codebase_task'),
+            guardrail=self.schema_guardrail('analyze_codebase_task', 'codebase_analysis_agent'),
+            agent=self.codebase_analysis_agent(),
+            context=[{
+                "description": "Analyze the codebase to identify files that need Auth0 integration",
+                "expected_output": "A structured JSON report containing files to modify and framework considerations",
+                "project_path": self.project_path
+            }]
+        ))
+
+    @task
+    def integrate_auth0(self) -> Task:
+        self.set_token_budget('integrate_auth0_task', 'auth0_integration_agent')
+        return self.register_task('integrate_auth0_task', Task(
+            config=self.tasks_config['integrate_auth0_task'],
+            callback=self.output_callback('integrate_auth0_task'),
+            guardrail=self.schema_guardrail('integrate_auth0_task', 'auth0_integration_agent'),
+            agent=self.auth0_integration_agent(),
+            context=[{
+                "description": "Implement Auth0 integration based on analysis from requirements and codebase analysis",
+                "expected_output": "Modified code files with Auth0 integration",
+                "project_path": self.project_path
+            }]
+        ))
+
+    @task
+    def validate_integration(self) -> Task:
+        self.set_token_budget('validate_integration_task', 'validation_agent')
+        return self.register_task('validate_integration_task', Task(
+            config=self.tasks_config['validate_integration_task'],
+            callback=self.output_callback('validate_integration_task'),
+            guardrail=self.schema_guardrail('validate_integration_task', 'validation_agent'),
+            agent=self.validation_agent(),
+            context=[{
+                "description": "Validate Auth0 integration for security and correctness. If issues are found, provide detailed feedback for the integration agent to fix.",
+                "expected_output": "Validation report with security assessment and any issues that need to be addressed",
+                "project_path": self.project_path
+            }]
+        ))
+    
+    def integrate_file_group(self, worker: Agent) -> Task:
+        """Task of a fan-out worker, it gets the requirements analysis as context"""
+        return self.register_task('integrate_file_group_task', Task(
+            config=self.tasks_config['integrate_file_group_task'],
+            guardrail=self.schema_guardrail('integrate_file_group_task', 'auth0_integration_agent'),
+            agent=worker,
+            context=[self.analyze_requirements()]
+        ))
+
+    def instrument_agents(self):
+        if self.tracer is None:
+            return
+        for name in self.agent_names:
+            instrument_agent(getattr(self, name)(), name, self.tracer)
+
+    @crew
+    def crew(self) -> Crew:
+        self.instrument_agents()
+        return Crew(
+            agents=[
+                self.requirements_analysis_agent(),
+                self.codebase_analysis_agent(),
+                self.auth0_integration_agent(),
+                self.validation_agent()
+            ],
+            tasks=self.tasks,
+            process=Process.hierarchical,
+            manager_agent=self.manager_agent(),
+            step_callback=self.step_callback,
+            verbose=self.verbose,
+            **self.memory_options()
+        )
+
+    def token_usage(self) -> dict:
+        """LLM tokens and file content tokens delivered by tools, per agent"""
+        usage = {}
+        for name in self.agent_names:
+            # crewai keeps the per-agent LLM token counts on the agent's token process
+            token_process = getattr(getattr(self, name)(), '_token_process', None)
+            summary = token_process.get_summary() if token_process is not None else None
+            usage[name] = {
+                'prompt_tokens': getattr(summary, 'prompt_tokens', 0),
+                'completion_tokens': getattr(summary, 'completion_tokens', 0),
+                'llm_requests': getattr(summary, 'successful_requests', 0),
+                'file_tokens': self.token_ledger.delivered[name],
+                'file_tokens_saved': self.token_ledger.saved[name],
+                'file_token_budget': self.token_ledger.budgets.get(name)
+            }
+        return usage
+
+    def task_for(self, task_name: str) -> Task:
+        """Task built from the ``tasks.yaml`` entry ``task_name``, e.g. analyze_codebase_task"""
+        return getattr(self, task_name.removesuffix('_task'))()
+
+    def resolve_validation_failure(self) -> Task:
+        # Not a @task: it must not be part of the hierarchical crew
+        return self.register_task('resolve_validation_failure_task', Task(
+            config=self.tasks_config['resolve_validation_failure_task'],
+            guardrail=self.schema_guardrail('resolve_validation_failure_task', 'manager_agent'),
+            agent=self.manager_agent()
+        ))
+
+    def resolution_crew(self) -> Crew:
+        """The manager with the coworkers it can delegate fixes to"""
+        self.instrument_agents()
+        return Crew(
+            agents=[self.manager_agent(), self.auth0_integration_agent(), self.validation_agent()],
+            tasks=[self.resolve_validation_failure()],
+            process=Process.sequential,
+            step_callback=self.step_callback,
+            verbose=self.verbose,
+            **self.memory_options()
+        )
+
+    def stage_crew(self, tasks) -> Crew:
+        """Sequential crew running only ``tasks``, without the manager agent"""
+        self.instrument_agents()
+        return Crew(
+            agents=[task.agent for task in tasks],
+            tasks=tasks,
+            process=Process.sequential,
+            step_callback=self.step_callback,
+            verbose=self.verbose,
+            **self.memory_options()
+        )
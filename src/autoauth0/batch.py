@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+"""Integrate Auth0 across many target projects with a worker pool.
+
+The manifest is a text file with one project path per line (blank lines and
+``#`` comments are ignored). One JSON record per project is appended to the
+report as soon as the project finishes, and projects that already have a
+``succeeded`` record in the report are skipped, so an interrupted batch can be
+resumed by running the same command again. A project whose validation failed
+is recorded as ``rolled_back``, its writes discarded, and is retried like a
+``failed`` one.
+
+With ``--heaviest-first`` or ``--max-cost`` every project is planned first
+(see ``planner.py``, no LLM call): the most expensive projects start first so
+they don't end up as the batch's long tail, and projects estimated above the
+cap are recorded as ``over_budget`` instead of being run.
+"""
+import argparse
+import json
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List
+
+from dotenv import load_dotenv
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from autoauth0.crew import AutoAuth0Crew
+from autoauth0.dag import MODES
+from autoauth0.incremental import extract_json
+from autoauth0.planner import Plan, plan_run
+
+DEFAULT_REPORT_PATH = "autoauth0_batch_report.jsonl"
+
+
+def read_manifest(path: str) -> List[str]:
+    projects = []
+    for line in Path(path).read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            projects.append(str(Path(line).expanduser().resolve()))
+    # Keep the manifest order but drop duplicates
+    return list(dict.fromkeys(projects))
+
+
+def completed_projects(report_path: str) -> set:
+    path = Path(report_path)
+    if not path.exists():
+        return set()
+    completed = set()
+    for line in path.read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A line cut short by an interrupted run
+            continue
+        if record.get("status") == "succeeded":
+            completed.add(record["project_path"])
+    return completed
+
+
+class BatchRunner:
+    """Run one ``AutoAuth0Crew`` per project on a bounded thread pool."""
+
+    def __init__(
+        self,
+        report_path: str = DEFAULT_REPORT_PATH,
+        concurrency: int = 4,
+        requests_per_minute: float = 60,
+        mode: str = "hierarchical",
+        use_cache: bool = True,
+        incremental: bool = False,
+        memory: bool = False,
+        heaviest_first: bool = False,
+        max_cost: float = None
+    ):
+        self.report_path = report_path
+        self.concurrency = concurrency
+        self.mode = mode
+        self.use_cache = use_cache
+        self.incremental = incremental
+        self.memory = memory
+        self.heaviest_first = heaviest_first
+        self.max_cost = max_cost
+        # A single limiter shared by every crew's LLMs keeps the whole batch
+        # within the OpenAI rate limit, whatever the concurrency
+        self.rate_limiter = InMemoryRateLimiter(
+            requests_per_second=requests_per_minute / 60,
+            max_bucket_size=max(1, concurrency)
+        )
+        self._report_lock = threading.Lock()
+
+    def run(self, projects: List[str]) -> dict:
+        completed = completed_projects(self.report_path)
+        pending = [project for project in projects if project not in completed]
+        summary = {
+            "skipped": len(projects) - len(pending),
+            "succeeded": 0,
+            "failed": 0,
+            "rolled_back": 0,
+            "over_budget": 0
+        }
+        if self.heaviest_first or self.max_cost is not None:
+            plans = self.plan_projects(pending)
+            if self.heaviest_first:
+                pending.sort(key=lambda project: (plans[project].cost, plans[project].tokens) if project in plans
+                             else (0.0, 0), reverse=True)
+            if self.max_cost is not None:
+                over_budget = [
+                    project for project in pending if project in plans and plans[project].cost > self.max_cost
+                ]
+                for project in over_budget:
+                    pending.remove(project)
+                    self.write_record({
+                        "project_path": project,
+                        "status": "over_budget",
+                        "estimated_cost": plans[project].cost,
+                        "plan": plans[project].to_dict()
+                    })
+                    summary["over_budget"] += 1
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(self.run_project, project) for project in pending]
+            for future in as_completed(futures):
+                summary[future.result()["status"]] += 1
+        return summary
+
+    def plan_projects(self, projects: List[str]) -> Dict[str, Plan]:
+        plans = {}
+        for project in projects:
+            try:
+                plans[project] = plan_run(project, mode=self.mode)
+            except Exception:
+                # run_project records why the project can't run
+                continue
+        return plans
+
+    def run_project(self, project_path: str) -> dict:
+        record = {"project_path": project_path, "started_at": time.time()}
+        start = time.perf_counter()
+        try:
+            if not Path(project_path).is_dir():
+                raise FileNotFoundError(f"Project directory not found: {project_path}")
+            crew = AutoAuth0Crew(
+                project_path,
+                use_cache=self.use_cache,
+                mode=self.mode,
+                rate_limiter=self.rate_limiter,
+                incremental=self.incremental,
+                memory=self.memory
+            )
+            result = crew.run()
+            report = extract_json(str(result)) or {}
+            if not crew.validation_failed(result):
+                status = "succeeded"
+            elif crew.overlay is not None:
+                status = "rolled_back"
+            else:
+                status = "failed"
+            record.update(
+                status=status,
+                result=str(result),
+                validation_status=report.get("validation_results", {}).get("overall_status"),
+                committed_files=crew.committed_files,
+                timings=crew.task_timings
+            )
+        except Exception as e:
+            # One broken project must not stop the others
+            record.update(status="failed", error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+        record["duration"] = time.perf_counter() - start
+        self.write_record(record)
+        return record
+
+    def write_record(self, record: dict):
+        with self._report_lock:
+            with open(self.report_path, "a") as report:
+                report.write(json.dumps(record) + "\n")
+                report.flush()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Integrate Auth0 into every project listed in a manifest")
+    parser.add_argument("manifest", help="text file with one project path per line")
+    parser.add_argument("--report", default=DEFAULT_REPORT_PATH, help="JSONL report, also used to resume")
+    parser.add_argument("--concurrency", type=int, default=4, help="number of projects processed at once")
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=60,
+        help="LLM request budget shared by all workers"
+    )
+    parser.add_argument("--mode", choices=MODES, default="hierarchical")
+    parser.add_argument("--no-cache", action="store_true", help="always call the LLM")
+    parser.add_argument("--incremental", action="store_true", help="only re-analyze files changed since the last run")
+    parser.add_argument("--memory", action="store_true", help="give each project's crew memory, kept across runs")
+    parser.add_argument(
+        "--heaviest-first",
+        action="store_true",
+        help="start the projects with the highest estimated cost first"
+    )
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        metavar="USD",
+        help="don't run projects whose estimated LLM cost is above USD, record them as over_budget"
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    load_dotenv()
+    args = parse_args(argv)
+    runner = BatchRunner(
+        report_path=args.report,
+        concurrency=args.concurrency,
+        requests_per_minute=args.requests_per_minute,
+        mode=args.mode,
+        use_cache=not args.no_cache,
+        incremental=args.incremental,
+        memory=args.memory,
+        heaviest_first=args.heaviest_first,
+        max_cost=args.max_cost
+    )
+    summary = runner.run(read_manifest(args.manifest))
+    print(
+        f"Batch finished: {summary['succeeded']} succeeded, {summary['failed']} failed, "
+        f"{summary['rolled_back']} rolled back (validation failed), "
+        f"{summary['skipped']} skipped (already done), {summary['over_budget']} over budget. Report: {args.report}"
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,116 @@
+"""Content-addressed on-disk cache for LLM responses.
+
+Entries are keyed on the model, temperature, full prompt (which already carries
+every tool observation of the agent loop) and a fingerprint of the inputs the
+tools read from, i.e. the target project and the ``knowledge/`` directory. With
+``temperature=0.0`` a cache hit is as good as a fresh call, so re-runs on
+unchanged inputs are served from disk. The agents' crewai LLM (``llm.py``)
+looks every call up here before it goes to the model.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from autoauth0.prescan import SKIP_DIRS
+
+DEFAULT_CACHE_PATH = Path(".autoauth0") / "llm_cache.sqlite3"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def fingerprint_paths(paths: Iterable[str]) -> str:
+    """Hash the names and contents of every file under ``paths``."""
+    digest = hashlib.sha256()
+    for base in paths:
+        base = Path(base)
+        if base.is_file():
+            digest.update(base.name.encode())
+            digest.update(base.read_bytes())
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for filename in sorted(filenames):
+                path = Path(dirpath) / filename
+                digest.update(path.relative_to(base).as_posix().encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed LLM cache with size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        inputs_digest: str = "",
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.inputs_digest = inputs_digest
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    def key(self, prompt: str, llm_string: str) -> str:
+        # llm_string serializes the model parameters, e.g. the model name and the temperature
+        payload = json.dumps([llm_string, prompt, self.inputs_digest])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[str]:
+        key = self.key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return row[0]
+
+    def update(self, prompt: str, llm_string: str, value: str) -> None:
+        key = self.key(prompt, llm_string)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, len(value.encode()), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
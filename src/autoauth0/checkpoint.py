@@ -0,0 +1,146 @@
+"""Per-task checkpoints of a crew run, so a run that dies part way can be resumed.
+
+Every finished task's output, the token usage at that point and the files the
+agents wrote are stored in ``.autoauth0/runs/<run_id>.json``. The file is
+rewritten atomically after each task (write to a temporary file, fsync, then
+``os.replace``), so a crash mid-write leaves the previous checkpoint intact.
+``AutoAuth0Crew(resume=run_id)`` restores the finished tasks' outputs and only
+runs the tasks that are still incomplete.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from autoauth0.instrumentation import Span, written_file
+
+DEFAULT_RUNS_DIR = Path(".autoauth0") / "runs"
+CHECKPOINT_VERSION = 1
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _file_hash(path: str) -> Optional[str]:
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+@dataclass
+class Checkpoint:
+    run_id: str
+    project_path: str
+    mode: str
+    # task name -> {"output": raw output, "finished_at": timestamp, "token_usage": usage per agent}
+    tasks: Dict[str, dict] = field(default_factory=dict)
+    # written file -> sha256 of its content right after the write
+    files: Dict[str, str] = field(default_factory=dict)
+    # content of the writes still staged in the overlay of a transactional run
+    staged: Dict[str, str] = field(default_factory=dict)
+    result: Optional[str] = None
+
+    def completed(self, task_name: str) -> bool:
+        return task_name in self.tasks
+
+    def output(self, task_name: str) -> Optional[str]:
+        task = self.tasks.get(task_name)
+        return task["output"] if task is not None else None
+
+    def modified_files(self) -> List[str]:
+        """Files changed or removed since an agent wrote them, staged writes aside"""
+        return sorted(
+            path for path, digest in self.files.items()
+            if path not in self.staged and _file_hash(path) != digest
+        )
+
+
+class CheckpointStore:
+    """One JSON checkpoint file per run, keyed on the run id."""
+
+    def __init__(self, runs_dir: Path = DEFAULT_RUNS_DIR):
+        self.runs_dir = Path(runs_dir)
+
+    def path_for(self, run_id: str) -> Path:
+        return self.runs_dir / f"{run_id}.json"
+
+    def load(self, run_id: str) -> Checkpoint:
+        path = self.path_for(run_id)
+        if not path.exists():
+            raise ValueError(f"No checkpoint for run {run_id!r} in {self.runs_dir}")
+        data = json.loads(path.read_text())
+        if data.pop("version", None) != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint of run {run_id!r} was written by an incompatible version")
+        return Checkpoint(**data)
+
+    def save(self, checkpoint: Checkpoint):
+        path = self.path_for(checkpoint.run_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as tmp:
+            json.dump({"version": CHECKPOINT_VERSION, **asdict(checkpoint)}, tmp, indent=2)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+
+
+class CheckpointWriter:
+    """Records a run's progress into its checkpoint; also a ``Tracer`` listener catching file writes"""
+
+    def __init__(self, store: CheckpointStore, checkpoint: Checkpoint, overlay=None):
+        self.store = store
+        self.checkpoint = checkpoint
+        self.overlay = overlay
+        # Tasks of the dag modes finish concurrently
+        self._lock = threading.Lock()
+
+    def record_task(self, task_name: str, output: str, token_usage: dict):
+        with self._lock:
+            self.checkpoint.tasks[task_name] = {
+                "output": output,
+                "finished_at": time.time(),
+                "token_usage": token_usage,
+            }
+            self.store.save(self.checkpoint)
+
+    def record_result(self, result: str):
+        with self._lock:
+            self.checkpoint.result = result
+            self.store.save(self.checkpoint)
+
+    def on_span_start(self, span: Span):
+        pass
+
+    def on_span_end(self, span: Span):
+        file_path = written_file(span)
+        if file_path is not None:
+            self.record_write(file_path)
+
+    def record_write(self, file_path: str):
+        with self._lock:
+            if self.overlay is not None:
+                # Not on disk yet, keep the content so a resumed run can stage it again
+                file_path = str(self.overlay.resolve(file_path))
+                self.checkpoint.staged = self.overlay.staged()
+                content = self.checkpoint.staged.get(file_path)
+                if content is None:
+                    # The tool refused the write, or it went to a fan-out worker's branch
+                    # and is recorded once merged
+                    return
+                self.checkpoint.files[file_path] = hashlib.sha256(content.encode()).hexdigest()
+            else:
+                self.checkpoint.files[file_path] = _file_hash(file_path)
+            self.store.save(self.checkpoint)
+
+    def record_commit(self):
+        """The staged writes are in the project now"""
+        with self._lock:
+            self.checkpoint.staged = {}
+            self.store.save(self.checkpoint)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+"""Local semantic index of the target project's code.
+
+Python files are chunked per top-level function and class (per method for
+long classes), with the module level statements in between, e.g. the app
+configuration, as chunks of their own; other text files are chunked by lines.
+Chunks are embedded on the CPU with Chroma's default local model
+(all-MiniLM-L6-v2) and stored in ``db/chroma.sqlite3``, one collection per
+project. Every chunk records the hash of its file, so an update only embeds new
+and changed files and drops the chunks of removed ones.
+
+The ``Search the codebase`` tool queries it, e.g. "where are routes defined"
+or "where is the session configured", and returns the top chunks with their
+file and line range instead of the agent reading files one at a time.
+
+Usage:
+    python -m autoauth0.code_index PROJECT_PATH [--query "where is the session configured"]
+"""
+import argparse
+import ast
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from autoauth0.incremental import hash_project_files
+from autoauth0.registry import REGISTRY
+
+DEFAULT_INDEX_PATH = Path("db")
+CHUNK_LINES = 60
+# Files larger than this are data, not code worth searching
+MAX_FILE_BYTES = 200_000
+INDEXED_SUFFIXES = {
+    ".py", ".html", ".htm", ".jinja", ".jinja2", ".j2", ".js", ".ts", ".jsx", ".tsx",
+    ".txt", ".toml", ".cfg", ".ini", ".yaml", ".yml", ".json", ".env", ".example", ".md",
+}
+EMBED_BATCH = 256
+
+
+@dataclass
+class CodeChunk:
+    file_path: str
+    start_line: int
+    end_line: int
+    name: str
+    text: str
+
+    def to_document(self) -> str:
+        # The path and name are embedded with the code, they say a lot about what it does
+        return f"{self.file_path} {self.name}\n{self.text}"
+
+
+def _chunk_lines(file_path: str, lines: List[str], start: int, end: int, name: str) -> List[CodeChunk]:
+    """Lines ``start`` to ``end`` (1-based, inclusive) in chunks of at most CHUNK_LINES"""
+    chunks = []
+    for first in range(start, end + 1, CHUNK_LINES):
+        last = min(end, first + CHUNK_LINES - 1)
+        text = "\n".join(lines[first - 1:last])
+        if text.strip():
+            chunks.append(CodeChunk(file_path, first, last, name, text))
+    return chunks
+
+
+def chunk_python(file_path: str, source: str) -> List[CodeChunk]:
+    lines = source.splitlines()
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return _chunk_lines(file_path, lines, 1, len(lines), "module")
+    chunks = []
+    module_start = 1
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        if start > module_start:
+            chunks.extend(_chunk_lines(file_path, lines, module_start, start - 1, "module"))
+        end = node.end_lineno
+        if isinstance(node, ast.ClassDef) and end - start + 1 > CHUNK_LINES:
+            methods = [
+                child for child in node.body
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            header_end = (min([methods[0].lineno] + [d.lineno for d in methods[0].decorator_list]) - 1
+                          if methods else end)
+            chunks.extend(_chunk_lines(file_path, lines, start, header_end, node.name))
+            for method in methods:
+                method_start = min([method.lineno] + [d.lineno for d in method.decorator_list])
+                chunks.extend(_chunk_lines(
+                    file_path, lines, method_start, method.end_lineno, f"{node.name}.{method.name}"
+                ))
+        else:
+            chunks.extend(_chunk_lines(file_path, lines, start, end, node.name))
+        module_start = end + 1
+    if module_start <= len(lines):
+        chunks.extend(_chunk_lines(file_path, lines, module_start, len(lines), "module"))
+    return chunks
+
+
+def chunk_file(file_path: str, source: str) -> List[CodeChunk]:
+    if file_path.endswith(".py"):
+        return chunk_python(file_path, source)
+    lines = source.splitlines()
+    return _chunk_lines(file_path, lines, 1, len(lines), Path(file_path).name)
+
+
+def indexable(file_path: str) -> bool:
+    path = Path(file_path)
+    return path.suffix.lower() in INDEXED_SUFFIXES or path.name in ("Dockerfile", "Procfile", "requirements.txt")
+
+
+@dataclass
+class IndexUpdate:
+    embedded_files: List[str] = field(default_factory=list)
+    removed_files: List[str] = field(default_factory=list)
+    chunks: int = 0
+    duration: float = 0.0
+
+
+class CodeIndex:
+    def __init__(self, project_path: str, path: Path = DEFAULT_INDEX_PATH, embedding_function=None):
+        self.project_path = project_path
+        self.path = Path(path)
+        self.embedding_function = embedding_function
+        self._collection = None
+        self._updated = False
+        self._lock = threading.Lock()
+
+    @property
+    def collection_name(self) -> str:
+        digest = hashlib.sha256(str(Path(self.project_path).resolve()).encode()).hexdigest()[:16]
+        return f"code_{digest}"
+
+    def collection(self):
+        if self._collection is None:
+            # chromadb comes with crewai, and is only imported once a project is indexed
+            import chromadb
+            from chromadb.config import Settings
+
+            client = REGISTRY.get(
+                "chroma_client",
+                str(self.path.resolve()),
+                lambda: chromadb.PersistentClient(path=str(self.path), settings=Settings(anonymized_telemetry=False))
+            )
+            options = {"embedding_function": self.embedding_function} if self.embedding_function else {}
+            self._collection = client.get_or_create_collection(
+                self.collection_name,
+                metadata={"hnsw:space": "cosine", "project_path": str(Path(self.project_path).resolve())},
+                **options
+            )
+        return self._collection
+
+    def update(self) -> IndexUpdate:
+        """Embed the new and changed files and drop the chunks of the removed ones"""
+        start = time.perf_counter()
+        with self._lock:
+            collection = self.collection()
+            indexed = {
+                metadata["file_path"]: metadata["file_hash"]
+                for metadata in collection.get(include=["metadatas"])["metadatas"]
+            }
+            root = Path(self.project_path)
+            hashes = {
+                file_path: digest for file_path, digest in hash_project_files(self.project_path).items()
+                if indexable(file_path) and (root / file_path).stat().st_size <= MAX_FILE_BYTES
+            }
+            update = IndexUpdate(
+                embedded_files=sorted(file_path for file_path, digest in hashes.items() if indexed.get(file_path) != digest),
+                removed_files=sorted(file_path for file_path in indexed if file_path not in hashes)
+            )
+            stale = update.embedded_files + update.removed_files
+            for i in range(0, len(stale), EMBED_BATCH):
+                collection.delete(where={"file_path": {"$in": stale[i:i + EMBED_BATCH]}})
+            chunks = []
+            for file_path in update.embedded_files:
+                source = (root / file_path).read_text(encoding="utf-8", errors="replace")
+                chunks.extend((chunk, hashes[file_path]) for chunk in chunk_file(file_path, source))
+            for i in range(0, len(chunks), EMBED_BATCH):
+                batch = chunks[i:i + EMBED_BATCH]
+                collection.add(
+                    ids=[f"{digest[:16]}:{chunk.file_path}:{chunk.start_line}" for chunk, digest in batch],
+                    documents=[chunk.to_document() for chunk, _ in batch],
+                    metadatas=[{
+                        "file_path": chunk.file_path,
+                        "file_hash": digest,
+                        "start_line": chunk.start_line,
+                        "end_line": chunk.end_line,
+                        "name": chunk.name,
+                    } for chunk, digest in batch]
+                )
+            update.chunks = len(chunks)
+            self._updated = True
+        update.duration = time.perf_counter() - start
+        return update
+
+    def ensure_updated(self) -> Optional[IndexUpdate]:
+        """Update once per instance, i.e. once per run"""
+        if self._updated:
+            return None
+        return self.update()
+
+    def query(self, text: str, k: int = 5) -> List[dict]:
+        """The ``k`` chunks closest to ``text``, with their file, line range and distance"""
+        collection = self.collection()
+        count = collection.count()
+        if not count:
+            return []
+        results = collection.query(
+            query_texts=[text],
+            n_results=min(k, count),
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            {
+                "file_path": metadata["file_path"],
+                "start_line": metadata["start_line"],
+                "end_line": metadata["end_line"],
+                "name": metadata["name"],
+                "distance": distance,
+                # The document starts with the path and name line added for the embedding
+                "code": document.split("\n", 1)[1] if "\n" in document else document,
+            }
+            for document, metadata, distance in zip(
+                results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("project_path")
+    parser.add_argument("--path", default=str(DEFAULT_INDEX_PATH))
+    parser.add_argument("--query", help="search the index after updating it")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    index = CodeIndex(args.project_path, args.path)
+    update = index.update()
+    print(f"embedded {len(update.embedded_files)} files ({update.chunks} chunks), "
+          f"removed {len(update.removed_files)}, in {update.duration:.2f}s")
+    if args.query:
+        print(json.dumps(index.query(args.query, args.k), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""Deterministic Auth0 patching for known frameworks.
+
+For standard apps the Auth0 integration is always the same set of edits, so
+instead of having the integration agent regenerate it, a framework recipe
+patches the code directly. Recipes are registered with ``@recipe``; each one
+decides from the pre-scan ``ProjectIndex`` whether it can handle the project
+and, if so, plans AST-guided edits that keep the rest of the file untouched.
+Projects no recipe matches go through the LLM crew as before.
+"""
+import ast
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from autoauth0.prescan import ProjectIndex, PythonFileInfo
+
+RECIPES: Dict[str, "Recipe"] = {}
+
+
+def recipe(cls):
+    """Register a recipe class, keyed on the framework it handles."""
+    RECIPES[cls.framework] = cls()
+    return cls
+
+
+@dataclass
+class CodemodResult:
+    recipe: str
+    files: Dict[str, str] = field(default_factory=dict)
+    created: List[str] = field(default_factory=list)
+    changes: Dict[str, List[str]] = field(default_factory=dict)
+    duration: float = 0.0
+
+    def note(self, file_path: str, change: str):
+        self.changes.setdefault(file_path, []).append(change)
+
+    def write(self, project_path: str):
+        root = Path(project_path)
+        for file_path, content in self.files.items():
+            path = root / file_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+    def to_report(self) -> dict:
+        """Render the result in the ``integrate_auth0_task`` schema"""
+        return {
+            "modified_files": [
+                {
+                    "file_path": file_path,
+                    "changes_made": self.changes.get(file_path, []),
+                    "status": "created" if file_path in self.created else "modified",
+                }
+                for file_path in self.files
+            ],
+            "integration_summary": {
+                "success": True,
+                "issues": [],
+                "recommendations": [
+                    f"Applied the {self.recipe} recipe without LLM generation",
+                    "Fill in the Auth0 values of .env.example in a .env file",
+                ],
+            },
+        }
+
+
+class SourceEditor:
+    """Offset based edits on a source string, applied from the end so positions stay valid."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.line_offsets = [0]
+        for line in source.splitlines(keepends=True):
+            self.line_offsets.append(self.line_offsets[-1] + len(line))
+        self.edits: List[Tuple[int, int, str]] = []
+
+    def offset(self, lineno: int, col: int = 0) -> int:
+        return self.line_offsets[lineno - 1] + col
+
+    def line_end(self, lineno: int) -> int:
+        return self.line_offsets[lineno] if lineno < len(self.line_offsets) else len(self.source)
+
+    def insert(self, offset: int, text: str):
+        self.edits.append((offset, offset, text))
+
+    def replace(self, start: int, end: int, text: str):
+        self.edits.append((start, end, text))
+
+    def apply(self) -> str:
+        source = self.source
+        if source and not source.endswith("\n"):
+            source += "\n"
+        # Stable sort keeps insertion order for edits at the same offset
+        for start, end, text in sorted(self.edits, key=lambda edit: edit[0], reverse=True):
+            source = source[:start] + text + source[end:]
+        return source
+
+
+class Recipe:
+    framework = ""
+
+    def match(self, index: ProjectIndex) -> Optional[PythonFileInfo]:
+        """The entrypoint to patch, or None if the recipe can't handle the project"""
+        raise NotImplementedError
+
+    def plan(self, project_path: str, index: ProjectIndex, entrypoint: PythonFileInfo) -> CodemodResult:
+        raise NotImplementedError
+
+
+def _app_assignment(tree: ast.Module, app_name: str) -> Optional[ast.Assign]:
+    """Module level ``app_name = ...``, None e.g. for an app created in an app factory"""
+    return next(
+        (
+            node for node in tree.body
+            if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == app_name for target in node.targets
+            )
+        ),
+        None
+    )
+
+
+def _requirement_name(line: str) -> str:
+    line = line.split("#", 1)[0].strip()
+    for sep in ("[", "=", ">", "<", "~", "!", ";", " "):
+        line = line.split(sep, 1)[0]
+    return line.lower().replace("_", "-")
+
+
+@recipe
+class FlaskRecipe(Recipe):
+    framework = "flask"
+    requirements = ["python-dotenv>=0.19.2", "authlib>=1.0"]
+    env_example = (
+        "AUTH0_CLIENT_ID={CLIENT_ID}\n"
+        "AUTH0_CLIENT_SECRET={CLIENT_SECRET}\n"
+        "AUTH0_DOMAIN={DOMAIN}\n"
+        "APP_SECRET_KEY=ALongRandomlyGeneratedString\n"
+    )
+    template_block = (
+        "    {% if session %}\n"
+        "    <p>Welcome {{session.userinfo.name}}! <a href=\"/logout\" id=\"qsLogoutBtn\">Logout</a></p>\n"
+        "    <div><pre>{{pretty}}</pre></div>\n"
+        "    {% else %}\n"
+        "    <p><a href=\"/login\" id=\"qsLoginBtn\">Login</a></p>\n"
+        "    {% endif %}\n"
+    )
+
+    def match(self, index: ProjectIndex) -> Optional[PythonFileInfo]:
+        if index.framework != "flask" or index.has_auth0:
+            return None
+        entrypoints = [info for info in index.entrypoints if info.app_objects and info.parse_error is None]
+        if len(entrypoints) != 1:
+            return None
+        entrypoint = entrypoints[0]
+        existing = {route.path for route in entrypoint.routes}
+        if existing & {"/login", "/callback", "/logout"} or entrypoint.uses_oauth:
+            return None
+        # The OAuth client and the routes are added next to the app, which has to be a module global
+        tree = ast.parse((Path(index.project_path) / entrypoint.file_path).read_text())
+        if _app_assignment(tree, entrypoint.app_objects[0]) is None:
+            return None
+        return entrypoint
+
+    def plan(self, project_path: str, index: ProjectIndex, entrypoint: PythonFileInfo) -> CodemodResult:
+        root = Path(project_path)
+        result = CodemodResult(recipe=self.framework)
+        source = (root / entrypoint.file_path).read_text()
+        template = self.patch_entrypoint(source, entrypoint, result)
+        app_dir = Path(entrypoint.file_path).parent
+        self.patch_requirements(root, app_dir, index, result)
+        self.add_env_example(root, app_dir, index, result)
+        if template:
+            self.patch_template(root, app_dir / "templates" / template, result)
+        return result
+
+    def patch_entrypoint(self, source: str, entrypoint: PythonFileInfo, result: CodemodResult) -> Optional[str]:
+        """Patch the app module; returns the template rendered by the home route, if any"""
+        tree = ast.parse(source)
+        editor = SourceEditor(source)
+        file_path = entrypoint.file_path
+        app_name = entrypoint.app_objects[0]
+        imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+        last_import = max((node.end_lineno for node in imports), default=0)
+
+        env_name = None
+        for node in imports:
+            if isinstance(node, ast.ImportFrom) and node.module == "os":
+                env_name = next((alias.asname or alias.name for alias in node.names if alias.name == "environ"), None)
+        imported = {
+            (node.module if isinstance(node, ast.ImportFrom) else None, alias.name)
+            for node in imports for alias in node.names
+        }
+        new_imports = []
+        for module, names, line in (
+            (None, ["json"], "import json"),
+            (None, ["logging"], "import logging"),
+            ("urllib.parse", ["quote_plus", "urlencode"], "from urllib.parse import quote_plus, urlencode"),
+            ("authlib.integrations.flask_client", ["OAuth"], "from authlib.integrations.flask_client import OAuth"),
+            ("dotenv", ["find_dotenv", "load_dotenv"], "from dotenv import find_dotenv, load_dotenv"),
+        ):
+            if not all((module, name) in imported for name in names):
+                new_imports.append(line)
+        if env_name is None:
+            env_name = "env"
+            new_imports.append("from os import environ as env")
+
+        flask_names = {"redirect", "session", "url_for", "render_template"}
+        flask_import = next(
+            (node for node in imports if isinstance(node, ast.ImportFrom) and node.module == "flask"), None
+        )
+        if flask_import is not None:
+            names = {
+                alias.name if alias.asname is None else f"{alias.name} as {alias.asname}"
+                for alias in flask_import.names
+            }
+            merged = sorted(names | flask_names, key=str.lower)
+            editor.replace(
+                editor.offset(flask_import.lineno),
+                editor.line_end(flask_import.end_lineno),
+                f"from flask import {', '.join(merged)}\n"
+            )
+        else:
+            new_imports.append(f"from flask import {', '.join(sorted(flask_names | {'Flask'}, key=str.lower))}")
+        result.note(file_path, "Imported authlib OAuth, dotenv and the Flask session, redirect and url_for helpers")
+
+        editor.insert(editor.line_end(last_import), "".join(line + "\n" for line in new_imports) + (
+            "\n"
+            "ENV_FILE = find_dotenv()\n"
+            "if ENV_FILE:\n"
+            "    load_dotenv(ENV_FILE)\n"
+        ))
+        result.note(file_path, "Load environment variables from the .env file")
+
+        app_assign = _app_assignment(tree, app_name)
+        editor.insert(editor.line_end(app_assign.end_lineno), (
+            "# Fails at startup instead of running with an unsigned session when the key is missing\n"
+            f"{app_name}.secret_key = {env_name}[\"APP_SECRET_KEY\"]\n"
+            "\n"
+            "logger = logging.getLogger(__name__)\n"
+            "\n"
+            f"oauth = OAuth({app_name})\n"
+            "\n"
+            "oauth.register(\n"
+            "    \"auth0\",\n"
+            f"    client_id={env_name}.get(\"AUTH0_CLIENT_ID\"),\n"
+            f"    client_secret={env_name}.get(\"AUTH0_CLIENT_SECRET\"),\n"
+            "    client_kwargs={\n"
+            "        \"scope\": \"openid profile email\",\n"
+            "    },\n"
+            f"    server_metadata_url=f'https://{{{env_name}.get(\"AUTH0_DOMAIN\")}}/.well-known/openid-configuration',\n"
+            ")\n"
+        ))
+        result.note(file_path, "Set the session secret key from APP_SECRET_KEY and registered the Auth0 OAuth client")
+
+        template = self.patch_home_route(tree, source, editor, result, file_path)
+
+        routes = (
+            "\n"
+            f"@{app_name}.route(\"/callback\", methods=[\"GET\", \"POST\"])\n"
+            "def callback():\n"
+            "    token = oauth.auth0.authorize_access_token()\n"
+            "    # Keep only the user claims, not the access and refresh tokens, in the session cookie\n"
+            "    session[\"user\"] = {\"userinfo\": token[\"userinfo\"]}\n"
+            "    logger.info(\"User %s logged in\", token[\"userinfo\"].get(\"sub\"))\n"
+            "    return redirect(\"/\")\n"
+            "\n"
+            "\n"
+            f"@{app_name}.route(\"/login\")\n"
+            "def login():\n"
+            "    return oauth.auth0.authorize_redirect(\n"
+            "        redirect_uri=url_for(\"callback\", _external=True)\n"
+            "    )\n"
+            "\n"
+            "\n"
+            f"@{app_name}.route(\"/logout\")\n"
+            "def logout():\n"
+            "    logger.info(\"User logged out\")\n"
+            "    session.clear()\n"
+            "    return redirect(\n"
+            "        \"https://\"\n"
+            f"        + {env_name}.get(\"AUTH0_DOMAIN\")\n"
+            "        + \"/v2/logout?\"\n"
+            "        + urlencode(\n"
+            "            {\n"
+            "                \"returnTo\": url_for(\"home\", _external=True),\n"
+            f"                \"client_id\": {env_name}.get(\"AUTH0_CLIENT_ID\"),\n"
+            "            },\n"
+            "            quote_via=quote_plus,\n"
+            "        )\n"
+            "    )\n"
+            "\n"
+            "\n"
+        )
+        main_guard = next(
+            (node for node in tree.body if isinstance(node, ast.If) and "__name__" in ast.unparse(node.test)), None
+        )
+        editor.insert(editor.offset(main_guard.lineno) if main_guard else len(editor.source) + 1, routes)
+        result.note(file_path, "Added the /callback, /login and /logout routes")
+        result.files[file_path] = editor.apply()
+        return template
+
+    def patch_home_route(self, tree: ast.Module, source: str, editor: SourceEditor,
+                         result: CodemodResult, file_path: str) -> Optional[str]:
+        """Pass the logged in user to the template rendered on "/" """
+        for node in tree.body:
+            if not isinstance(node, ast.FunctionDef) or not any(
+                isinstance(decorator, ast.Call) and decorator.args
+                and isinstance(decorator.args[0], ast.Constant) and decorator.args[0].value == "/"
+                for decorator in node.decorator_list
+            ):
+                continue
+            for call in ast.walk(node):
+                if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name)
+                        and call.func.id == "render_template" and call.args):
+                    continue
+                if any(keyword.arg == "session" for keyword in call.keywords):
+                    return None
+                # After the last argument rather than before the ")", which may follow a trailing comma
+                last = max(call.args + call.keywords, key=lambda arg: (arg.end_lineno, arg.end_col_offset))
+                editor.insert(editor.offset(last.end_lineno, last.end_col_offset), (
+                    ", session=session.get(\"user\"), "
+                    "pretty=json.dumps(session.get(\"user\"), indent=4)"
+                ))
+                result.note(file_path, "Pass the session user to the home page template")
+                template = call.args[0]
+                return template.value if isinstance(template, ast.Constant) else None
+        return None
+
+    def patch_requirements(self, root: Path, app_dir: Path, index: ProjectIndex, result: CodemodResult):
+        candidates = [path for path in index.requirements_files if path.endswith("requirements.txt")]
+        local = [path for path in candidates if Path(path).parent == app_dir]
+        file_path = (local or candidates or [(app_dir / "requirements.txt").as_posix()])[0]
+        path = root / file_path
+        content = path.read_text() if path.exists() else ""
+        present = {_requirement_name(line) for line in content.splitlines()}
+        missing = [line for line in self.requirements if _requirement_name(line) not in present]
+        if not missing:
+            return
+        if content and not content.endswith("\n"):
+            content += "\n"
+        result.files[file_path] = content + "".join(line + "\n" for line in missing)
+        if not path.exists():
+            result.created.append(file_path)
+        result.note(file_path, f"Added {', '.join(missing)}")
+
+    def add_env_example(self, root: Path, app_dir: Path, index: ProjectIndex, result: CodemodResult):
+        if any(Path(path).parent == app_dir for path in index.env_files):
+            return
+        file_path = (app_dir / ".env.example").as_posix()
+        result.files[file_path] = self.env_example
+        result.created.append(file_path)
+        result.note(file_path, "Documented the Auth0 and session secret environment variables")
+
+    def patch_template(self, root: Path, template_path: Path, result: CodemodResult):
+        path = root / template_path
+        if not path.exists():
+            return
+        content = path.read_text()
+        if "/login" in content or "</body>" not in content:
+            return
+        position = content.rindex("</body>")
+        # Keep the indentation of the closing tag's line
+        line_start = content.rfind("\n", 0, position) + 1
+        result.files[template_path.as_posix()] = content[:line_start] + self.template_block + content[line_start:]
+        result.note(template_path.as_posix(), "Added login and logout links and the logged in user's profile")
+
+
+def match_recipe(index: ProjectIndex) -> Optional[Tuple[Recipe, PythonFileInfo]]:
+    current = RECIPES.get(index.framework)
+    if current is None:
+        return None
+    entrypoint = current.match(index)
+    return (current, entrypoint) if entrypoint is not None else None
+
+
+def apply_recipe(project_path: str, index: ProjectIndex, write: bool = True) -> Optional[CodemodResult]:
+    """Patch the project with the matching recipe; None when no recipe matches."""
+    start = time.perf_counter()
+    matched = match_recipe(index)
+    if matched is None:
+        return None
+    current, entrypoint = matched
+    result = current.plan(project_path, index, entrypoint)
+    # Never write code that doesn't parse
+    for file_path, content in result.files.items():
+        if file_path.endswith(".py"):
+            ast.parse(content, filename=file_path)
+    if write:
+        result.write(project_path)
+    result.duration = time.perf_counter() - start
+    return result
@@ -0,0 +1,124 @@
+"""Context compaction and token budgeting for file contents fed to the agents.
+
+Files are delivered as a structural outline by default (imports, decorators,
+class and function signatures with their line numbers) and in full only when
+an agent asks for it. Every delivery is charged to the agent that requested it,
+against the token budget of the task the agent works on.
+"""
+import ast
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional, fall back to a character estimate
+    tiktoken = None
+
+# Files below this size are cheaper to send whole than to outline
+SMALL_FILE_TOKENS = 400
+HEAD_LINES = 40
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    global _encoding
+    if tiktoken is None:
+        return len(text) // 4 + 1
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def _signature(node: ast.AST, lines: list) -> str:
+    # The source of the def line(s) up to the colon, decorators excluded
+    end = node.body[0].lineno - 1 if node.body else node.lineno
+    header = " ".join(line.strip() for line in lines[node.lineno - 1:max(end, node.lineno)])
+    return header.split("#", 1)[0].rstrip()
+
+
+def outline_python(source: str) -> Optional[str]:
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    lines = source.splitlines()
+    out = []
+
+    def visit(body, indent):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)) and not indent:
+                out.append(f"{node.lineno}: {ast.get_source_segment(source, node)}")
+            elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.Expr)) and not indent:
+                segment = ast.get_source_segment(source, node) or ""
+                first_line = segment.splitlines()[0] if segment else ""
+                if isinstance(node, ast.Expr) and not isinstance(node.value, ast.Call):
+                    continue  # docstrings and bare expressions
+                if len(segment.splitlines()) > 1:
+                    first_line += " ..."
+                out.append(f"{node.lineno}: {first_line}")
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                for decorator in node.decorator_list:
+                    out.append(f"{decorator.lineno}: {'    ' * indent}@{ast.get_source_segment(source, decorator)}")
+                out.append(f"{node.lineno}: {'    ' * indent}{_signature(node, lines)}  # lines {node.lineno}-{node.end_lineno}")
+                if isinstance(node, ast.ClassDef):
+                    visit(node.body, indent + 1)
+            elif isinstance(node, ast.If) and not indent:
+                out.append(f"{node.lineno}: {lines[node.lineno - 1].strip()}  # lines {node.lineno}-{node.end_lineno}")
+
+    visit(tree.body, 0)
+    return "\n".join(out)
+
+
+def compact(file_path: str, content: str) -> str:
+    """Outline of ``content``, or the content itself when it is small."""
+    if count_tokens(content) <= SMALL_FILE_TOKENS:
+        return content
+    lines = content.splitlines()
+    outline = outline_python(content) if file_path.endswith(".py") else None
+    if outline is None:
+        outline = "\n".join(f"{number}: {line}" for number, line in enumerate(lines[:HEAD_LINES], 1))
+        if len(lines) > HEAD_LINES:
+            outline += f"\n... {len(lines) - HEAD_LINES} more lines"
+    return (
+        f"OUTLINE of {file_path} ({len(lines)} lines). "
+        "Ask for full=true or a line range to read the bodies you need.\n" + outline
+    )
+
+
+class TokenLedger:
+    """Per-agent accounting of the tokens delivered by tools, with per-task budgets."""
+
+    def __init__(self):
+        self.budgets: Dict[str, Optional[int]] = {}
+        self.delivered = defaultdict(int)
+        self.saved = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def set_budget(self, owner: str, budget: Optional[int]):
+        self.budgets[owner] = budget
+
+    def remaining(self, owner: str) -> Optional[int]:
+        budget = self.budgets.get(owner)
+        if budget is None:
+            return None
+        return max(0, budget - self.delivered[owner])
+
+    def charge(self, owner: str, text: str, full_tokens: int = 0) -> str:
+        """Record delivery of ``text`` to ``owner``, truncating it to the remaining budget."""
+        with self._lock:
+            tokens = count_tokens(text)
+            remaining = self.remaining(owner)
+            if remaining is not None and tokens > remaining:
+                if remaining == 0:
+                    return (
+                        "Token budget for this task is exhausted. "
+                        "Finish the task with the information you already have."
+                    )
+                # Tokens are roughly proportional to characters
+                text = text[:len(text) * remaining // tokens] + "\n... truncated, token budget for this task reached"
+                tokens = remaining
+            self.delivered[owner] += tokens
+            self.saved[owner] += max(0, full_tokens - tokens)
+            return text
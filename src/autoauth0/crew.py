@@ -1,172 +1,553 @@
-from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import (
-    DirectoryReadTool, 
-    FileReadTool, 
-    FileWriterTool,
-    # CodeDocsSearchTool,  # Not needed for now
-    SerperDevTool,
-    ScrapeWebsiteTool
-)
 from pathlib import Path
-import yaml
-from langchain.chat_models import ChatOpenAI
-
-# If you want to run a snippet of code before or after the crew starts,
-# you can use the @before_kickoff and @after_kickoff decorators
-# https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
-
-@CrewBase
-class CodebaseAnalysisCrew:
-    """Crew for analyzing codebase for Auth0 integration"""
-    agents_config = 'config/agents.yaml'
-    tasks_config = 'config/tasks.yaml'
-    
-    def __init__(self, project_path: str = None):
-        super().__init__()
+from typing import TYPE_CHECKING, Iterator, List
+import json
+import threading
+import time
+
+from autoauth0.checkpoint import Checkpoint, CheckpointStore, CheckpointWriter, new_run_id
+from autoauth0.codemod import apply_recipe
+from autoauth0.dag import MODES, run_dag, sink_tasks, task_dependencies
+from autoauth0.events import Event, EventStream, FileWritten, RunFinished, TaskOutput, ValidationFinding
+from autoauth0.fanout import MAX_WORKERS, FileGroup, merge_reports, merge_versions, plan_file_groups
+from autoauth0.heuristics import scan_paths
+from autoauth0.instrumentation import Tracer
+from autoauth0.incremental import AnalysisState, AnalysisStateStore, extract_json, hash_project_files
+from autoauth0.memory import project_namespace
+from autoauth0.overlay import Overlay
+from autoauth0.planner import ThroughputStore
+from autoauth0.prescan import scan_project
+
+if TYPE_CHECKING:
+    # crewai, langchain and the tools are only imported once a run needs the LLM crew
+    from crewai import Crew, Task
+    from autoauth0.analysis_crew import CodebaseAnalysisCrew
+
+
+class AutoAuth0Crew:
+    MODES = MODES
+
+    def __init__(
+        self,
+        project_path: str,
+        use_index: bool = True,
+        step_callback=None,
+        use_cache: bool = True,
+        knowledge_path: str = "knowledge",
+        mode: str = "hierarchical",
+        rate_limiter=None,
+        incremental: bool = False,
+        state_store: AnalysisStateStore = None,
+        trace_path: str = None,
+        fast_path: bool = True,
+        verbose: bool = True,
+        resume: str = None,
+        checkpoint_store: CheckpointStore = None,
+        transactional: bool = True,
+        preview: bool = False,
+        model_override: str = None,
+        memory: bool = False,
+        fan_out: bool = True,
+        throughput_store: ThroughputStore = None
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {', '.join(self.MODES)}")
         self.project_path = project_path
-        # Initialize GPT-4 with temperature 0.0 for most deterministic outputs
-        self.llm = ChatOpenAI(
-            model="gpt-4",
-            temperature=0.0
-        )
+        self.use_index = use_index
+        self.step_callback = step_callback
+        self.use_cache = use_cache
+        self.knowledge_path = knowledge_path
+        self.mode = mode
+        self.rate_limiter = rate_limiter
+        self.incremental = incremental
+        self.state_store = state_store or AnalysisStateStore()
+        self.trace_path = trace_path
+        self.fast_path = fast_path
+        self.verbose = verbose
+        self.resume = resume
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
+        self.run_id = resume or new_run_id()
+        # Writes are staged and only committed to the project once validation passes
+        self.overlay = Overlay(project_path) if transactional or preview else None
+        self.preview = preview
+        self.model_override = model_override
+        self.memory = memory
+        # The dag and parallel modes integrate independent groups of files concurrently
+        self.fan_out = fan_out
+        # Each run's measured model throughput, what plans estimate wall times from
+        self.throughput_store = throughput_store or ThroughputStore()
+        self.diff = ""
+        self.committed_files = []
+        self.tracer = Tracer()
+        self.events = None
+        self.checkpoint = None
+        self.checkpoint_writer = None
+        self.project_index = None
+        self.cache = None
+        self.analysis_crew = None
+        self.previous_state = None
+        self.changes = None
+        self.security_scan = None
+        self.codemod = None
+        self.task_timings = {}
+        self.token_usage = {}
+        self.model_usage = {}
+        self.escalations = []
+        self.repairs = []
+        self.memory_stats = None
+        self.merge_conflicts = []
     
-    @agent
-    def manager_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['manager_agent'],
-            allow_delegation=True,
-            verbose=True,
-            llm=self.llm
-        )
-    
-    @agent
-    def requirements_analysis_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['requirements_analysis_agent'],
-            allow_delegation=False,
-            tools=[
-                DirectoryReadTool(directory=self.project_path),
-                FileReadTool()
-            ],
-            verbose=True,
-            llm=self.llm
-        )
-    
-    @agent
-    def codebase_analysis_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['codebase_analysis_agent'],
-            allow_delegation=False,
-            tools=[
-                DirectoryReadTool(directory=self.project_path),
-                FileReadTool()
-            ],
-            verbose=True,
-            llm=self.llm
-        )
+    def run(self):
+        self.start_checkpoint()
+        if self.checkpoint.result is not None:
+            # The resumed run had already finished
+            return self.checkpoint.result
+        result = self._run()
+        self.checkpoint_writer.record_result(str(result))
+        return result
 
-    @agent
-    def auth0_integration_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['auth0_integration_agent'],
-            allow_delegation=False,
-            tools=[
-                DirectoryReadTool(directory=self.project_path),
-                FileReadTool(),
-                FileWriterTool(),
-                # CodeDocsSearchTool(),  # Not needed for now
-                SerperDevTool(),
-                ScrapeWebsiteTool()
-            ],
-            verbose=True,
-            llm=self.llm
-        )
+    def _run(self):
+        if self.incremental:
+            self.previous_state = self.state_store.load(self.project_path)
+            if self.previous_state is not None:
+                self.changes = self.previous_state.diff(hash_project_files(self.project_path))
+                if not self.changes:
+                    # Nothing changed since the last run, its report still holds
+                    return json.dumps(self.previous_state.report, indent=2)
+        if self.use_index:
+            with self.tracer.span("stage", "prescan"):
+                self.project_index = scan_project(self.project_path)
+        if self.fast_path and self.resume is None:
+            result = self.run_fast_path()
+            if result is not None:
+                self.finish_transaction(result)
+                if self.trace_path:
+                    self.tracer.export(self.trace_path)
+                return result
+        if self.use_cache:
+            from autoauth0.cache import ResponseCache, fingerprint_paths
 
-    @agent
-    def validation_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['validation_agent'],
-            allow_delegation=False,
-            tools=[
-                DirectoryReadTool(directory=self.project_path),
-                FileReadTool()
-            ],
-            verbose=True,
-            llm=self.llm
-        )
-    
-    @task
-    def analyze_requirements(self) -> Task:
-        return Task(
-            config=self.tasks_config['analyze_requirements_task'],
-            agent=self.requirements_analysis_agent(),
-            context=[{
-                "description": "Analyze Auth0 integration requirements from documentation",
-                "expected_output": "A structured JSON report containing Auth0 integration requirements and configurations",
-                "project_path": self.project_path
-            }]
-        )
-    
-    @task
-    def analyze_codebase(self) -> Task:
-        return Task(
-            config=self.tasks_config['analyze_codebase_task'],
-            agent=self.codebase_analysis_agent(),
-            context=[{
-                "description": "Analyze the codebase to identify files that need Auth0 integration",
-                "expected_output": "A structured JSON report containing files to modify and framework considerations",
-                "project_path": self.project_path
-            }]
-        )
+            inputs_digest = fingerprint_paths([self.project_path, self.knowledge_path])
+            self.cache = ResponseCache(inputs_digest=inputs_digest)
+        if self.mode == "dag" or self.checkpoint.tasks:
+            # A resumed run goes through the DAG, which can skip the tasks that already finished
+            result = self.run_dag()
+        elif self.mode == "parallel":
+            result = self.run_parallel_analysis()
+        else:
+            result = self.run_codebase_analysis()
+        self.finish_transaction(result)
+        self.token_usage = self.analysis_crew.token_usage()
+        self.model_usage = dict(self.analysis_crew.model_usage)
+        self.escalations = list(self.analysis_crew.escalations)
+        self.repairs = list(self.analysis_crew.repairs)
+        self.throughput_store.record(self.model_usage)
+        if self.analysis_crew.memory_store is not None:
+            self.memory_stats = self.analysis_crew.memory_store.stats(project_namespace(self.project_path))
+        if self.trace_path:
+            self.tracer.export(self.trace_path)
+        # A rolled back or previewed integration isn't in the project, the next run has to redo it
+        if self.incremental and (self.overlay is None or self.committed_files):
+            self.save_analysis_state()
+        return result
 
-    @task
-    def integrate_auth0(self) -> Task:
-        return Task(
-            config=self.tasks_config['integrate_auth0_task'],
-            agent=self.auth0_integration_agent(),
-            context=[{
-                "description": "Implement Auth0 integration based on analysis from requirements and codebase analysis",
-                "expected_output": "Modified code files with Auth0 integration",
-                "project_path": self.project_path
-            }]
-        )
+    def start_checkpoint(self):
+        if self.checkpoint is not None:
+            return
+        project_path = Path(self.project_path).resolve()
+        if self.resume is None:
+            self.checkpoint = Checkpoint(run_id=self.run_id, project_path=str(project_path), mode=self.mode)
+        else:
+            self.checkpoint = self.checkpoint_store.load(self.resume)
+            if Path(self.checkpoint.project_path) != project_path:
+                raise ValueError(f"Run {self.resume!r} was for {self.checkpoint.project_path}, not {self.project_path}")
+        if self.overlay is not None:
+            self.overlay.load(self.checkpoint.staged)
+        self.checkpoint_writer = CheckpointWriter(self.checkpoint_store, self.checkpoint, overlay=self.overlay)
+        self.tracer.listeners.append(self.checkpoint_writer)
 
-    @task
-    def validate_integration(self) -> Task:
-        return Task(
-            config=self.tasks_config['validate_integration_task'],
-            agent=self.validation_agent(),
-            context=[{
-                "description": "Validate Auth0 integration for security and correctness. If issues are found, provide detailed feedback for the integration agent to fix.",
-                "expected_output": "Validation report with security assessment and any issues that need to be addressed",
-                "project_path": self.project_path
-            }]
-        )
+    def finish_transaction(self, result):
+        """Commit the staged writes if validation passed, discard them if it failed"""
+        if self.overlay is None:
+            return
+        self.diff = self.overlay.diff()
+        if self.preview:
+            return
+        if self.validation_failed(result):
+            self.overlay.rollback()
+        else:
+            self.committed_files = self.overlay.commit()
+            for file_path in self.committed_files:
+                self.emit(FileWritten(file_path=file_path))
+        self.checkpoint_writer.record_commit()
+
+    def on_task_output(self, task_name: str, output):
+        # The raw output, str() of a typed output is the model's repr
+        self.record_task(task_name, output.raw)
+        self.emit_task_output(task_name, output)
+
+    def record_task(self, task_name: str, output: str):
+        token_usage = self.analysis_crew.token_usage() if self.analysis_crew is not None else {}
+        self.checkpoint_writer.record_task(task_name, output, token_usage)
     
-    @crew
-    def crew(self) -> Crew:
-        return Crew(
-            agents=[
-                self.requirements_analysis_agent(),
-                self.codebase_analysis_agent(),
-                self.auth0_integration_agent(),
-                self.validation_agent()
-            ],
-            tasks=self.tasks,
-            process=Process.hierarchical,
-            manager_agent=self.manager_agent(),
-            verbose=True
+    def stream(self) -> Iterator[Event]:
+        """Run in a background thread and yield typed events as they happen.
+
+        Task outputs are yielded as soon as each task is done, so a consumer can
+        start on them before validation completes. The last event is
+        ``RunFinished``; an exception raised by the run is re-raised here.
+        """
+        self.events = EventStream(staged_writes=self.overlay is not None)
+        self.tracer.listeners.append(self.events)
+        errors = []
+
+        def target():
+            try:
+                self.events.emit(RunFinished(result=str(self.run())))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                self.events.close()
+
+        thread = threading.Thread(target=target, name="autoauth0-run", daemon=True)
+        thread.start()
+        try:
+            yield from self.events
+        finally:
+            thread.join()
+            self.tracer.listeners.remove(self.events)
+        if errors:
+            raise errors[0]
+
+    def emit(self, event: Event):
+        if self.events is not None:
+            self.events.emit(event)
+
+    def emit_task_output(self, task_name: str, output):
+        if self.events is not None:
+            self.events.emit_task_output(task_name, output)
+
+    def emit_findings(self):
+        for finding in self.security_scan.findings:
+            self.emit(ValidationFinding(
+                severity=finding.severity,
+                file_path=finding.file_path,
+                description=finding.description,
+                recommendation=finding.recommendation,
+                line=finding.line,
+                rule_id=finding.rule_id
+            ))
+
+    def inputs(self) -> dict:
+        if self.project_index is None:
+            project_index = "Not available, explore the project with your tools."
+        else:
+            project_index = self.project_index.to_context()
+        if self.changes is None:
+            changed_files = "All files of the project."
+        else:
+            changed_files = (
+                "Only the files below are new or changed since the last run, analyze and modify only these. "
+                "The analysis of every other file from the last run is still valid and is reused.\n"
+                + "\n".join(self.changes.changed)
+            )
+        if self.security_scan is None:
+            heuristic_report = (
+                "Not available yet. Run the Heuristic Security Scanner tool on the project first "
+                "and only read the files it lists in files_to_review."
+            )
+        else:
+            heuristic_report = self.security_scan.to_context()
+        return {
+            "project_path": self.project_path,
+            "project_index": project_index,
+            "changed_files": changed_files,
+            "heuristic_report": heuristic_report
+        }
+
+    def build_analysis_crew(self) -> "CodebaseAnalysisCrew":
+        from autoauth0.analysis_crew import CodebaseAnalysisCrew
+
+        self.analysis_crew = CodebaseAnalysisCrew(
+            self.project_path,
+            step_callback=self.step_callback,
+            cache=self.cache,
+            rate_limiter=self.rate_limiter,
+            tracer=self.tracer,
+            verbose=self.verbose,
+            task_callback=self.on_task_output,
+            overlay=self.overlay,
+            model_override=self.model_override,
+            memory=self.memory,
+            knowledge_path=self.knowledge_path
         )
+        return self.analysis_crew
 
-class AutoAuth0Crew:
-    def __init__(self, project_path: str):
-        self.project_path = project_path
-    
-    def run(self):
-        analysis = self.run_codebase_analysis()
-        return analysis
+    def save_analysis_state(self):
+        output = self.analysis_crew.analyze_codebase().output
+        if output is None:
+            report = None
+        elif output.pydantic is not None:
+            report = output.pydantic.model_dump()
+        else:
+            report = extract_json(output.raw)
+        if report is None:
+            # Without a usable report the next run has to start from scratch
+            return
+        if self.previous_state is not None:
+            report = self.previous_state.merge_report(report, self.changes)
+        # Hash after the run so the integration's own edits don't count as changes next time
+        self.state_store.save(AnalysisState(
+            project_path=self.project_path,
+            file_hashes=hash_project_files(self.project_path),
+            report=report
+        ))
     
+    def run_fast_path(self):
+        """Patch the project with a codemod recipe and validate it, without any LLM call.
+
+        Returns None when no recipe matches the project or the recipe fails on
+        it, the project then goes through the crew.
+        """
+        project_index = self.project_index or scan_project(self.project_path)
+        try:
+            with self.tracer.span("stage", "codemod"):
+                self.codemod = apply_recipe(self.project_path, project_index, write=self.overlay is None)
+                if self.codemod is not None and self.overlay is not None:
+                    for file_path, content in self.codemod.files.items():
+                        self.overlay.write(Path(self.project_path) / file_path, content)
+        except Exception:
+            # The codemod span keeps the error; nothing of the recipe is staged for the crew to see
+            if self.overlay is not None:
+                self.overlay.rollback()
+            self.codemod = None
+            return None
+        if self.codemod is None:
+            return None
+        for file_path in self.codemod.files:
+            self.emit(FileWritten(file_path=file_path, staged=self.overlay is not None))
+        integration_report = self.codemod.to_report()
+        self.emit(TaskOutput(task="integrate_auth0_task", output=integration_report, raw=json.dumps(integration_report)))
+        with self.tracer.span("stage", "heuristic_scan"):
+            self.security_scan = scan_paths(self.project_path, files=list(self.codemod.files), overlay=self.overlay)
+        self.emit_findings()
+        validation_report = self.security_scan.to_report()
+        self.emit(TaskOutput(task="validate_integration_task", output=validation_report, raw=json.dumps(validation_report)))
+        self.task_timings = {
+            "codemod": {"start": 0.0, "end": self.codemod.duration, "duration": self.codemod.duration},
+            "heuristic_scan": {
+                "start": self.codemod.duration,
+                "end": self.codemod.duration + self.security_scan.duration,
+                "duration": self.security_scan.duration
+            }
+        }
+        return json.dumps({**integration_report, **validation_report}, indent=2)
+
     def run_codebase_analysis(self):
-        crew = CodebaseAnalysisCrew(self.project_path).crew()
-        return crew.kickoff()
+        crew = self.build_analysis_crew().crew()
+        return crew.kickoff(inputs=self.inputs()).raw
+
+    def run_parallel_analysis(self):
+        """Run both analysis tasks concurrently, then integration and validation on their joined outputs"""
+        return self.run_dag(consult_manager=False)
+
+    def run_dag(self, consult_manager: bool = True):
+        """Run the tasks.yaml task DAG without the manager agent.
+
+        Each task gets the outputs of its dependencies as context and starts as
+        soon as they are done. The manager is only consulted when validation fails.
+        """
+        from crewai.tasks.task_output import TaskOutput as CrewTaskOutput
+
+        analysis_crew = self.build_analysis_crew()
+        dependencies = task_dependencies(analysis_crew.tasks_config)
+        tasks = {name: analysis_crew.task_for(name) for name in dependencies}
+        for name, deps in dependencies.items():
+            if deps:
+                tasks[name].context = [tasks[dep] for dep in deps]
+        checkpoint = self.checkpoint
+        for name, task in tasks.items():
+            if checkpoint.completed(name):
+                # Restored so the remaining tasks get it as context
+                task.output = CrewTaskOutput(
+                    description=task.description,
+                    raw=checkpoint.output(name),
+                    pydantic=analysis_crew.typed_output(name, checkpoint.output(name)),
+                    agent=task.agent.role
+                )
+
+        self.task_timings = {}
+        started = time.perf_counter()
+
+        def run_task(name):
+            if checkpoint.completed(name):
+                return checkpoint.output(name)
+            if name == "validate_integration_task":
+                return self.run_validation(analysis_crew, tasks[name], started)
+            if name == "integrate_auth0_task" and self.fan_out:
+                result = self.run_fan_out(analysis_crew, tasks, started)
+                if result is not None:
+                    return result
+            return self._run_task(analysis_crew, name.removesuffix("_task"), tasks[name], started)
+
+        results = run_dag(dependencies, run_task)
+        result = results[sink_tasks(dependencies)[-1]]
+        if consult_manager and self.validation_failed(result):
+            self._run_crew(
+                analysis_crew.resolution_crew(),
+                "resolve_validation_failure",
+                started,
+                validation_report=str(result)
+            )
+            result = self.run_validation(analysis_crew, tasks["validate_integration_task"], started)
+        return result
+
+    @staticmethod
+    def codebase_report(analysis_crew: "CodebaseAnalysisCrew") -> dict:
+        output = analysis_crew.analyze_codebase().output
+        if output is None:
+            return {}
+        if output.pydantic is not None:
+            return output.pydantic.model_dump()
+        return extract_json(output.raw) or {}
+
+    def run_fan_out(self, analysis_crew: "CodebaseAnalysisCrew", tasks: dict, started: float):
+        """Integrate every group of coupled files in a worker of its own, then merge their writes.
+
+        Returns None when there aren't several groups, or no overlay to stage
+        the workers' writes in: the integration then runs as a single task.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from crewai.tasks.task_output import TaskOutput as CrewTaskOutput
+
+        codebase_report = self.codebase_report(analysis_crew)
+        groups = plan_file_groups(codebase_report.get("files_to_modify"))
+        if len(groups) < 2 or self.overlay is None:
+            return None
+        framework = codebase_report.get("framework_considerations")
+        start = time.perf_counter() - started
+
+        def run_group(group: FileGroup):
+            branch = self.overlay.branch()
+            task = analysis_crew.integrate_file_group(analysis_crew.integration_worker(branch))
+            result = self._run_crew(
+                analysis_crew.stage_crew([task]),
+                f"integrate_auth0[{group.index}]",
+                started,
+                file_group="\n".join(group.files),
+                file_group_analysis=json.dumps(
+                    {"files_to_modify": group.entries, "framework_considerations": framework}, indent=2
+                )
+            )
+            return branch, extract_json(str(result)) or {}
+
+        with ThreadPoolExecutor(max_workers=min(len(groups), MAX_WORKERS), thread_name_prefix="integrate") as pool:
+            outcomes = list(pool.map(run_group, groups))
+
+        # Groups in order, so a conflict keeps the edit of the group listed first
+        versions = {}
+        for group, (branch, _) in zip(groups, outcomes):
+            for path, content in branch.staged().items():
+                versions.setdefault(path, []).append((group.name, content))
+        self.merge_conflicts = []
+        for path, file_versions in versions.items():
+            base = self.overlay.read_text(path) if self.overlay.exists(path) else ""
+            merged, conflicts = merge_versions(self.overlay.display_path(Path(path)), base, file_versions)
+            self.overlay.write(path, merged)
+            self.checkpoint_writer.record_write(path)
+            self.merge_conflicts += conflicts
+        report = merge_reports([report for _, report in outcomes], self.merge_conflicts)
+
+        end = time.perf_counter() - started
+        self.task_timings["integrate_auth0"] = {"start": start, "end": end, "duration": end - start}
+        raw = json.dumps(report, indent=2)
+        integration = tasks["integrate_auth0_task"]
+        # Validation gets the merged report as context, as if the task had run
+        integration.output = CrewTaskOutput(
+            description=integration.description,
+            raw=raw,
+            pydantic=analysis_crew.typed_output("integrate_auth0_task", raw),
+            agent=integration.agent.role
+        )
+        self.on_task_output("integrate_auth0_task", integration.output)
+        return raw
+
+    def written_files(self) -> List[str]:
+        """Files the integration wrote or staged, relative to the project.
+
+        Validation only scans these: a finding in a file the integration didn't
+        touch isn't the integration's, and mustn't roll it back.
+        """
+        root = Path(self.project_path).resolve()
+        if self.overlay is not None:
+            paths = self.overlay.staged_files()
+        else:
+            paths = [Path(path).resolve() for path in self.checkpoint.files]
+        return sorted({path.relative_to(root).as_posix() for path in paths if root in path.parents})
+
+    @staticmethod
+    def validation_failed(result) -> bool:
+        report = extract_json(str(result)) or {}
+        status = report.get("validation_results", {}).get("overall_status", "")
+        return str(status).lower() == "failed"
+
+    def run_validation(self, analysis_crew: "CodebaseAnalysisCrew", validation: "Task", started: float):
+        """Validate with the heuristic scanner, the validation agent only reviews the files it can't decide on"""
+        scan_start = time.perf_counter() - started
+        with self.tracer.span("stage", "heuristic_scan"):
+            self.security_scan = scan_paths(self.project_path, files=self.written_files(), overlay=self.overlay)
+        self.task_timings["heuristic_scan"] = {
+            "start": scan_start,
+            "end": scan_start + self.security_scan.duration,
+            "duration": self.security_scan.duration
+        }
+        self.emit_findings()
+        if not self.security_scan.ambiguous_files:
+            report = self.security_scan.to_report()
+            self.record_task("validate_integration_task", json.dumps(report, indent=2))
+            self.emit(TaskOutput(task="validate_integration_task", output=report, raw=json.dumps(report)))
+            return json.dumps(report, indent=2)
+        return self._run_task(analysis_crew, "validate_integration", validation, started)
+
+    def _run_task(self, analysis_crew: "CodebaseAnalysisCrew", name: str, task: "Task", started: float):
+        return self._run_crew(analysis_crew.stage_crew([task]), name, started)
+
+    def _run_crew(self, crew: "Crew", name: str, started: float, **extra_inputs):
+        start = time.perf_counter() - started
+        result = crew.kickoff(inputs={**self.inputs(), **extra_inputs}).raw
+        end = time.perf_counter() - started
+        self.task_timings[name] = {"start": start, "end": end, "duration": end - start}
+        return result
+
+    def format_timings(self) -> str:
+        lines = [f"{'task':<28}{'start':>9}{'end':>9}{'duration':>10}"]
+        for name, timing in sorted(self.task_timings.items(), key=lambda item: item[1]["start"]):
+            lines.append(
+                f"{name:<28}{timing['start']:>8.1f}s{timing['end']:>8.1f}s{timing['duration']:>9.1f}s"
+            )
+        return "\n".join(lines)
+
+    def format_token_usage(self) -> str:
+        lines = [f"{'agent':<30}{'prompt':>9}{'completion':>12}{'requests':>10}{'file':>8}{'saved':>8}{'budget':>8}"]
+        for name, usage in self.token_usage.items():
+            budget = usage['file_token_budget'] if usage['file_token_budget'] is not None else '-'
+            lines.append(
+                f"{name:<30}{usage['prompt_tokens']:>9}{usage['completion_tokens']:>12}{usage['llm_requests']:>10}"
+                f"{usage['file_tokens']:>8}{usage['file_tokens_saved']:>8}{budget:>8}"
+            )
+        return "\n".join(lines)
+
+    def format_model_usage(self) -> str:
+        lines = [f"{'model':<30}{'prompt':>9}{'completion':>12}{'requests':>10}"]
+        for model, usage in sorted(self.model_usage.items()):
+            lines.append(
+                f"{model:<30}{usage['prompt_tokens']:>9}{usage['completion_tokens']:>12}{usage['llm_requests']:>10}"
+            )
+        for repair in self.repairs:
+            status = "repaired" if repair['repaired'] else "repair failed"
+            lines.append(f"{status} {repair['task']}: {repair['errors'][0]}")
+        for escalation in self.escalations:
+            lines.append(
+                f"escalated {escalation['task']} from {escalation['from']} to {escalation['to']}: "
+                f"{escalation['errors'][0]}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,80 @@
+"""Static task DAG built from the ``depends_on`` lists in ``config/tasks.yaml``.
+
+Tasks that declare ``depends_on`` (an empty list for roots) form the DAG; the
+scheduler starts every task as soon as all of its dependencies are done, so
+independent tasks run concurrently and no manager LLM call is spent on
+deciding an order that is already known.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+# Execution modes of AutoAuth0Crew, kept here so the CLI can offer them without importing crewai
+MODES = ("hierarchical", "parallel", "dag")
+
+
+def task_dependencies(tasks_config: Dict[str, dict]) -> Dict[str, List[str]]:
+    """Dependencies of the DAG tasks, in ``tasks.yaml`` order; raises ``ValueError`` if they are not a DAG."""
+    dependencies = {
+        name: list(config["depends_on"] or [])
+        for name, config in tasks_config.items()
+        if "depends_on" in config
+    }
+    for name, deps in dependencies.items():
+        unknown = [dep for dep in deps if dep not in dependencies]
+        if unknown:
+            raise ValueError(f"Task {name!r} depends on unknown task(s): {', '.join(unknown)}")
+    topological_order(dependencies)
+    return dependencies
+
+
+def topological_order(dependencies: Dict[str, List[str]]) -> List[str]:
+    order = []
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Task dependencies contain a cycle: {', '.join(sorted(remaining))}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+
+def sink_tasks(dependencies: Dict[str, List[str]]) -> List[str]:
+    """Tasks no other task depends on, i.e. the final outputs of the DAG"""
+    required = {dep for deps in dependencies.values() for dep in deps}
+    return [name for name in dependencies if name not in required]
+
+
+def run_dag(
+    dependencies: Dict[str, List[str]],
+    run_task: Callable[[str], Any],
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """Run ``run_task(name)`` for every task once its dependencies are done.
+
+    The first exception stops the scheduling of new tasks and is re-raised
+    once the running ones have finished.
+    """
+    results = {}
+    pending = {name: set(deps) for name, deps in dependencies.items()}
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(dependencies))) as pool:
+        running = {}
+        while pending or running:
+            for name in [name for name, deps in pending.items() if not deps]:
+                del pending[name]
+                running[pool.submit(run_task, name)] = name
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    pending.clear()
+                    wait(running)
+                    raise error
+                results[name] = future.result()
+                for deps in pending.values():
+                    deps.discard(name)
+    return results
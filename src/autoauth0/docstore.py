@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""Local store for the Auth0 documentation the integration agent looks up.
+
+Scraped pages and web search results are kept in ``db/auth0_docs.sqlite3``
+next to the crew memory store. Pages are chunked and indexed with SQLite FTS5,
+so agents can look up quickstart and SDK snippets locally and only hit the
+network on a miss or once an entry is older than its TTL. With
+``AUTOAUTH0_OFFLINE=1`` the network is never used and stale entries are served,
+which lets the crew run in air-gapped CI after a ``--prefetch``.
+
+Usage:
+    python -m autoauth0.docstore --prefetch [URL ...]
+    python -m autoauth0.docstore --query "flask authlib callback"
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+DEFAULT_DOCSTORE_PATH = Path("db") / "auth0_docs.sqlite3"
+DEFAULT_TTL = 7 * 24 * 3600
+CHUNK_CHARS = 1500
+DEFAULT_URLS = [
+    "https://auth0.com/docs/quickstart/webapp/python",
+    "https://auth0.com/docs/quickstart/webapp/django",
+    "https://auth0.com/docs/quickstart/backend/python",
+    "https://docs.authlib.org/en/latest/client/flask.html",
+]
+
+
+def offline() -> bool:
+    return os.environ.get("AUTOAUTH0_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS) -> List[str]:
+    """Split on blank lines and pack paragraphs into chunks of about ``size`` characters."""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) > size:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+        while len(current) > size * 2:
+            chunks.append(current[:size])
+            current = current[size:]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _fts_query(query: str) -> str:
+    # Quote every term so user input can't be read as FTS5 syntax
+    terms = re.findall(r"\w+", query.lower())
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class DocStore:
+    def __init__(self, path: Path = DEFAULT_DOCSTORE_PATH, ttl: float = DEFAULT_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, content TEXT NOT NULL, fetched_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS searches (query TEXT PRIMARY KEY, results TEXT NOT NULL, fetched_at REAL NOT NULL);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(url UNINDEXED, content);"
+        )
+        self._conn.commit()
+
+    def _fresh(self, fetched_at: float) -> bool:
+        return offline() or time.time() - fetched_at < self.ttl
+
+    def get_page(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT content, fetched_at FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None or not self._fresh(row[1]):
+            return None
+        return row[0]
+
+    def put_page(self, url: str, content: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content, fetched_at) VALUES (?, ?, ?)",
+                (url, content, time.time()),
+            )
+            self._conn.execute("DELETE FROM chunks WHERE url = ?", (url,))
+            self._conn.executemany(
+                "INSERT INTO chunks (url, content) VALUES (?, ?)",
+                [(url, chunk) for chunk in chunk_text(content)],
+            )
+            self._conn.commit()
+
+    def get_search(self, query: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, fetched_at FROM searches WHERE query = ?", (query.strip().lower(),)
+            ).fetchone()
+        if row is None or not self._fresh(row[1]):
+            return None
+        return row[0]
+
+    def put_search(self, query: str, results: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (query, results, fetched_at) VALUES (?, ?, ?)",
+                (query.strip().lower(), results, time.time()),
+            )
+            self._conn.commit()
+
+    def lookup(self, query: str, k: int = 5) -> List[dict]:
+        """Best matching chunks for ``query``, ranked by BM25"""
+        fts_query = _fts_query(query)
+        if not fts_query:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, content FROM chunks WHERE chunks MATCH ? ORDER BY bm25(chunks) LIMIT ?",
+                (fts_query, k),
+            ).fetchall()
+        return [{"url": url, "content": content} for url, content in rows]
+
+    def stats(self) -> dict:
+        with self._lock:
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            searches = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+            chunks = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        return {"pages": pages, "searches": searches, "chunks": chunks}
+
+
+def prefetch(store: DocStore, urls: List[str]):
+    from crewai_tools import ScrapeWebsiteTool
+
+    scraper = ScrapeWebsiteTool()
+    for url in urls:
+        try:
+            store.put_page(url, scraper.run(website_url=url))
+            print(f"fetched {url}")
+        except Exception as e:
+            print(f"failed {url}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=str(DEFAULT_DOCSTORE_PATH))
+    parser.add_argument("--prefetch", nargs="*", metavar="URL", help="fetch the default Auth0 pages, or the given ones")
+    parser.add_argument("--query", help="look up a query in the local store")
+    args = parser.parse_args(argv)
+
+    store = DocStore(args.path)
+    if args.prefetch is not None:
+        prefetch(store, args.prefetch or DEFAULT_URLS)
+    if args.query:
+        print(json.dumps(store.lookup(args.query), indent=2))
+    print(store.stats())
+
+
+if __name__ == "__main__":
+    main()
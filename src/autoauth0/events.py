@@ -0,0 +1,161 @@
+"""Typed progress events streamed from ``AutoAuth0Crew.stream``.
+
+The ``EventStream`` is a thread-safe queue the crew and the tracer push events
+into while the run goes on in a background thread, so a consumer can act on a
+task's output or a written file before the whole crew is done, without parsing
+verbose agent logs. Task and tool events are derived from the tracer's spans;
+task outputs, written files and validation findings are emitted by the crew.
+In a transactional run a write is first reported as staged, and reported again
+once the overlay is committed to the project.
+"""
+import queue
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator, Optional
+
+from autoauth0.incremental import extract_json
+from autoauth0.instrumentation import Span, written_file
+
+
+@dataclass
+class Event:
+    kind = "event"
+    timestamp: float = field(default_factory=time.time, init=False)
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, **asdict(self)}
+
+
+@dataclass
+class TaskStarted(Event):
+    kind = "task_started"
+    task: str = ""
+    agent: Optional[str] = None
+    delegated: bool = False
+    retry: bool = False
+
+
+@dataclass
+class TaskFinished(Event):
+    kind = "task_finished"
+    task: str = ""
+    agent: Optional[str] = None
+    duration: float = 0.0
+    status: str = "ok"
+
+
+@dataclass
+class TaskOutput(Event):
+    """The output of a ``tasks.yaml`` task; ``output`` is its JSON report when it has one"""
+    kind = "task_output"
+    task: str = ""
+    output: Optional[dict] = None
+    raw: str = ""
+
+
+@dataclass
+class ToolCall(Event):
+    kind = "tool_call"
+    tool: str = ""
+    agent: Optional[str] = None
+    duration: float = 0.0
+    status: str = "ok"
+
+
+@dataclass
+class StageFinished(Event):
+    """A step of the run that doesn't involve an agent, e.g. the pre-scan"""
+    kind = "stage_finished"
+    stage: str = ""
+    duration: float = 0.0
+    status: str = "ok"
+
+
+@dataclass
+class FileWritten(Event):
+    """``staged`` while the write is only in the run's overlay, not yet in the project"""
+    kind = "file_written"
+    file_path: str = ""
+    staged: bool = False
+
+
+@dataclass
+class ValidationFinding(Event):
+    kind = "validation_finding"
+    severity: str = ""
+    file_path: str = ""
+    description: str = ""
+    recommendation: str = ""
+    line: Optional[int] = None
+    rule_id: Optional[str] = None
+    source: str = "heuristics"
+
+
+@dataclass
+class RunFinished(Event):
+    kind = "run_finished"
+    result: str = ""
+
+
+_CLOSED = object()
+
+
+class EventStream:
+    """Queue of events, also a ``Tracer`` listener turning spans into events
+
+    ``staged_writes`` marks the files written by tools as staged, for runs whose
+    file writer stages into an overlay.
+    """
+
+    def __init__(self, staged_writes: bool = False):
+        self.staged_writes = staged_writes
+        self._queue = queue.Queue()
+
+    def emit(self, event: Event):
+        self._queue.put(event)
+
+    def close(self):
+        self._queue.put(_CLOSED)
+
+    def __iter__(self) -> Iterator[Event]:
+        while True:
+            event = self._queue.get()
+            if event is _CLOSED:
+                return
+            yield event
+
+    def emit_task_output(self, task: str, task_output: Any):
+        """``task_output`` is a crewai TaskOutput, typed when the task has an output model, or raw text"""
+        raw = str(getattr(task_output, "raw", task_output))
+        typed = getattr(task_output, "pydantic", None)
+        output = typed.model_dump() if typed is not None else extract_json(raw)
+        self.emit(TaskOutput(task=task, output=output, raw=raw))
+        if task == "validate_integration_task" and output:
+            for issue in output.get("validation_results", {}).get("issues_found", []):
+                self.emit(ValidationFinding(
+                    severity=str(issue.get("severity", "")),
+                    file_path=str(issue.get("file_path") or ""),
+                    description=str(issue.get("description", "")),
+                    recommendation=str(issue.get("recommendation", "")),
+                    source="validation_agent"
+                ))
+
+    def on_span_start(self, span: Span):
+        if span.kind == "task":
+            self.emit(TaskStarted(
+                task=span.name,
+                agent=span.agent,
+                delegated=bool(span.attributes.get("delegated")),
+                retry=bool(span.attributes.get("retry"))
+            ))
+
+    def on_span_end(self, span: Span):
+        if span.kind == "task":
+            self.emit(TaskFinished(task=span.name, agent=span.agent, duration=span.duration, status=span.status))
+        elif span.kind == "stage":
+            self.emit(StageFinished(stage=span.name, duration=span.duration, status=span.status))
+        elif span.kind == "tool":
+            self.emit(ToolCall(tool=span.name, agent=span.agent, duration=span.duration, status=span.status))
+            file_path = written_file(span)
+            if file_path is not None:
+                self.emit(FileWritten(file_path=file_path, staged=self.staged_writes))
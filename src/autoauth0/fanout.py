@@ -0,0 +1,236 @@
+"""Fan-out of the integration stage over independent groups of files.
+
+The ``files_to_modify`` of the codebase analysis are grouped by their
+``dependencies``: files that depend on each other, directly or through other
+files, form one group, ordered so a file comes after the files it depends on.
+Every group gets a worker of its own with only its files' analysis as
+context, so the stage takes as long as its largest group instead of all files
+one after another.
+
+Each worker stages its writes in a branch of the run's overlay. The branches
+are merged back with a three-way line merge against the content before the
+fan-out: edits of different lines of a file are combined, insertions at the
+same point, e.g. two workers appending different packages to
+requirements.txt, are concatenated, identical edits are kept once, and
+overlapping replacements are reported as conflicts, keeping the earlier
+group's edit. A Python file whose merge doesn't parse while each version
+does is a conflict too: the later group's edits are dropped.
+"""
+import ast
+import difflib
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Dict, List, Optional, Tuple
+
+MAX_WORKERS = 8
+
+
+@dataclass
+class FileGroup:
+    index: int
+    # Analysis entries of the group's files, dependencies first
+    entries: List[dict] = field(default_factory=list)
+
+    @property
+    def files(self) -> List[str]:
+        return [entry["file_path"] for entry in self.entries]
+
+    @property
+    def name(self) -> str:
+        return f"group {self.index}"
+
+
+@dataclass
+class MergeConflict:
+    file_path: str
+    kept: str
+    dropped: str
+    # 1-based lines of the content before the fan-out both groups edited
+    start_line: int
+    end_line: int
+    # The edits don't overlap but the merged Python file doesn't parse
+    syntax_error: bool = False
+
+    def describe(self) -> str:
+        clash = "don't parse together" if self.syntax_error else "overlap"
+        return (
+            f"Edits of {self.file_path} lines {self.start_line}-{self.end_line} by "
+            f"{self.kept} and {self.dropped} {clash}, kept the edit of {self.kept}"
+        )
+
+
+def _normalized(file_path: str) -> str:
+    return PurePosixPath(str(file_path).replace("\\", "/").removeprefix("./")).as_posix()
+
+
+def _resolve_dependency(dependency: str, paths: List[str]) -> Optional[str]:
+    """The listed file a dependency names, by path, path suffix or unambiguous file name"""
+    dependency = _normalized(dependency)
+    matches = [
+        path for path in paths
+        if path == dependency or path.endswith("/" + dependency) or dependency.endswith("/" + path)
+    ]
+    if not matches:
+        matches = [path for path in paths if PurePosixPath(path).name == PurePosixPath(dependency).name]
+    return matches[0] if len(matches) == 1 else None
+
+
+def plan_file_groups(files_to_modify: List[dict]) -> List[FileGroup]:
+    """Connected components of the files by their ``dependencies``, each in dependency order.
+
+    Dependencies that aren't listed files, e.g. packages, don't couple anything.
+    """
+    entries: Dict[str, dict] = {}
+    for entry in files_to_modify or []:
+        if entry.get("file_path"):
+            entries.setdefault(_normalized(entry["file_path"]), entry)
+    paths = list(entries)
+    depends_on = {
+        path: [
+            resolved for resolved in (
+                _resolve_dependency(dependency, paths) for dependency in entries[path].get("dependencies") or []
+            )
+            if resolved is not None and resolved != path
+        ]
+        for path in paths
+    }
+
+    parent = {path: path for path in paths}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for path, dependencies in depends_on.items():
+        for dependency in dependencies:
+            parent[find(path)] = find(dependency)
+
+    components: Dict[str, List[str]] = {}
+    for path in paths:
+        components.setdefault(find(path), []).append(path)
+
+    groups = []
+    for members in components.values():
+        # Dependencies first, the analysis' order otherwise; a cycle keeps that order
+        remaining = {path: set(depends_on[path]) & set(members) for path in members}
+        ordered = []
+        while remaining:
+            ready = [path for path in members if path in remaining and not remaining[path]]
+            if not ready:
+                ready = [path for path in members if path in remaining][:1]
+            for path in ready:
+                ordered.append(path)
+                del remaining[path]
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+        groups.append(FileGroup(index=len(groups), entries=[{**entries[path], "file_path": path} for path in ordered]))
+    return groups
+
+
+def _edits(base_lines: List[str], lines: List[str]) -> List[Tuple[int, int, List[str]]]:
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    return [(i1, i2, lines[j1:j2]) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def _overlap(a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    # An insertion only clashes with a replacement it falls strictly inside of; next to it, or next
+    # to another insertion, both go in, ordered by their position
+    if a[0] == a[1]:
+        return b[0] < a[0] < b[1]
+    if b[0] == b[1]:
+        return a[0] < b[0] < a[1]
+    return max(a[0], b[0]) < min(a[1], b[1])
+
+
+def _parses(content: str) -> bool:
+    try:
+        ast.parse(content)
+    except (SyntaxError, ValueError):
+        return False
+    return True
+
+
+def _apply(base_lines: List[str], accepted: List[Tuple[int, int, List[str], str]]) -> str:
+    merged = list(base_lines)
+    for start, end, lines, _ in sorted(accepted, key=lambda edit: edit[:2], reverse=True):
+        merged[start:end] = lines
+    return "".join(merged)
+
+
+def merge_versions(file_path: str, base: str, versions: List[Tuple[str, str]]) -> Tuple[str, List[MergeConflict]]:
+    """Three-way merge of the ``(worker, content)`` versions of a file into ``base``"""
+    if base and not base.endswith("\n"):
+        # Otherwise appending to the file replaces its last line in every version
+        base += "\n"
+        versions = [(worker, content if content.endswith("\n") else content + "\n") for worker, content in versions]
+    base_lines = base.splitlines(keepends=True)
+    check_syntax = file_path.endswith(".py") and _parses(base)
+    accepted: List[Tuple[int, int, List[str], str]] = []
+    conflicts = []
+    for worker, content in versions:
+        before = list(accepted)
+        edits = _edits(base_lines, content.splitlines(keepends=True))
+        for start, end, lines in edits:
+            insertion = next(
+                (i for i, edit in enumerate(accepted) if start == end == edit[0] == edit[1]), None
+            )
+            if insertion is not None:
+                # Both inserted at the same point: the earlier group's block first, then the new one whole
+                kept = accepted[insertion]
+                if lines != kept[2]:
+                    accepted[insertion] = (start, end, kept[2] + lines, kept[3])
+                continue
+            clash = next((edit for edit in accepted if _overlap((start, end), edit[:2])), None)
+            if clash is None:
+                accepted.append((start, end, lines, worker))
+            elif clash[:3] != (start, end, lines):
+                start_line = min(start, clash[0]) + 1
+                conflicts.append(MergeConflict(
+                    file_path=file_path,
+                    kept=clash[3],
+                    dropped=worker,
+                    start_line=start_line,
+                    # An insertion edits no line of its own, it's reported at the line it goes before
+                    end_line=max(end, clash[1], start_line)
+                ))
+        if check_syntax and edits and _parses(content) and not _parses(_apply(base_lines, accepted)):
+            accepted = before
+            start_line = min(start for start, _, _ in edits) + 1
+            conflicts.append(MergeConflict(
+                file_path=file_path,
+                kept=", ".join(dict.fromkeys(edit[3] for edit in accepted)) or "the base",
+                dropped=worker,
+                start_line=start_line,
+                end_line=max(max(end for _, end, _ in edits), start_line),
+                syntax_error=True
+            ))
+    return _apply(base_lines, accepted), conflicts
+
+
+def merge_reports(reports: List[dict], conflicts: List[MergeConflict]) -> dict:
+    """One ``integrate_auth0_task`` report from the workers' reports"""
+    modified: Dict[str, dict] = {}
+    issues, recommendations = [], []
+    success = True
+    for report in reports:
+        for entry in report.get("modified_files") or []:
+            file_path = entry.get("file_path")
+            if file_path is None:
+                continue
+            merged = modified.setdefault(_normalized(file_path), {**entry, "changes_made": []})
+            merged["changes_made"] += [change for change in entry.get("changes_made") or []
+                                       if change not in merged["changes_made"]]
+        summary = report.get("integration_summary") or {}
+        success = success and summary.get("success") is not False
+        issues += [issue for issue in summary.get("issues") or [] if issue not in issues]
+        recommendations += [item for item in summary.get("recommendations") or [] if item not in recommendations]
+    return {
+        "modified_files": list(modified.values()),
+        "integration_summary": {
+            "success": success and not conflicts,
+            "issues": issues + [conflict.describe() for conflict in conflicts],
+            "recommendations": recommendations,
+        },
+    }
@@ -0,0 +1,420 @@
+"""Heuristic rule checker for Auth0 integrations.
+
+An AST-based rule engine that produces the ``validate_integration_task`` report
+without any LLM call. Each rule is registered with ``@rule`` and receives a
+``FileContext`` whose nodes are indexed by type during a single walk of the
+tree, so adding rules does not add passes over the code. Rules also declare
+trigger substrings: a file is only parsed, and a rule only run, when one of
+them appears in the source, which keeps most files of a large repo at a
+substring search. Findings a rule can't decide on are marked ``ambiguous``;
+only files with such findings need a review by the validation agent.
+"""
+import ast
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from autoauth0.prescan import SKIP_DIRS
+
+SEVERITIES = ("low", "medium", "high")
+SECRET_NAME = re.compile(r"(secret|passw(or)?d|api_?key|client_?secret|private_?key|access_?token)", re.I)
+REQUEST_SOURCES = ("request.args", "request.form", "request.values", "request.json", "request.headers")
+AUTH_ROUTE_NAMES = {"login", "callback", "logout", "authorize", "signin", "signout"}
+
+
+@dataclass
+class Finding:
+    rule_id: str
+    severity: str
+    file_path: str
+    line: int
+    description: str
+    recommendation: str
+    ambiguous: bool = False
+
+
+@dataclass
+class Rule:
+    rule_id: str
+    check: str
+    triggers: Tuple[str, ...]
+    func: Callable[["FileContext"], Iterable[Finding]]
+
+    def applies_to(self, lowered_source: str) -> bool:
+        return any(trigger in lowered_source for trigger in self.triggers)
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def rule(rule_id: str, check: str, triggers: Tuple[str, ...]):
+    """Register a rule.
+
+    ``check`` is the name used in the ``security_checks`` section of the report,
+    ``triggers`` are lowercase substrings without which the rule can't match.
+    """
+    def decorator(func):
+        RULES[rule_id] = Rule(rule_id=rule_id, check=check, triggers=triggers, func=func)
+        return func
+    return decorator
+
+
+def dotted_name(node: ast.AST) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{dotted_name(node.value)}.{node.attr}"
+    if isinstance(node, ast.Call):
+        return dotted_name(node.func)
+    if isinstance(node, ast.Subscript):
+        return dotted_name(node.value)
+    return ""
+
+
+class FileContext:
+    """A parsed file with its nodes grouped by type."""
+
+    def __init__(self, file_path: str, tree: ast.AST):
+        self.file_path = file_path
+        self.tree = tree
+        self.nodes = defaultdict(list)
+        for node in ast.walk(tree):
+            self.nodes[type(node)].append(node)
+        self.imports = set()
+        for node in self.nodes[ast.Import]:
+            self.imports.update(alias.name for alias in node.names)
+        for node in self.nodes[ast.ImportFrom]:
+            self.imports.update(f"{node.module}.{alias.name}" for alias in node.names)
+        self.names = {node.id for node in self.nodes[ast.Name]}
+        self.uses_request = "request" in self.names
+
+    def finding(self, rule_id: str, severity: str, node: ast.AST, description: str,
+                recommendation: str, ambiguous: bool = False) -> Finding:
+        return Finding(
+            rule_id=rule_id,
+            severity=severity,
+            file_path=self.file_path,
+            line=getattr(node, "lineno", 0),
+            description=description,
+            recommendation=recommendation,
+            ambiguous=ambiguous,
+        )
+
+    def calls(self, suffix: str) -> List[ast.Call]:
+        return [node for node in self.nodes[ast.Call] if dotted_name(node.func).endswith(suffix)]
+
+    def route_functions(self) -> List[ast.FunctionDef]:
+        routes = []
+        for node in self.nodes[ast.FunctionDef] + self.nodes[ast.AsyncFunctionDef]:
+            for decorator in node.decorator_list:
+                if isinstance(decorator, ast.Call) and dotted_name(decorator.func).split(".")[-1] in (
+                    "route", "get", "post", "put", "delete", "patch", "api_route"
+                ):
+                    routes.append(node)
+                    break
+        return routes
+
+    def uses_auth(self) -> bool:
+        return bool(
+            self.calls("authorize_redirect")
+            or self.calls("authorize_access_token")
+            or any(name.endswith(".OAuth") for name in self.imports)
+            or {route.name for route in self.route_functions()} & AUTH_ROUTE_NAMES
+        )
+
+
+def _route_methods(function: ast.FunctionDef) -> List[str]:
+    methods = []
+    for decorator in function.decorator_list:
+        if not isinstance(decorator, ast.Call):
+            continue
+        leaf = dotted_name(decorator.func).split(".")[-1]
+        if leaf in ("post", "put", "delete", "patch"):
+            methods.append(leaf.upper())
+        for keyword in decorator.keywords:
+            if keyword.arg == "methods" and isinstance(keyword.value, (ast.List, ast.Tuple)):
+                methods += [
+                    elt.value.upper() for elt in keyword.value.elts
+                    if isinstance(elt, ast.Constant) and isinstance(elt.value, str)
+                ]
+    return methods
+
+
+def _is_env_lookup_without_default(node: ast.AST) -> bool:
+    if not isinstance(node, ast.Call):
+        return False
+    name = dotted_name(node.func)
+    if name.split(".")[-1] not in ("get", "getenv") or name.split(".")[0] not in ("env", "environ", "os"):
+        return False
+    return len(node.args) < 2 and not any(keyword.arg == "default" for keyword in node.keywords)
+
+
+def _is_secret_key_target(node: ast.AST) -> bool:
+    if isinstance(node, ast.Attribute):
+        return node.attr == "secret_key"
+    if isinstance(node, ast.Subscript):
+        key = node.slice
+        return isinstance(key, ast.Constant) and key.value == "SECRET_KEY"
+    return False
+
+
+@rule("hardcoded_credentials", "Hardcoded credentials in code",
+      ("secret", "passw", "api_key", "apikey", "client_secret", "private_key", "access_token"))
+def check_hardcoded_credentials(ctx: FileContext) -> Iterable[Finding]:
+    def is_secret_literal(value: ast.AST) -> bool:
+        return isinstance(value, ast.Constant) and isinstance(value.value, str) and len(value.value) >= 8
+
+    for node in ctx.nodes[ast.Assign]:
+        if not is_secret_literal(node.value):
+            continue
+        for target in node.targets:
+            name = dotted_name(target)
+            if isinstance(target, ast.Subscript) and isinstance(target.slice, ast.Constant):
+                name = str(target.slice.value)
+            if SECRET_NAME.search(name) or _is_secret_key_target(target):
+                yield ctx.finding(
+                    "hardcoded_credentials", "high", node,
+                    f"`{name}` is assigned a string literal",
+                    "Load secrets from environment variables or a secret manager, never commit them"
+                )
+    for node in ctx.nodes[ast.keyword]:
+        if node.arg and SECRET_NAME.search(node.arg) and is_secret_literal(node.value):
+            yield ctx.finding(
+                "hardcoded_credentials", "high", node.value,
+                f"`{node.arg}` is passed as a string literal",
+                "Load secrets from environment variables or a secret manager, never commit them"
+            )
+
+
+@rule("missing_csrf", "Missing CSRF protection", ("post", "put", "delete", "patch"))
+def check_missing_csrf(ctx: FileContext) -> Iterable[Finding]:
+    if any("csrf" in name.lower() for name in ctx.imports | ctx.names):
+        return
+    token_lines = [call.lineno for call in ctx.calls("authorize_access_token")]
+    for function in ctx.route_functions():
+        unsafe = set(_route_methods(function)) & {"POST", "PUT", "DELETE", "PATCH"}
+        if not unsafe:
+            continue
+        if any(function.lineno <= line <= function.end_lineno for line in token_lines):
+            # authlib validates the OAuth state parameter on the callback
+            continue
+        yield ctx.finding(
+            "missing_csrf", "medium", function,
+            f"Route `{function.name}` accepts {', '.join(sorted(unsafe))} without CSRF protection",
+            "Enable CSRF protection, e.g. flask_wtf.csrf.CSRFProtect(app)",
+            ambiguous=True
+        )
+
+
+@rule("secret_key_from_unset_env", "Insecure session management", ("secret_key",))
+def check_secret_key_from_env(ctx: FileContext) -> Iterable[Finding]:
+    for node in ctx.nodes[ast.Assign]:
+        if any(_is_secret_key_target(target) for target in node.targets) and _is_env_lookup_without_default(node.value):
+            yield ctx.finding(
+                "secret_key_from_unset_env", "medium", node,
+                "The session secret key comes from an environment variable that may be unset, "
+                "the app would then run with secret_key None",
+                "Fail fast at startup when the variable is missing, e.g. env[\"APP_SECRET_KEY\"]"
+            )
+
+
+def _reads_request(node: ast.AST) -> bool:
+    return any(
+        isinstance(child, ast.Attribute) and dotted_name(child).startswith(REQUEST_SOURCES)
+        for child in ast.walk(node)
+    )
+
+
+@rule("unvalidated_redirect_uri", "Incorrect callback URL validation", ("redirect",))
+def check_redirect_uri(ctx: FileContext) -> Iterable[Finding]:
+    for call in ctx.calls("authorize_redirect"):
+        values = [keyword.value for keyword in call.keywords if keyword.arg == "redirect_uri"] + call.args[:1]
+        for value in values:
+            if ctx.uses_request and _reads_request(value):
+                yield ctx.finding(
+                    "unvalidated_redirect_uri", "high", call,
+                    "redirect_uri is taken from the request",
+                    "Build redirect_uri with url_for(\"callback\", _external=True) or check it against an allow-list"
+                )
+            elif not (isinstance(value, ast.Call) and dotted_name(value.func).endswith("url_for")):
+                yield ctx.finding(
+                    "unvalidated_redirect_uri", "medium", call,
+                    f"redirect_uri is `{ast.unparse(value)}`, it can't be checked statically",
+                    "Make sure redirect_uri is one of the Allowed Callback URLs",
+                    ambiguous=True
+                )
+    if not ctx.uses_request:
+        return
+    for call in ctx.calls("redirect"):
+        if dotted_name(call.func).split(".")[-1] == "redirect" and call.args and _reads_request(call.args[0]):
+            yield ctx.finding(
+                "unvalidated_redirect_uri", "high", call,
+                "Redirect target is taken from the request (open redirect)",
+                "Only redirect to relative paths or an allow-list of URLs"
+            )
+
+
+@rule("full_token_in_session", "Improper token storage/handling", ("authorize_access_token",))
+def check_token_in_session(ctx: FileContext) -> Iterable[Finding]:
+    token_names = set()
+    for node in ctx.nodes[ast.Assign]:
+        if isinstance(node.value, ast.Call) and dotted_name(node.value.func).endswith("authorize_access_token"):
+            token_names.update(target.id for target in node.targets if isinstance(target, ast.Name))
+    for node in ctx.nodes[ast.Assign]:
+        if not any(isinstance(target, ast.Subscript) and dotted_name(target.value) == "session" for target in node.targets):
+            continue
+        value = node.value
+        stores_token = (isinstance(value, ast.Name) and value.id in token_names) or (
+            isinstance(value, ast.Call) and dotted_name(value.func).endswith("authorize_access_token")
+        )
+        if stores_token:
+            yield ctx.finding(
+                "full_token_in_session", "medium", node,
+                "The full token response (access, ID and refresh tokens) is stored in the session cookie",
+                "Store only the user info claims, e.g. session[\"user\"] = token[\"userinfo\"]"
+            )
+
+
+@rule("missing_logging", "Insufficient logging", ("authorize", "login", "logout", "callback", "oauth"))
+def check_logging(ctx: FileContext) -> Iterable[Finding]:
+    if not ctx.uses_auth():
+        return
+    if "logging" in ctx.imports or any(name.startswith("logging") or name == "logger" for name in ctx.names):
+        return
+    # Report it at the first auth route, or the first OAuth call or import when no route has an auth name
+    anchors = (
+        [route for route in ctx.route_functions() if route.name in AUTH_ROUTE_NAMES]
+        or ctx.calls("authorize_redirect") + ctx.calls("authorize_access_token")
+        or [
+            node for node in ctx.nodes[ast.Import] + ctx.nodes[ast.ImportFrom]
+            if any(alias.name == "OAuth" or alias.name.endswith(".OAuth") for alias in node.names)
+        ]
+    )
+    yield ctx.finding(
+        "missing_logging", "low", min(anchors, key=lambda node: node.lineno, default=ctx.tree),
+        "Authentication routes don't log logins, logouts or failures",
+        "Log authentication events with the logging module, without logging tokens"
+    )
+
+
+@dataclass
+class ScanResult:
+    files_scanned: int = 0
+    duration: float = 0.0
+    findings: List[Finding] = field(default_factory=list)
+    parse_errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ambiguous_files(self) -> List[str]:
+        files = {finding.file_path for finding in self.findings if finding.ambiguous}
+        return sorted(files | set(self.parse_errors))
+
+    def to_report(self) -> dict:
+        """Render the result in the ``validate_integration_task`` schema"""
+        issues = [finding for finding in self.findings if not finding.ambiguous]
+        checks = []
+        for current in RULES.values():
+            findings = [finding for finding in self.findings if finding.rule_id == current.rule_id]
+            if any(not finding.ambiguous for finding in findings):
+                status = "failed"
+            elif findings:
+                status = "needs_review"
+            else:
+                status = "passed"
+            details = "; ".join(f"{finding.file_path}:{finding.line} {finding.description}" for finding in findings)
+            checks.append({"check": current.check, "status": status, "details": details or "No issue found"})
+        if any(finding.severity == "high" for finding in issues):
+            overall_status = "failed"
+        elif self.ambiguous_files:
+            overall_status = "needs_review"
+        elif issues:
+            overall_status = "passed_with_warnings"
+        else:
+            overall_status = "passed"
+        return {
+            "validation_results": {
+                "overall_status": overall_status,
+                "confidence_score": max(0.5, 1.0 - 0.1 * len(self.ambiguous_files)),
+                "issues_found": [
+                    {
+                        "type": finding.rule_id,
+                        "severity": finding.severity,
+                        "file_path": finding.file_path,
+                        "description": f"{finding.file_path}:{finding.line} {finding.description}",
+                        "recommendation": finding.recommendation,
+                    }
+                    for finding in sorted(issues, key=lambda f: SEVERITIES.index(f.severity), reverse=True)
+                ],
+                "security_checks": checks,
+            }
+        }
+
+    def to_context(self) -> str:
+        """Report plus the ambiguous findings, for the validation agent"""
+        return json.dumps({
+            "heuristic_report": self.to_report(),
+            "ambiguous_findings": [asdict(finding) for finding in self.findings if finding.ambiguous],
+            "files_to_review": self.ambiguous_files,
+        })
+
+
+def scan_source(source: str, file_path: str, rules: Optional[Iterable[str]] = None) -> List[Finding]:
+    lowered = source.lower()
+    applicable = [RULES[rule_id] for rule_id in rules or RULES if RULES[rule_id].applies_to(lowered)]
+    if not applicable:
+        return []
+    ctx = FileContext(file_path, ast.parse(source, filename=file_path))
+    findings = []
+    for current in applicable:
+        findings.extend(current.func(ctx))
+    return findings
+
+
+def iter_python_files(path: Path) -> Iterable[Path]:
+    if path.is_file():
+        yield path
+        return
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                yield Path(dirpath) / filename
+
+
+def scan_paths(project_path: str, files: Optional[Iterable[str]] = None, overlay=None) -> ScanResult:
+    """Scan ``files`` (relative to ``project_path``) or every Python file of the project.
+
+    With an ``overlay.Overlay`` the staged content of the files is scanned, including staged new files.
+    """
+    root = Path(project_path)
+    if files is not None:
+        paths = [root / file for file in files if file.endswith(".py")]
+    else:
+        paths = list(iter_python_files(root))
+        if overlay is not None:
+            root = root.resolve()
+            paths = [path.resolve() for path in paths]
+            paths += [
+                path for path in overlay.staged_files()
+                if path.suffix == ".py" and path not in paths and root in path.parents
+            ]
+    result = ScanResult()
+    start = time.perf_counter()
+    for path in paths:
+        rel_path = path.relative_to(root).as_posix() if path != root else path.name
+        try:
+            if overlay is not None:
+                source = overlay.read_text(path)
+            else:
+                source = path.read_text(encoding="utf-8", errors="replace")
+            result.findings.extend(scan_source(source, rel_path))
+        except (OSError, SyntaxError, ValueError) as e:
+            result.parse_errors[rel_path] = str(e)
+        result.files_scanned += 1
+    result.duration = time.perf_counter() - start
+    return result
@@ -0,0 +1,82 @@
+"""Shared pooled HTTP client for the I/O bound tools.
+
+One ``httpx.AsyncClient`` with keep-alive connections lives on a background
+event loop, so every tool call reuses open connections instead of paying a new
+TCP and TLS handshake, and a tool can await several requests concurrently.
+Concurrency is bounded by a semaphore of ``max_connections``. crewai calls
+tools synchronously; ``run`` executes a coroutine on the client's loop and
+waits for it, and ``request`` can also be awaited from any other event loop.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Iterable, List, Optional
+
+import httpx
+
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_TIMEOUT = 30.0
+
+
+class PooledHTTPClient:
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS, timeout: float = DEFAULT_TIMEOUT):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="autoauth0-http", daemon=True).start()
+                self._client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections
+                    ),
+                    timeout=self.timeout,
+                    follow_redirects=True
+                )
+                self._semaphore = asyncio.Semaphore(self.max_connections)
+                self._loop = loop
+            return self._loop
+
+    def run(self, coroutine: Awaitable) -> Any:
+        """Run ``coroutine`` on the client's loop from synchronous code and return its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._start()).result()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        loop = self._start()
+        if asyncio.get_running_loop() is not loop:
+            # The connections belong to the client's loop, hop over to it
+            future = asyncio.run_coroutine_threadsafe(self.request(method, url, **kwargs), loop)
+            return await asyncio.wrap_future(future)
+        async with self._semaphore:
+            return await self._client.request(method, url, **kwargs)
+
+    async def gather(self, coroutines: Iterable[Awaitable]) -> List[Any]:
+        """Await ``coroutines`` concurrently; a failed one yields its exception instead of a result"""
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = self._client = self._semaphore = None
+
+
+_shared_client: Optional[PooledHTTPClient] = None
+_shared_lock = threading.Lock()
+
+
+def shared_client() -> PooledHTTPClient:
+    """The process wide client, shared by every tool and every crew of a batch run"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = PooledHTTPClient()
+        return _shared_client
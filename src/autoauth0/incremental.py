@@ -0,0 +1,139 @@
+"""Persisted analysis state for incremental re-integration.
+
+After each run the hash of every project file is stored together with the
+``files_to_modify`` report of ``analyze_codebase_task``. On the next run only
+new or changed files are sent to the analysis and integration agents, and the
+report entries of unchanged files are reused.
+"""
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from autoauth0.prescan import SKIP_DIRS
+
+DEFAULT_STATE_DIR = Path(".autoauth0") / "projects"
+STATE_VERSION = 1
+
+
+def hash_project_files(project_path: str) -> Dict[str, str]:
+    hashes = {}
+    root = Path(project_path)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            hashes[path.relative_to(root).as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return hashes
+
+
+def extract_json(text: str) -> Optional[dict]:
+    """Parse the JSON object of an agent's final answer, tolerating prose and code fences around it."""
+    text = re.sub(r"```(?:json)?", "", text)
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def normalize_file_path(project_path: str, file_path: str) -> str:
+    """Agents report paths relative to the project, to the working directory or absolute"""
+    root = Path(project_path).resolve()
+    path = Path(file_path)
+    if not path.is_absolute() and not (root / path).exists() and path.exists():
+        path = path.resolve()
+    if path.is_absolute():
+        try:
+            return path.resolve().relative_to(root).as_posix()
+        except ValueError:
+            return file_path
+    return path.as_posix()
+
+
+@dataclass
+class FileChanges:
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> List[str]:
+        """Files that need to be (re-)analyzed"""
+        return sorted(self.added + self.modified)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+
+@dataclass
+class AnalysisState:
+    project_path: str
+    file_hashes: Dict[str, str] = field(default_factory=dict)
+    report: dict = field(default_factory=dict)
+
+    def diff(self, file_hashes: Dict[str, str]) -> FileChanges:
+        return FileChanges(
+            added=sorted(set(file_hashes) - set(self.file_hashes)),
+            modified=sorted(
+                path for path, digest in file_hashes.items()
+                if path in self.file_hashes and self.file_hashes[path] != digest
+            ),
+            removed=sorted(set(self.file_hashes) - set(file_hashes)),
+        )
+
+    def merge_report(self, report: dict, changes: FileChanges) -> dict:
+        """Combine a report covering only ``changes`` with the stored one."""
+        reanalyzed = set(changes.changed) | set(changes.removed)
+        files = {
+            normalize_file_path(self.project_path, entry.get("file_path", "")): entry
+            for entry in self.report.get("files_to_modify", [])
+        }
+        files = {path: entry for path, entry in files.items() if path not in reanalyzed}
+        for entry in report.get("files_to_modify", []):
+            files[normalize_file_path(self.project_path, entry.get("file_path", ""))] = entry
+        merged = dict(self.report)
+        merged.update({key: value for key, value in report.items() if key != "files_to_modify"})
+        merged["files_to_modify"] = [files[path] for path in sorted(files)]
+        return merged
+
+
+class AnalysisStateStore:
+    """One JSON state file per target project, keyed on its absolute path."""
+
+    def __init__(self, state_dir: Path = DEFAULT_STATE_DIR):
+        self.state_dir = Path(state_dir)
+
+    def path_for(self, project_path: str) -> Path:
+        key = hashlib.sha256(str(Path(project_path).resolve()).encode()).hexdigest()[:16]
+        return self.state_dir / f"{key}.json"
+
+    def load(self, project_path: str) -> Optional[AnalysisState]:
+        path = self.path_for(project_path)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text())
+        if data.get("version") != STATE_VERSION:
+            return None
+        return AnalysisState(
+            project_path=project_path,
+            file_hashes=data["file_hashes"],
+            report=data["report"],
+        )
+
+    def save(self, state: AnalysisState):
+        path = self.path_for(state.project_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "version": STATE_VERSION,
+            "project_path": str(Path(state.project_path).resolve()),
+            "file_hashes": state.file_hashes,
+            "report": state.report,
+        }, indent=2))
+        os.replace(tmp_path, path)
@@ -0,0 +1,209 @@
+"""Latency and cost instrumentation for crew runs.
+
+Every agent task execution, tool call and LLM call is recorded as a span with
+its wall time and attributes (tokens, errors, retries, delegation depth). Spans
+nest per thread, so a coworker's task started through the manager's delegation
+tool becomes a child of the manager's span, and LLM and tool calls are
+attributed to the agent whose task is running. The trace can be exported as
+JSON lines and summarized per agent and per tool. Listeners registered on the
+tracer are told about every span as it starts and ends.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+_span_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    span_id: int
+    parent_id: Optional[int]
+    kind: str
+    name: str
+    agent: Optional[str]
+    start: float
+    end: Optional[float] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+
+class Tracer:
+    def __init__(self):
+        self.spans: List[Span] = []
+        # Objects with on_span_start(span) and on_span_end(span), e.g. an events.EventStream
+        self.listeners: List[Any] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_agent(self) -> Optional[str]:
+        for span in reversed(self._stack()):
+            if span.kind == "task":
+                return span.agent
+        return None
+
+    def start_span(self, kind: str, name: str, agent: Optional[str] = None, push: bool = True, **attributes) -> Span:
+        stack = self._stack()
+        span = Span(
+            span_id=next(_span_ids),
+            parent_id=stack[-1].span_id if stack else None,
+            kind=kind,
+            name=name,
+            agent=agent or self.current_agent(),
+            start=time.time(),
+            attributes=attributes,
+        )
+        if push:
+            stack.append(span)
+        for listener in self.listeners:
+            listener.on_span_start(span)
+        return span
+
+    def end_span(self, span: Span, status: str = "ok"):
+        span.end = time.time()
+        span.status = status
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        with self._lock:
+            self.spans.append(span)
+        for listener in self.listeners:
+            listener.on_span_end(span)
+
+    @contextmanager
+    def span(self, kind: str, name: str, agent: Optional[str] = None, **attributes):
+        span = self.start_span(kind, name, agent=agent, **attributes)
+        try:
+            yield span
+        except Exception as e:
+            span.attributes["error"] = f"{type(e).__name__}: {e}"
+            self.end_span(span, status="error")
+            raise
+        self.end_span(span)
+
+    def export(self, path: str):
+        with open(path, "w") as trace:
+            for span in sorted(self.spans, key=lambda span: span.start):
+                trace.write(json.dumps({**asdict(span), "duration": span.duration}) + "\n")
+
+    def summary(self) -> Dict[str, Dict[str, dict]]:
+        agents = defaultdict(lambda: defaultdict(float))
+        tools = defaultdict(lambda: defaultdict(float))
+        for span in self.spans:
+            agent = agents[span.agent or "-"]
+            if span.kind == "task" and span.attributes.get("retry"):
+                # A retry runs inside the failed attempt's span, its time is already counted
+                agent["retries"] += 1
+            elif span.kind == "task":
+                agent["tasks"] += 1
+                agent["wall_time"] += span.duration
+                agent["delegation_hops"] += 1 if span.attributes.get("delegated") else 0
+            elif span.kind == "llm":
+                agent["llm_calls"] += 1
+                agent["llm_time"] += span.duration
+                agent["tokens_in"] += span.attributes.get("prompt_tokens", 0)
+                agent["tokens_out"] += span.attributes.get("completion_tokens", 0)
+                agent["llm_errors"] += span.status == "error"
+            elif span.kind == "tool":
+                agent["tool_calls"] += 1
+                agent["tool_time"] += span.duration
+                tools[span.name]["calls"] += 1
+                tools[span.name]["time"] += span.duration
+                tools[span.name]["errors"] += span.status == "error"
+        return {"agents": agents, "tools": tools}
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"{'agent':<30}{'tasks':>6}{'wall':>9}{'llm':>5}{'llm time':>10}{'in':>8}{'out':>7}"
+            f"{'tools':>6}{'tool time':>10}{'retries':>8}{'hops':>5}"
+        ]
+        for name, stats in sorted(summary["agents"].items(), key=lambda item: -item[1]["wall_time"]):
+            lines.append(
+                f"{name:<30}{int(stats['tasks']):>6}{stats['wall_time']:>8.1f}s{int(stats['llm_calls']):>5}"
+                f"{stats['llm_time']:>9.1f}s{int(stats['tokens_in']):>8}{int(stats['tokens_out']):>7}"
+                f"{int(stats['tool_calls']):>6}{stats['tool_time']:>9.1f}s{int(stats['retries']):>8}"
+                f"{int(stats['delegation_hops']):>5}"
+            )
+        lines.append("")
+        lines.append(f"{'tool':<40}{'calls':>6}{'time':>9}{'errors':>7}")
+        for name, stats in sorted(summary["tools"].items(), key=lambda item: -item[1]["time"]):
+            lines.append(f"{name:<40}{int(stats['calls']):>6}{stats['time']:>8.1f}s{int(stats['errors']):>7}")
+        return "\n".join(lines)
+
+
+def written_file(span: Span) -> Optional[str]:
+    """Path of the file a successful file writer tool call wrote, from its recorded arguments"""
+    arguments = span.attributes.get("arguments", {})
+    if span.kind != "tool" or span.status != "ok" or "filename" not in arguments:
+        return None
+    return os.path.join(arguments.get("directory") or "", arguments["filename"])
+
+
+def instrument_tool(tool, tracer: Tracer):
+    """Wrap ``tool._run`` so each call is recorded as a span."""
+    if getattr(tool, "_autoauth0_instrumented", False):
+        return tool
+    run = tool._run
+
+    def traced_run(*args, **kwargs):
+        # Keep the short arguments, e.g. a written file's name, but not its content
+        arguments = {
+            key: value for key, value in kwargs.items()
+            if isinstance(value, (bool, int, float)) or isinstance(value, str) and len(value) <= 200
+        }
+        with tracer.span("tool", tool.name, arguments=arguments):
+            return run(*args, **kwargs)
+
+    # Bypass pydantic's __setattr__, these are not model fields
+    object.__setattr__(tool, "_run", traced_run)
+    object.__setattr__(tool, "_autoauth0_instrumented", True)
+    return tool
+
+
+def instrument_agent(agent, name: str, tracer: Tracer):
+    """Wrap ``agent.execute_task`` and the agent's tools.
+
+    crewai retries a failed task by calling ``execute_task`` again from inside
+    the failing call, and delegation runs the coworker's ``execute_task`` from
+    inside the manager's tool call, so nesting tells retries and hops apart.
+    """
+    if getattr(agent, "_autoauth0_instrumented", False):
+        return agent
+    execute_task = agent.execute_task
+
+    def traced_execute_task(task, *args, **kwargs):
+        stack = tracer._stack()
+        task_spans = [span for span in stack if span.kind == "task"]
+        retry = bool(task_spans) and task_spans[-1].attributes.get("task_id") == id(task)
+        with tracer.span(
+            "task",
+            getattr(task, "name", None) or task.description.strip()[:40],
+            agent=name,
+            task_id=id(task),
+            depth=len(task_spans),
+            retry=int(retry),
+            delegated=bool(task_spans) and not retry,
+        ):
+            return execute_task(task, *args, **kwargs)
+
+    object.__setattr__(agent, "execute_task", traced_execute_task)
+    object.__setattr__(agent, "_autoauth0_instrumented", True)
+    for tool in agent.tools or []:
+        instrument_tool(tool, tracer)
+    return agent
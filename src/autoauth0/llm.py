@@ -0,0 +1,82 @@
+"""crewai LLM of a run's agents, answering from the run's response cache,
+within the run's rate limit and traced as the run's ``llm`` spans.
+
+crewai turns a langchain chat model given to an ``Agent`` into an ``LLM`` of
+its own, keeping only the model settings, so a cache, rate limiter or
+callbacks attached to the langchain model never see an agent's call. ``RunLLM`` is a crewai ``LLM``, which crewai
+keeps as it is, and every call of the agents, the manager and the schema
+repairs goes through its ``call``.
+"""
+import json
+from typing import Tuple
+
+from crewai import LLM
+from litellm.integrations.custom_logger import CustomLogger
+
+from autoauth0.cache import ResponseCache
+from autoauth0.instrumentation import Tracer
+
+
+class UsageRecorder(CustomLogger):
+    """litellm callback adding up the token usage of the calls it is passed to"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        usage = getattr(response_obj, "usage", None)
+        self.calls += 1
+        self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+
+class RunLLM(LLM):
+    def __init__(self, model: str, cache: ResponseCache = None, rate_limiter=None, tracer: Tracer = None, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.cache = cache
+        # e.g. a langchain InMemoryRateLimiter shared by every crew of a batch
+        self.rate_limiter = rate_limiter
+        self.tracer = tracer
+
+    def cache_key(self, messages) -> Tuple[str, str]:
+        """Prompt and model settings of a call; crewai adds the agent's stop words to the settings"""
+        llm_string = json.dumps({"model": self.model, "temperature": self.temperature, "stop": sorted(self.stop or [])})
+        return json.dumps(messages, sort_keys=True, default=str), llm_string
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        kwargs.update(tools=tools, callbacks=callbacks, available_functions=available_functions)
+        if self.cache is None or tools:
+            # A function call's answer comes from the functions it runs, not only from the prompt
+            return self.limited_call(messages, **kwargs)
+        prompt, llm_string = self.cache_key(messages)
+        cached = self.cache.lookup(prompt, llm_string)
+        if cached is not None:
+            return cached
+        response = self.limited_call(messages, **kwargs)
+        if isinstance(response, str) and response:
+            self.cache.update(prompt, llm_string, response)
+        return response
+
+    def limited_call(self, messages, **kwargs):
+        """``LLM.call`` once the rate limiter allows a request; answers from the cache don't wait"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(blocking=True)
+        if self.tracer is None:
+            return super().call(messages, **kwargs)
+        usage = UsageRecorder()
+        kwargs["callbacks"] = [*(kwargs.get("callbacks") or []), usage]
+        # A leaf, kept off the stack so it doesn't swallow tool spans; the running task's agent is its agent
+        span = self.tracer.start_span("llm", self.model, push=False)
+        try:
+            response = super().call(messages, **kwargs)
+        except Exception as e:
+            span.attributes["error"] = f"{type(e).__name__}: {e}"
+            self.tracer.end_span(span, status="error")
+            raise
+        span.attributes["prompt_tokens"] = usage.prompt_tokens
+        span.attributes["completion_tokens"] = usage.completion_tokens
+        self.tracer.end_span(span)
+        return response
@@ -1,14 +1,88 @@
 #!/usr/bin/env python
+import argparse
+import json
 import os
 import textwrap
 from pathlib import Path
 from dotenv import load_dotenv
-from crew import AutoAuth0Crew
+
+# Only light modules at import time: crewai, langchain and the tools are
+# imported by the crew once a run actually needs them
+from autoauth0.dag import MODES
 
 # Load environment variables from .env file
 load_dotenv()
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Integrate Auth0 into a web project")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always call the LLM instead of reusing cached responses"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="hierarchical",
+        help="hierarchical: the manager agent orders the tasks, "
+             "parallel: both analysis tasks run concurrently before integration, "
+             "dag: tasks run as soon as their depends_on tasks are done and the manager "
+             "is only consulted when validation fails"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-analyze files that changed since the last run"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="write the run's spans (tasks, tool and LLM calls) as JSON lines to PATH"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="print typed progress events as JSON lines instead of the verbose agent logs"
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="resume a run that failed part way, only running the tasks it didn't finish"
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="print the changes as a unified diff without writing them to the project"
+    )
+    parser.add_argument(
+        "--no-fast-path",
+        action="store_true",
+        help="always integrate through the LLM crew, even when a codemod recipe matches the project"
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="estimate the LLM calls, tokens, cost and wall time of the run without running it"
+    )
+    parser.add_argument(
+        "--no-fan-out",
+        action="store_true",
+        help="in the dag and parallel modes, integrate all files in one task instead of a worker per group of coupled files"
+    )
+    parser.add_argument(
+        "--model",
+        metavar="MODEL",
+        help="run every agent and task on MODEL, ignoring the model routing of agents.yaml and tasks.yaml"
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="give the crew short-term, entity and long-term memory of the project, kept across runs"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     print(textwrap.dedent("""
         Welcome to Auto-Auth0
 
@@ -19,10 +93,72 @@ def main():
     current_dir = Path(__file__).parent.parent.parent
     test_project_path = current_dir / "auto_auth0_tests" / "auth0-python-web-app"
     
+    if args.plan:
+        from autoauth0.planner import plan_run
+
+        # Pre-scan and prompt sizes only: no LLM call, crewai isn't even imported
+        print(plan_run(
+            str(test_project_path),
+            mode=args.mode,
+            fast_path=not args.no_fast_path,
+            model_override=args.model,
+            fan_out=not args.no_fan_out
+        ).format())
+        return
+
+    from autoauth0.crew import AutoAuth0Crew
+
     # Initialize and run the crew
-    crew = AutoAuth0Crew(str(test_project_path))
+    crew = AutoAuth0Crew(
+        str(test_project_path),
+        use_cache=not args.no_cache,
+        mode=args.mode,
+        incremental=args.incremental,
+        trace_path=args.trace,
+        fast_path=not args.no_fast_path,
+        verbose=not args.stream,
+        resume=args.resume,
+        preview=args.preview,
+        model_override=args.model,
+        memory=args.memory,
+        fan_out=not args.no_fan_out
+    )
+    print(f"Run id: {crew.run_id} (resume with --resume {crew.run_id})")
+    if args.resume:
+        crew.start_checkpoint()
+        for file_path in crew.checkpoint.modified_files():
+            print(f"Warning: {file_path} changed since the resumed run wrote it")
+    if args.stream:
+        for event in crew.stream():
+            print(json.dumps(event.to_dict()), flush=True)
+        return
     result = crew.run()
     print(result)
+    if args.preview:
+        print(crew.diff or "No changes")
+    elif crew.committed_files:
+        print(f"Validation passed, wrote {len(crew.committed_files)} files: {', '.join(crew.committed_files)}")
+    elif crew.diff:
+        print("Validation failed, the project was left unchanged. Discarded changes:")
+        print(crew.diff)
+    for conflict in crew.merge_conflicts:
+        print(f"Merge conflict: {conflict.describe()}")
+    if crew.task_timings:
+        print(crew.format_timings())
+    if crew.token_usage:
+        print(crew.format_token_usage())
+    if crew.model_usage:
+        print(crew.format_model_usage())
+    if crew.memory_stats:
+        from autoauth0.memory import format_stats
+
+        print(format_stats(crew.memory_stats))
+    if crew.tracer.spans:
+        print(crew.tracer.format_summary())
+
+def run():
+    """Entry point of the ``autoauth0`` and ``run_crew`` scripts"""
+    main()
 
 if __name__ == "__main__":
     main()
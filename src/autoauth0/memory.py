@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+"""Managed store for the crew's memory, shared by every project of the process.
+
+Short-term, entity and long-term memories are kept in
+``db/crew_memory.sqlite3`` instead of crewai's default stores, which grow
+without bound. Every entry is namespaced by its target project, so a batch
+doesn't leak one project's memories into another, and is indexed with SQLite
+FTS5 for fast lookups. Entries not used for ``ttl`` seconds are dropped, each
+project keeps at most ``max_entries`` (least recently used first out), and the
+file is vacuumed once every ``vacuum_interval``.
+
+The files of the ``knowledge/`` directory are loaded into a shared namespace
+once per process, and again only when their hash changes, and are searched
+along with the short-term memories, instead of every agent loading them.
+
+Usage:
+    python -m autoauth0.memory [--compact] [--vacuum] [--clear PROJECT_PATH]
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import statistics
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Optional
+
+from autoauth0.docstore import _fts_query, chunk_text
+
+DEFAULT_MEMORY_PATH = Path("db") / "crew_memory.sqlite3"
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_VACUUM_INTERVAL = 24 * 3600
+KNOWLEDGE_NAMESPACE = "knowledge"
+KNOWLEDGE_SUFFIXES = {".md", ".txt"}
+
+
+def project_namespace(project_path: str) -> str:
+    digest = hashlib.sha256(str(Path(project_path).resolve()).encode()).hexdigest()[:16]
+    return f"project:{digest}"
+
+
+class MemoryStore:
+    def __init__(
+        self,
+        path: Path = DEFAULT_MEMORY_PATH,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        vacuum_interval: float = DEFAULT_VACUUM_INTERVAL
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.vacuum_interval = vacuum_interval
+        self.query_latencies = deque(maxlen=1000)
+        self.queries = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS memories ("
+            "id INTEGER PRIMARY KEY, namespace TEXT NOT NULL, kind TEXT NOT NULL, content TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS memories_used ON memories (namespace, used_at);"
+            "CREATE INDEX IF NOT EXISTS memories_content ON memories (namespace, kind, content);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS memory_index USING fts5(content);"
+            "CREATE TABLE IF NOT EXISTS knowledge_files (path TEXT PRIMARY KEY, file_hash TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS maintenance (key TEXT PRIMARY KEY, value REAL NOT NULL);"
+        )
+        self._conn.commit()
+
+    def save(self, namespace: str, kind: str, content: str, metadata: dict = None) -> int:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO memories (namespace, kind, content, metadata, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, kind, content, json.dumps(metadata or {}, default=str), now, now)
+            )
+            self._conn.execute("INSERT INTO memory_index (rowid, content) VALUES (?, ?)", (cursor.lastrowid, content))
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def _timed(self, start: float):
+        self.queries += 1
+        self.query_latencies.append(time.perf_counter() - start)
+
+    def search(self, namespaces: List[str], kind: str, query: str, limit: int = 3) -> List[dict]:
+        """Best matching entries of ``kind`` in ``namespaces``, ranked by BM25.
+
+        Knowledge entries match any kind. The entries found count as used for the LRU.
+        """
+        start = time.perf_counter()
+        fts_query = _fts_query(query)
+        if not fts_query:
+            return []
+        placeholders = ", ".join("?" for _ in namespaces)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT m.id, m.content, m.metadata, bm25(memory_index) FROM memory_index "
+                "JOIN memories m ON m.id = memory_index.rowid "
+                f"WHERE memory_index MATCH ? AND m.namespace IN ({placeholders}) "
+                "AND (m.kind = ? OR m.namespace = ?) ORDER BY bm25(memory_index) LIMIT ?",
+                (fts_query, *namespaces, kind, KNOWLEDGE_NAMESPACE, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE memories SET used_at = ? WHERE id = ?", [(time.time(), row[0]) for row in rows]
+            )
+            self._conn.commit()
+            self._timed(start)
+        # bm25() is lower for better matches
+        return [
+            {"id": memory_id, "context": content, "metadata": json.loads(metadata), "score": -rank}
+            for memory_id, content, metadata, rank in rows
+        ]
+
+    def latest(self, namespace: str, kind: str, content: str, limit: int = 3) -> List[dict]:
+        """The last ``limit`` entries saved with exactly ``content``, newest first"""
+        start = time.perf_counter()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, metadata, created_at FROM memories WHERE namespace = ? AND kind = ? AND content = ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (namespace, kind, content, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE memories SET used_at = ? WHERE id = ?", [(time.time(), row[0]) for row in rows]
+            )
+            self._conn.commit()
+            self._timed(start)
+        return [{"id": memory_id, "metadata": json.loads(metadata), "created_at": created_at}
+                for memory_id, metadata, created_at in rows]
+
+    def _delete(self, where: str, parameters: tuple) -> int:
+        ids = [row[0] for row in self._conn.execute(f"SELECT id FROM memories WHERE {where}", parameters)]
+        self._conn.executemany("DELETE FROM memories WHERE id = ?", [(memory_id,) for memory_id in ids])
+        self._conn.executemany("DELETE FROM memory_index WHERE rowid = ?", [(memory_id,) for memory_id in ids])
+        return len(ids)
+
+    def reset(self, namespace: str, kind: str = None) -> int:
+        with self._lock:
+            if kind is None:
+                deleted = self._delete("namespace = ?", (namespace,))
+            else:
+                deleted = self._delete("namespace = ? AND kind = ?", (namespace, kind))
+            self._conn.commit()
+        return deleted
+
+    def compact(self) -> int:
+        """Drop the entries unused for longer than the TTL and the least recently used beyond ``max_entries``.
+
+        Knowledge entries are only replaced when their file changes.
+        """
+        with self._lock:
+            deleted = self._delete(
+                "namespace != ? AND used_at < ?", (KNOWLEDGE_NAMESPACE, time.time() - self.ttl)
+            )
+            namespaces = [
+                namespace for namespace, count in self._conn.execute(
+                    "SELECT namespace, COUNT(*) FROM memories WHERE namespace != ? GROUP BY namespace",
+                    (KNOWLEDGE_NAMESPACE,)
+                ) if count > self.max_entries
+            ]
+            for namespace in namespaces:
+                deleted += self._delete(
+                    "namespace = ? AND id NOT IN "
+                    "(SELECT id FROM memories WHERE namespace = ? ORDER BY used_at DESC LIMIT ?)",
+                    (namespace, namespace, self.max_entries)
+                )
+            self._conn.commit()
+        return deleted
+
+    def vacuum(self, force: bool = False) -> bool:
+        """Rebuild the file to give the space of deleted entries back, once every ``vacuum_interval``"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM maintenance WHERE key = 'vacuumed_at'").fetchone()
+            if not force and row is not None and time.time() - row[0] < self.vacuum_interval:
+                return False
+            self._conn.execute("INSERT INTO memory_index (memory_index) VALUES ('optimize')")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO maintenance (key, value) VALUES ('vacuumed_at', ?)", (time.time(),)
+            )
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+        return True
+
+    def maintain(self) -> "MemoryStore":
+        self.compact()
+        self.vacuum()
+        return self
+
+    def preload_knowledge(self, knowledge_path: str) -> int:
+        """Load the new and changed files of ``knowledge_path``, returns how many were loaded"""
+        base = Path(knowledge_path).resolve()
+        files = {
+            str(path): hashlib.sha256(path.read_bytes()).hexdigest()
+            for path in sorted(base.rglob("*")) if path.is_file() and path.suffix.lower() in KNOWLEDGE_SUFFIXES
+        } if base.is_dir() else {}
+        with self._lock:
+            known = {
+                path: file_hash for path, file_hash in self._conn.execute("SELECT path, file_hash FROM knowledge_files")
+                if Path(path).parent == base or base in Path(path).parents
+            }
+            stale = [path for path in known if known[path] != files.get(path)]
+            for path in stale:
+                self._delete("namespace = ? AND json_extract(metadata, '$.source') = ?", (KNOWLEDGE_NAMESPACE, path))
+                self._conn.execute("DELETE FROM knowledge_files WHERE path = ?", (path,))
+            loaded = [path for path in files if known.get(path) != files[path]]
+            now = time.time()
+            for path in loaded:
+                for chunk in chunk_text(Path(path).read_text(encoding="utf-8", errors="replace")):
+                    cursor = self._conn.execute(
+                        "INSERT INTO memories (namespace, kind, content, metadata, created_at, used_at) "
+                        "VALUES (?, 'knowledge', ?, ?, ?, ?)",
+                        (KNOWLEDGE_NAMESPACE, chunk, json.dumps({"source": path}), now, now)
+                    )
+                    self._conn.execute(
+                        "INSERT INTO memory_index (rowid, content) VALUES (?, ?)", (cursor.lastrowid, chunk)
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO knowledge_files (path, file_hash) VALUES (?, ?)", (path, files[path])
+                )
+            self._conn.commit()
+        return len(loaded)
+
+    def stats(self, namespace: str = None) -> dict:
+        with self._lock:
+            entries = dict(self._conn.execute("SELECT namespace, COUNT(*) FROM memories GROUP BY namespace"))
+            vacuumed = self._conn.execute("SELECT value FROM maintenance WHERE key = 'vacuumed_at'").fetchone()
+            latencies = sorted(self.query_latencies)
+        stats = {
+            "size_bytes": self.path.stat().st_size if self.path.exists() else 0,
+            "entries": sum(entries.values()),
+            "namespaces": len(entries),
+            "knowledge_entries": entries.get(KNOWLEDGE_NAMESPACE, 0),
+            "queries": self.queries,
+            "query_latency_mean": statistics.fmean(latencies) if latencies else 0.0,
+            "query_latency_p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            "vacuumed_at": vacuumed[0] if vacuumed else None,
+        }
+        if namespace is not None:
+            stats["project_entries"] = entries.get(namespace, 0)
+        return stats
+
+
+def format_stats(stats: dict) -> str:
+    project = f", {stats['project_entries']} for this project" if "project_entries" in stats else ""
+    return (
+        f"memory store: {stats['size_bytes'] / 2 ** 20:.1f}MB, {stats['entries']} entries{project}, "
+        f"{stats['knowledge_entries']} knowledge chunks, {stats['queries']} queries "
+        f"(mean {stats['query_latency_mean'] * 1000:.2f}ms, p95 {stats['query_latency_p95'] * 1000:.2f}ms)"
+    )
+
+
+class MemoryStorage:
+    """crewai storage of the short-term and entity memories of one project.
+
+    Ranked by BM25 rather than embedding similarity, so crewai's
+    ``score_threshold`` doesn't apply.
+    """
+
+    def __init__(self, store: MemoryStore, namespace: str, kind: str, knowledge: bool = False):
+        self.store = store
+        self.namespace = namespace
+        self.kind = kind
+        self.namespaces = [namespace, KNOWLEDGE_NAMESPACE] if knowledge else [namespace]
+
+    def save(self, value, metadata: dict = None):
+        self.store.save(self.namespace, self.kind, str(value), metadata)
+
+    def search(self, query: str, limit: int = 3, filter: dict = None, score_threshold: float = 0.35) -> List[dict]:
+        return self.store.search(self.namespaces, self.kind, query, limit)
+
+    def reset(self):
+        self.store.reset(self.namespace, self.kind)
+
+
+class LongTermMemoryStorage:
+    """crewai storage of the long-term memory of one project: task evaluations by task description"""
+
+    def __init__(self, store: MemoryStore, namespace: str):
+        self.store = store
+        self.namespace = namespace
+
+    def save(self, task_description: str, metadata: dict, datetime: str, score: float):
+        self.store.save(self.namespace, "long_term", task_description,
+                        {"metadata": metadata, "datetime": datetime, "score": score})
+
+    def load(self, task_description: str, latest_n: int) -> Optional[List[dict]]:
+        entries = self.store.latest(self.namespace, "long_term", task_description, latest_n)
+        return [entry["metadata"] for entry in entries] or None
+
+    def reset(self):
+        self.store.reset(self.namespace, "long_term")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=str(DEFAULT_MEMORY_PATH))
+    parser.add_argument("--compact", action="store_true", help="drop expired and least recently used entries")
+    parser.add_argument("--vacuum", action="store_true", help="rebuild the file now")
+    parser.add_argument("--clear", metavar="PROJECT_PATH", help="forget everything about a project")
+    args = parser.parse_args(argv)
+
+    store = MemoryStore(args.path)
+    if args.clear:
+        print(f"removed {store.reset(project_namespace(args.clear))} entries")
+    if args.compact:
+        print(f"removed {store.compact()} entries")
+    if args.vacuum:
+        store.vacuum(force=True)
+    print(format_stats(store.stats()))
+
+
+if __name__ == "__main__":
+    main()
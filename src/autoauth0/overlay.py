@@ -0,0 +1,124 @@
+"""Transactional overlay over the target project's files.
+
+The integration's writes are staged in memory instead of going straight into
+the project, and the read and scan tools see the staged content, so the
+agents work on the integrated tree while the project itself stays untouched.
+Once validation passes, ``commit`` writes the whole batch: every file is first
+written and fsynced to a temporary file next to its target, and only when all
+of them succeeded are they moved into place with ``os.replace``. A failure
+before that leaves the project as it was; ``rollback`` discards the batch.
+
+``branch`` stacks an overlay on top of another one, e.g. for a worker of the
+integration fan-out: it sees its parent's staged content and its own writes
+stay out of the parent until they are merged back.
+"""
+import difflib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class Overlay:
+    def __init__(self, project_path: str, parent: "Overlay" = None):
+        self.root = Path(project_path).resolve()
+        self.parent = parent
+        self._staged: Dict[Path, str] = {}
+        self._lock = threading.Lock()
+
+    def branch(self) -> "Overlay":
+        return Overlay(str(self.root), parent=self)
+
+    def resolve(self, path) -> Path:
+        path = Path(path)
+        return (path if path.is_absolute() else Path.cwd() / path).resolve()
+
+    def write(self, path, content: str):
+        with self._lock:
+            self._staged[self.resolve(path)] = content
+
+    def read_text(self, path) -> str:
+        """Staged content of ``path``, or its content on disk"""
+        with self._lock:
+            staged = self._staged.get(self.resolve(path))
+        if staged is not None:
+            return staged
+        if self.parent is not None:
+            return self.parent.read_text(path)
+        return Path(path).read_text(encoding="utf-8", errors="replace")
+
+    def exists(self, path) -> bool:
+        with self._lock:
+            staged = self.resolve(path) in self._staged
+        if self.parent is not None:
+            return staged or self.parent.exists(path)
+        return staged or Path(path).exists()
+
+    def staged_files(self) -> List[Path]:
+        with self._lock:
+            return sorted(self._staged)
+
+    def staged(self) -> Dict[str, str]:
+        """Staged content per path, e.g. to checkpoint it"""
+        with self._lock:
+            return {str(path): content for path, content in self._staged.items()}
+
+    def display_path(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def diff(self) -> str:
+        """Unified diff of the staged files against the project"""
+        chunks = []
+        for path in self.staged_files():
+            new = self._staged[path]
+            old = path.read_text(encoding="utf-8", errors="replace") if path.exists() else ""
+            if old == new:
+                continue
+            name = self.display_path(path)
+            chunks.append("".join(difflib.unified_diff(
+                old.splitlines(keepends=True),
+                new.splitlines(keepends=True),
+                fromfile=f"a/{name}" if path.exists() else "/dev/null",
+                tofile=f"b/{name}"
+            )))
+        return "\n".join(chunks)
+
+    def commit(self) -> List[str]:
+        """Write every staged file into the project; returns their paths"""
+        with self._lock:
+            staged = dict(self._staged)
+            temp_paths = {}
+            try:
+                for path, content in staged.items():
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+                    temp_paths[path] = temp_path
+                    with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                        temp.write(content)
+                        temp.flush()
+                        os.fsync(temp.fileno())
+                    # mkstemp creates the file private, keep the mode of the file it replaces
+                    os.chmod(temp_path, path.stat().st_mode if path.exists() else 0o644)
+            except BaseException:
+                for temp_path in temp_paths.values():
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                raise
+            for path, temp_path in temp_paths.items():
+                os.replace(temp_path, path)
+            self._staged.clear()
+        return [self.display_path(path) for path in staged]
+
+    def rollback(self):
+        with self._lock:
+            self._staged.clear()
+
+    def load(self, staged: Optional[Dict[str, str]]):
+        """Stage the contents saved by ``staged()``, e.g. when resuming a run"""
+        with self._lock:
+            for path, content in (staged or {}).items():
+                self._staged[Path(path)] = content
@@ -0,0 +1,516 @@
+#!/usr/bin/env python
+"""Dry-run plan of a run: LLM calls, tokens, cost and wall time, without calling an LLM.
+
+The plan pre-scans the project like a run does and builds every task's prompt
+from config/tasks.yaml and config/agents.yaml: the agent's role, goal and
+backstory, the task's description filled with the project index, its expected
+output and the answers of the tasks it depends on. The files an agent is
+expected to read are tokenized from the project itself (outlines for the
+codebase analysis, whole files for the integration and validation), capped by
+the task's ``token_budget``. Each tool call is one more LLM call re-sending
+the growing conversation.
+
+In the dag and parallel modes the integration fans out like a run does: the
+files are grouped by their imports and templates (see ``fanout.py``), each
+group is one worker's agent loop, and the stage takes as long as the workers
+do on ``MAX_WORKERS`` threads.
+
+Wall time follows the mode's schedule (the DAG's critical path, or one task
+after the other in the hierarchical mode) with per-model throughput fitted on
+the previous runs recorded in ``.autoauth0/throughput.jsonl``, or defaults
+until there are enough. Costs use ``MODEL_PRICES``. A project a codemod
+recipe matches takes the fast path and costs nothing.
+
+Usage:
+    python -m autoauth0.planner PROJECT_PATH [--mode dag] [--json]
+"""
+import argparse
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from autoauth0.code_index import MAX_FILE_BYTES, indexable
+from autoauth0.codemod import match_recipe
+from autoauth0.compaction import compact, count_tokens
+from autoauth0.dag import MODES, task_dependencies, topological_order
+from autoauth0.fanout import MAX_WORKERS, FileGroup, plan_file_groups
+from autoauth0.heuristics import scan_paths
+from autoauth0.prescan import SKIP_DIRS, ProjectIndex, scan_project
+
+CONFIG_DIR = Path(__file__).parent / "config"
+DEFAULT_THROUGHPUT_PATH = Path(".autoauth0") / "throughput.jsonl"
+
+# Model of the agents and tasks without a ``model`` key in agents.yaml / tasks.yaml
+DEFAULT_MODEL = "gpt-4"
+
+# USD per million (prompt, completion) tokens, edit when the prices change
+MODEL_PRICES = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+}
+
+# Seconds per LLM call and per completion token until runs have been measured
+DEFAULT_THROUGHPUT = {
+    "gpt-4": (2.0, 0.05),
+    "gpt-4o": (1.0, 0.015),
+    "gpt-4o-mini": (0.8, 0.012),
+}
+
+# Agent of each task and the number of tools it is given, as bound in analysis_crew.py
+TASK_AGENTS = {
+    "analyze_requirements_task": "requirements_analysis_agent",
+    "analyze_codebase_task": "codebase_analysis_agent",
+    "integrate_auth0_task": "auth0_integration_agent",
+    "validate_integration_task": "validation_agent",
+}
+AGENT_TOOLS = {
+    "manager_agent": 2,
+    "requirements_analysis_agent": 2,
+    "codebase_analysis_agent": 4,
+    "auth0_integration_agent": 7,
+    "validation_agent": 3,
+}
+
+# crewai's ReAct scaffolding and one tool's name, description and argument schema
+SYSTEM_PROMPT_TOKENS = 350
+TOOL_PROMPT_TOKENS = 120
+# Thought and Action of a tool call, and the tokens of an average file read observation
+STEP_TOKENS = 120
+READ_TOKENS = 1500
+# A JSON answer is longer than its template once its strings are filled in
+ANSWER_EXPANSION = 2.5
+# Delegation and review calls of the manager per task in the hierarchical mode
+MANAGER_CALLS_PER_TASK = 2
+# Runs of a model needed before its measured throughput replaces the defaults
+MIN_MEASUREMENTS = 3
+
+
+def configured_model(
+    agents_config: dict,
+    tasks_config: dict,
+    agent_name: str,
+    task_name: str = None,
+    escalated: bool = False
+) -> str:
+    """Model ``agent_name`` runs ``task_name`` on; the task's keys take precedence over the agent's"""
+    key = "escalation_model" if escalated else "model"
+    task_config = tasks_config.get(task_name, {}) if task_name is not None else {}
+    model = task_config.get(key) or agents_config[agent_name].get(key)
+    if escalated and model is None:
+        return configured_model(agents_config, tasks_config, agent_name, task_name)
+    return model or DEFAULT_MODEL
+
+
+def llm_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICES.get(model, MODEL_PRICES[DEFAULT_MODEL])
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+class ThroughputStore:
+    """Per-model LLM requests, completion tokens and seconds of past runs, as JSON lines"""
+
+    def __init__(self, path: Path = DEFAULT_THROUGHPUT_PATH, keep: int = 200):
+        self.path = Path(path)
+        self.keep = keep
+
+    def record(self, model_usage: Dict[str, dict]):
+        records = [
+            {"model": model, "timestamp": time.time(), **usage}
+            for model, usage in model_usage.items()
+            if usage.get("llm_requests") and usage.get("seconds")
+        ]
+        if not records:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as store:
+            for record in records:
+                store.write(json.dumps(record) + "\n")
+
+    def measurements(self, model: str) -> List[dict]:
+        if not self.path.exists():
+            return []
+        records = []
+        for line in self.path.read_text().splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("model") == model:
+                records.append(record)
+        return records[-self.keep:]
+
+    def fit(self, model: str) -> Tuple[float, float, bool]:
+        """Seconds per call and per completion token of ``model``, and whether they were measured.
+
+        Least squares of ``seconds = calls * a + completion_tokens * b`` over
+        the recorded runs; the time of the tools the agents call is part of it.
+        """
+        records = self.measurements(model)
+        default = DEFAULT_THROUGHPUT.get(model, DEFAULT_THROUGHPUT[DEFAULT_MODEL])
+        if len(records) < MIN_MEASUREMENTS:
+            return default[0], default[1], False
+        calls = [record["llm_requests"] for record in records]
+        tokens = [record.get("completion_tokens", 0) for record in records]
+        seconds = [record["seconds"] for record in records]
+        scc = sum(c * c for c in calls)
+        sct = sum(c * t for c, t in zip(calls, tokens))
+        stt = sum(t * t for t in tokens)
+        scs = sum(c * s for c, s in zip(calls, seconds))
+        sts = sum(t * s for t, s in zip(tokens, seconds))
+        determinant = scc * stt - sct * sct
+        if determinant > 0:
+            per_call = (scs * stt - sts * sct) / determinant
+            per_token = (sts * scc - scs * sct) / determinant
+            if per_call >= 0 and per_token >= 0:
+                return per_call, per_token, True
+        # Too little variation to tell both apart, everything is per call
+        return sum(seconds) / sum(calls), 0.0, True
+
+
+@dataclass
+class TaskEstimate:
+    task: str
+    agent: str
+    model: str
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    seconds: float
+
+
+@dataclass
+class Plan:
+    project_path: str
+    mode: str
+    # Framework of the codemod recipe when the fast path integrates the project
+    recipe: Optional[str] = None
+    tasks: List[TaskEstimate] = field(default_factory=list)
+    wall_time: float = 0.0
+    project_tokens: int = 0
+    # Workers the integration fans out to, 0 when it runs as a single task
+    file_groups: int = 0
+    # Models whose throughput was measured on previous runs, the others use the defaults
+    measured_models: List[str] = field(default_factory=list)
+
+    @property
+    def llm_calls(self) -> int:
+        return sum(task.llm_calls for task in self.tasks)
+
+    @property
+    def tokens(self) -> int:
+        return sum(task.prompt_tokens + task.completion_tokens for task in self.tasks)
+
+    @property
+    def cost(self) -> float:
+        return sum(task.cost for task in self.tasks)
+
+    def by_agent(self) -> Dict[str, dict]:
+        agents = {}
+        for task in self.tasks:
+            usage = agents.setdefault(task.agent, {
+                "models": [], "llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0
+            })
+            if task.model not in usage["models"]:
+                usage["models"].append(task.model)
+            usage["llm_calls"] += task.llm_calls
+            usage["prompt_tokens"] += task.prompt_tokens
+            usage["completion_tokens"] += task.completion_tokens
+            usage["cost"] += task.cost
+        return agents
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "llm_calls": self.llm_calls,
+            "tokens": self.tokens,
+            "cost": self.cost,
+            "agents": self.by_agent(),
+        }
+
+    def format(self) -> str:
+        lines = [f"Plan for {self.project_path} ({self.mode} mode, {self.project_tokens} tokens of code)"]
+        if self.recipe is not None:
+            lines.append(
+                f"The {self.recipe} codemod recipe matches: the fast path integrates the project without "
+                "any LLM call. Pass --no-fast-path to plan the LLM crew."
+            )
+            return "\n".join(lines)
+        if self.file_groups:
+            lines.append(f"The integration fans out to {self.file_groups} workers, one per group of coupled files.")
+        lines.append(f"{'agent':<30}{'model':<14}{'calls':>6}{'prompt':>10}{'completion':>12}{'cost':>10}")
+        for agent, usage in self.by_agent().items():
+            lines.append(
+                f"{agent:<30}{'/'.join(usage['models']):<14}{usage['llm_calls']:>6}{usage['prompt_tokens']:>10}"
+                f"{usage['completion_tokens']:>12}{'$' + format(usage['cost'], '.2f'):>10}"
+            )
+        lines.append(
+            f"{'total':<44}{self.llm_calls:>6}{sum(t.prompt_tokens for t in self.tasks):>10}"
+            f"{sum(t.completion_tokens for t in self.tasks):>12}{'$' + format(self.cost, '.2f'):>10}"
+        )
+        measured = ", ".join(self.measured_models) or "none, defaults used"
+        lines.append(f"Estimated wall time: {self.wall_time / 60:.1f} min (throughput measured for: {measured})")
+        if self.mode != "hierarchical":
+            lines.append(
+                "Not included: the manager agent, only consulted when validation fails, "
+                "and schema repairs and escalations."
+            )
+        return "\n".join(lines)
+
+
+def _project_files(project_path: str) -> Dict[str, str]:
+    """Text content of the project's files an agent may read, by relative path"""
+    root = Path(project_path)
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            file_path = path.relative_to(root).as_posix()
+            if indexable(file_path) and path.stat().st_size <= MAX_FILE_BYTES:
+                files[file_path] = path.read_text(encoding="utf-8", errors="replace")
+    return files
+
+
+def _knowledge_tokens(knowledge_path: str) -> int:
+    base = Path(knowledge_path)
+    if not base.is_dir():
+        return 0
+    return sum(
+        count_tokens(path.read_text(encoding="utf-8", errors="replace"))
+        for path in base.rglob("*") if path.is_file()
+    )
+
+
+def _file_groups(index: ProjectIndex, points: List[str]) -> List[FileGroup]:
+    """The fan-out's groups of the files, as the codebase analysis would couple them.
+
+    A Python file depends on the files it imports, a template on the
+    entrypoints of its app; dependency and env files stand alone.
+    """
+    infos = {info.file_path: info for info in index.python_files}
+    entrypoints = [info.file_path for info in index.entrypoints]
+    entries = []
+    for file_path in points:
+        path = PurePosixPath(file_path)
+        dependencies = []
+        if file_path in infos:
+            imported = {part for name in infos[file_path].imports for part in name.split(".")}
+            dependencies = [
+                other for other in points
+                if other != file_path and other.endswith(".py") and PurePosixPath(other).stem in imported
+            ]
+        elif file_path in index.templates:
+            app_dir = next((parent.parent for parent in path.parents if parent.name == "templates"), path.parent)
+            dependencies = [entrypoint for entrypoint in entrypoints if PurePosixPath(entrypoint).parent == app_dir]
+        entries.append({"file_path": file_path, "dependencies": dependencies})
+    return plan_file_groups(entries)
+
+
+def _workers_time(seconds: List[float]) -> float:
+    """Wall time of jobs on ``MAX_WORKERS`` threads, each taken by the first free thread"""
+    finished = [0.0] * min(len(seconds), MAX_WORKERS)
+    for duration in seconds:
+        finished[finished.index(min(finished))] += duration
+    return max(finished, default=0.0)
+
+
+def _task_estimate(
+    task_name: str,
+    agent_name: str,
+    model: str,
+    prompt_base: int,
+    file_tokens: int,
+    tool_calls: int,
+    completion_extra: int,
+    answer_tokens: int,
+    throughput: Tuple[float, float, bool]
+) -> TaskEstimate:
+    """One agent loop: every call re-sends the prompt, the observations and the steps so far"""
+    calls = 1 + tool_calls
+    prompt_tokens = calls * prompt_base + file_tokens * calls // 2 + STEP_TOKENS * calls * (calls - 1) // 2
+    completion_tokens = STEP_TOKENS * tool_calls + completion_extra + answer_tokens
+    per_call, per_token, _ = throughput
+    return TaskEstimate(
+        task=task_name,
+        agent=agent_name,
+        model=model,
+        llm_calls=calls,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cost=llm_cost(model, prompt_tokens, completion_tokens),
+        seconds=calls * per_call + completion_tokens * per_token
+    )
+
+
+def plan_run(
+    project_path: str,
+    mode: str = "hierarchical",
+    fast_path: bool = True,
+    model_override: str = None,
+    knowledge_path: str = "knowledge",
+    throughput_store: ThroughputStore = None,
+    fan_out: bool = True
+) -> Plan:
+    throughput_store = throughput_store or ThroughputStore()
+    agents_config = yaml.safe_load((CONFIG_DIR / "agents.yaml").read_text())
+    tasks_config = yaml.safe_load((CONFIG_DIR / "tasks.yaml").read_text())
+    index = scan_project(project_path)
+    files = _project_files(project_path)
+    plan = Plan(
+        project_path=project_path,
+        mode=mode,
+        project_tokens=sum(count_tokens(content) for content in files.values())
+    )
+    if fast_path and match_recipe(index) is not None:
+        plan.recipe = index.framework
+        return plan
+
+    # The files an integration is expected to touch, and how much of them each task reads
+    points = [file_path for file_path in index.integration_points() if file_path in files]
+    full_tokens = sum(count_tokens(files[file_path]) for file_path in points)
+    outline_tokens = sum(count_tokens(compact(file_path, files[file_path])) for file_path in points)
+    reads = {
+        "analyze_requirements_task": _knowledge_tokens(knowledge_path),
+        "analyze_codebase_task": outline_tokens,
+        "integrate_auth0_task": full_tokens,
+        "validate_integration_task": full_tokens,
+    }
+    inputs = {
+        "project_path": project_path,
+        "project_index": index.to_context(),
+        "changed_files": "All files of the project.",
+        "heuristic_report": scan_paths(project_path).to_context(),
+    }
+
+    dependencies = task_dependencies(tasks_config)
+    answers = {
+        name: int(count_tokens(config.get("expected_output") or "") * ANSWER_EXPANSION)
+        for name, config in tasks_config.items()
+    }
+    fits = {}
+
+    def prompt_base(task_name: str, agent_name: str, context_tokens: int) -> int:
+        config = tasks_config[task_name]
+        agent_config = agents_config[agent_name]
+        description = config["description"]
+        return (
+            SYSTEM_PROMPT_TOKENS
+            + TOOL_PROMPT_TOKENS * AGENT_TOOLS[agent_name]
+            + count_tokens(" ".join(str(agent_config.get(key, "")) for key in ("role", "goal", "backstory")))
+            + count_tokens(description)
+            + sum(count_tokens(value) for key, value in inputs.items() if "{" + key + "}" in description)
+            + count_tokens(config.get("expected_output") or "")
+            + context_tokens
+        )
+
+    def model_of(agent_name: str, task_name: str) -> str:
+        model = model_override or configured_model(agents_config, tasks_config, agent_name, task_name)
+        fits.setdefault(model, throughput_store.fit(model))
+        return model
+
+    def integration_estimate(task_name: str, touched: List[str], context_tokens: int) -> TaskEstimate:
+        agent_name = "auth0_integration_agent"
+        model = model_of(agent_name, task_name)
+        tokens = sum(count_tokens(files[file_path]) for file_path in touched)
+        # The fan-out's workers share the integration agent's budget
+        budget = tasks_config["integrate_auth0_task"].get("token_budget")
+        file_tokens = min(tokens, budget) if budget else tokens
+        # Reads, and every touched file written back whole
+        tool_calls = math.ceil(file_tokens / READ_TOKENS) + len(touched)
+        return _task_estimate(
+            task_name, agent_name, model, prompt_base(task_name, agent_name, context_tokens), file_tokens,
+            tool_calls, tokens, answers["integrate_auth0_task"], fits[model]
+        )
+
+    estimates = {}
+    for task_name in topological_order(dependencies):
+        context_tokens = sum(answers[dep] for dep in dependencies[task_name])
+        if task_name == "integrate_auth0_task":
+            estimates[task_name] = integration_estimate(task_name, points, context_tokens)
+            continue
+        agent_name = TASK_AGENTS[task_name]
+        model = model_of(agent_name, task_name)
+        budget = tasks_config[task_name].get("token_budget")
+        file_tokens = min(reads[task_name], budget) if budget else reads[task_name]
+        estimates[task_name] = _task_estimate(
+            task_name, agent_name, model, prompt_base(task_name, agent_name, context_tokens), file_tokens,
+            math.ceil(file_tokens / READ_TOKENS), 0, answers[task_name], fits[model]
+        )
+    durations = {task_name: estimate.seconds for task_name, estimate in estimates.items()}
+
+    groups = _file_groups(index, points) if fan_out and mode != "hierarchical" else []
+    workers = []
+    if len(groups) >= 2:
+        # Like a run: one worker per group, with the requirements analysis and its group's share
+        # of the codebase analysis as context, instead of the single integration task
+        plan.file_groups = len(groups)
+        for group in groups:
+            context_tokens = (
+                answers["analyze_requirements_task"]
+                + answers["analyze_codebase_task"] * len(group.files) // max(len(points), 1)
+            )
+            estimate = integration_estimate("integrate_file_group_task", group.files, context_tokens)
+            estimate.task = f"integrate_file_group_task[{group.index}]"
+            workers.append(estimate)
+        del estimates["integrate_auth0_task"]
+        durations["integrate_auth0_task"] = _workers_time([worker.seconds for worker in workers])
+    plan.tasks = list(estimates.values()) + workers
+
+    if mode == "hierarchical":
+        model = model_override or configured_model(agents_config, tasks_config, "manager_agent")
+        fits.setdefault(model, throughput_store.fit(model))
+        manager_config = agents_config["manager_agent"]
+        prompt_base = (
+            SYSTEM_PROMPT_TOKENS
+            + TOOL_PROMPT_TOKENS * AGENT_TOOLS["manager_agent"]
+            + count_tokens(" ".join(str(manager_config.get(key, "")) for key in ("role", "goal", "backstory")))
+            + sum(count_tokens(tasks_config[name]["description"]) for name in estimates)
+        )
+        calls = MANAGER_CALLS_PER_TASK * len(estimates)
+        # The manager reads every answer it reviews
+        manager = _task_estimate(
+            "manage", "manager_agent", model, prompt_base, sum(answers[name] for name in estimates),
+            calls - 1, 0, STEP_TOKENS, fits[model]
+        )
+        plan.tasks.append(manager)
+        plan.wall_time = sum(task.seconds for task in plan.tasks)
+    else:
+        finished = {}
+        for task_name in topological_order(dependencies):
+            start = max((finished[dep] for dep in dependencies[task_name]), default=0.0)
+            finished[task_name] = start + durations[task_name]
+        plan.wall_time = max(finished.values(), default=0.0)
+    plan.measured_models = sorted(model for model, fit in fits.items() if fit[2])
+    return plan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("project_path")
+    parser.add_argument("--mode", choices=MODES, default="hierarchical")
+    parser.add_argument("--no-fast-path", action="store_true", help="plan the LLM crew even if a recipe matches")
+    parser.add_argument("--model", metavar="MODEL", help="plan every agent and task on MODEL")
+    parser.add_argument("--no-fan-out", action="store_true", help="plan the integration as a single task")
+    parser.add_argument("--json", action="store_true", help="print the plan as JSON")
+    args = parser.parse_args(argv)
+
+    plan = plan_run(
+        args.project_path,
+        args.mode,
+        fast_path=not args.no_fast_path,
+        model_override=args.model,
+        fan_out=not args.no_fan_out
+    )
+    print(json.dumps(plan.to_dict(), indent=2) if args.json else plan.format())
+
+
+if __name__ == "__main__":
+    main()
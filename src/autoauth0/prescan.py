@@ -0,0 +1,269 @@
+"""Deterministic pre-scan of a target project.
+
+Walks the project once before the crew starts and builds a compact index of
+candidate Auth0 integration points, so the analysis agents don't have to crawl
+the tree with one LLM round-trip per ``DirectoryReadTool``/``FileReadTool`` call.
+"""
+import ast
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+# Directories that never contain integration points
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv",
+    "env", ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "dist", "build", ".idea", ".vscode",
+}
+TEMPLATE_SUFFIXES = {".html", ".htm", ".jinja", ".jinja2", ".j2"}
+REQUIREMENTS_FILES = {"requirements.txt", "pyproject.toml", "setup.py", "setup.cfg", "Pipfile"}
+ENV_FILES = {".env", ".env.example", ".env.sample", ".env.template"}
+ROUTE_DECORATORS = {"route", "get", "post", "put", "delete", "patch", "api_route"}
+
+
+@dataclass
+class Route:
+    path: str
+    function: str
+    line: int
+    methods: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PythonFileInfo:
+    """Auth-relevant facts extracted from a single Python file."""
+    file_path: str
+    imports: List[str] = field(default_factory=list)
+    app_objects: List[str] = field(default_factory=list)
+    routes: List[Route] = field(default_factory=list)
+    uses_oauth: bool = False
+    uses_dotenv: bool = False
+    uses_session: bool = False
+    sets_secret_key: bool = False
+    env_vars: List[str] = field(default_factory=list)
+    has_main_guard: bool = False
+    parse_error: Optional[str] = None
+
+    @property
+    def is_entrypoint(self) -> bool:
+        return bool(self.app_objects or self.routes)
+
+
+@dataclass
+class ProjectIndex:
+    """Compact, serializable summary of a target project."""
+    project_path: str
+    framework: str = "unknown"
+    file_count: int = 0
+    python_files: List[PythonFileInfo] = field(default_factory=list)
+    templates: List[str] = field(default_factory=list)
+    requirements_files: List[str] = field(default_factory=list)
+    env_files: List[str] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
+    has_auth0: bool = False
+
+    @property
+    def entrypoints(self) -> List[PythonFileInfo]:
+        return [info for info in self.python_files if info.is_entrypoint]
+
+    def integration_points(self) -> List[str]:
+        """Files an Auth0 integration is expected to touch, most important first."""
+        points = [info.file_path for info in self.entrypoints]
+        points += self.templates + self.requirements_files + self.env_files
+        return points
+
+    def to_dict(self) -> dict:
+        """Only the parts of the index that are useful to the agents."""
+        return {
+            "project_path": self.project_path,
+            "framework": self.framework,
+            "file_count": self.file_count,
+            "has_auth0": self.has_auth0,
+            "entrypoints": [
+                {
+                    "file_path": info.file_path,
+                    "app_objects": info.app_objects,
+                    "routes": [asdict(route) for route in info.routes],
+                    "uses_oauth": info.uses_oauth,
+                    "uses_dotenv": info.uses_dotenv,
+                    "uses_session": info.uses_session,
+                    "sets_secret_key": info.sets_secret_key,
+                    "env_vars": info.env_vars,
+                    "has_main_guard": info.has_main_guard,
+                }
+                for info in self.entrypoints
+            ],
+            "templates": self.templates,
+            "requirements_files": self.requirements_files,
+            "env_files": self.env_files,
+            "dependencies": self.dependencies,
+            "integration_points": self.integration_points(),
+        }
+
+    def to_context(self) -> str:
+        """Render the index as compact JSON to hand to the agents."""
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+
+def _dotted_name(node: ast.AST) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{_dotted_name(node.value)}.{node.attr}"
+    if isinstance(node, ast.Call):
+        return _dotted_name(node.func)
+    return ""
+
+
+def _literal_strings(node: ast.AST) -> List[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [elt.value for elt in node.elts if isinstance(elt, ast.Constant) and isinstance(elt.value, str)]
+    return []
+
+
+class _PythonFileVisitor(ast.NodeVisitor):
+    def __init__(self, info: PythonFileInfo):
+        self.info = info
+
+    def visit_Import(self, node: ast.Import):
+        self.info.imports.extend(alias.name for alias in node.names)
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ""
+        self.info.imports.extend(f"{module}.{alias.name}" for alias in node.names)
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign):
+        value = _dotted_name(node.value) if isinstance(node.value, ast.Call) else ""
+        for target in node.targets:
+            name = _dotted_name(target)
+            if value.split(".")[-1] in ("Flask", "FastAPI", "Quart", "Starlette"):
+                self.info.app_objects.append(name)
+            if name.endswith(".secret_key") or name.endswith("SECRET_KEY"):
+                self.info.sets_secret_key = True
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        name = _dotted_name(node.func)
+        leaf = name.split(".")[-1]
+        if leaf == "OAuth" or name.endswith("oauth.register"):
+            self.info.uses_oauth = True
+        elif leaf in ("load_dotenv", "find_dotenv"):
+            self.info.uses_dotenv = True
+        elif leaf in ("get", "getenv") and name.split(".")[0] in ("env", "environ", "os"):
+            for arg in node.args[:1]:
+                self.info.env_vars.extend(_literal_strings(arg))
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node: ast.Subscript):
+        if _dotted_name(node.value) in ("os.environ", "environ", "env"):
+            self.info.env_vars.extend(_literal_strings(node.slice))
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name):
+        if node.id == "session":
+            self.info.uses_session = True
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call):
+                continue
+            name = _dotted_name(decorator.func)
+            if name.split(".")[-1] not in ROUTE_DECORATORS or not decorator.args:
+                continue
+            paths = _literal_strings(decorator.args[0])
+            methods = []
+            for keyword in decorator.keywords:
+                if keyword.arg == "methods":
+                    methods = _literal_strings(keyword.value)
+            if not methods and name.split(".")[-1] not in ("route", "api_route"):
+                methods = [name.split(".")[-1].upper()]
+            for path in paths:
+                self.info.routes.append(Route(path=path, function=node.name, line=node.lineno, methods=methods))
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_If(self, node: ast.If):
+        test = node.test
+        if (
+            isinstance(test, ast.Compare)
+            and isinstance(test.left, ast.Name)
+            and test.left.id == "__name__"
+        ):
+            self.info.has_main_guard = True
+        self.generic_visit(node)
+
+
+def scan_python_file(path: Path, rel_path: str) -> PythonFileInfo:
+    info = PythonFileInfo(file_path=rel_path)
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8", errors="replace"), filename=rel_path)
+    except SyntaxError as e:
+        info.parse_error = str(e)
+        return info
+    _PythonFileVisitor(info).visit(tree)
+    info.env_vars = sorted(set(info.env_vars))
+    return info
+
+
+def _detect_framework(index: ProjectIndex) -> str:
+    imports = {name.split(".")[0] for info in index.python_files for name in info.imports}
+    for framework in ("flask", "fastapi", "django", "quart", "starlette"):
+        if framework in imports:
+            return framework
+    deps = {dep.lower() for dep in index.dependencies}
+    for framework in ("flask", "fastapi", "django"):
+        if framework in deps:
+            return framework
+    return "unknown"
+
+
+def _read_dependencies(path: Path) -> List[str]:
+    if path.name != "requirements.txt":
+        return []
+    deps = []
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+        for sep in ("[", "=", ">", "<", "~", "!", ";", " "):
+            line = line.split(sep, 1)[0]
+        deps.append(line)
+    return deps
+
+
+def scan_project(project_path: str) -> ProjectIndex:
+    """Walk ``project_path`` once and build a ``ProjectIndex``."""
+    root = Path(project_path)
+    index = ProjectIndex(project_path=str(root))
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            rel_path = path.relative_to(root).as_posix()
+            index.file_count += 1
+            if path.suffix == ".py":
+                index.python_files.append(scan_python_file(path, rel_path))
+            elif path.suffix in TEMPLATE_SUFFIXES:
+                index.templates.append(rel_path)
+            elif filename in REQUIREMENTS_FILES:
+                index.requirements_files.append(rel_path)
+                index.dependencies.extend(_read_dependencies(path))
+            elif filename in ENV_FILES:
+                index.env_files.append(rel_path)
+            # setup.py is both a Python file and a requirements file
+            if filename == "setup.py":
+                index.requirements_files.append(rel_path)
+    index.dependencies = sorted(set(index.dependencies))
+    index.framework = _detect_framework(index)
+    index.has_auth0 = any(
+        info.uses_oauth or any("AUTH0" in var for var in info.env_vars)
+        for info in index.python_files
+    )
+    return index
@@ -0,0 +1,48 @@
+"""Instances built once and shared, keyed by the configuration they were built with.
+
+``REGISTRY`` is process-wide and holds what any run can share: the Auth0
+documentation store, the memory store and the chroma client of the code index.
+A batch of projects then opens them once instead of once per project. Everything tied to a run stays out of it:
+the LLM clients, which carry the run's response cache, rate limiter and tracer,
+and the tools, which are instrumented with the run's tracer and charge the
+run's token ledger. Those go in the per-crew ``Registry`` of
+``CodebaseAnalysisCrew``, shared by the crew's agents and tasks only.
+"""
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Registry:
+    def __init__(self):
+        self._instances: Dict[Tuple[str, Hashable], Any] = {}
+        # A factory may get its own dependencies from the registry
+        self._lock = threading.RLock()
+        self.builds = Counter()
+        self.hits = Counter()
+
+    def get(self, kind: str, key: Hashable, factory: Callable[[], T]) -> T:
+        """The ``kind`` instance built for ``key``, built with ``factory()`` on first use"""
+        with self._lock:
+            if (kind, key) in self._instances:
+                self.hits[kind] += 1
+            else:
+                self._instances[(kind, key)] = factory()
+                self.builds[kind] += 1
+            return self._instances[(kind, key)]
+
+    def clear(self):
+        with self._lock:
+            self._instances.clear()
+            self.builds.clear()
+            self.hits.clear()
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {kind: {"builds": self.builds[kind], "hits": self.hits[kind]} for kind in self.builds}
+
+
+REGISTRY = Registry()
+
@@ -0,0 +1,97 @@
+"""Pydantic models compiled from the JSON templates of the tasks' ``expected_output``.
+
+The ``expected_output`` blocks of ``config/tasks.yaml`` are JSON templates
+whose leaves name the type of the value: ``"string"``, ``"number"`` or
+``"boolean"``; a list holds the template of its items. Each template is
+compiled into a Pydantic model, and a task's answer is validated against it
+before any downstream task sees it. Every key of the template is required,
+keys it doesn't list are kept, and a null leaf is allowed: agents report
+unknown values as null.
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, ConfigDict, ValidationError, create_model
+
+from autoauth0.incremental import extract_json
+
+LEAF_TYPES = {
+    "string": str,
+    "number": Union[int, float],
+    "boolean": bool,
+}
+
+
+class SchemaValidationError(ValueError):
+    """A task's answer still doesn't match its expected output after the repair and escalation retries"""
+
+    def __init__(self, task_name: str, errors: List[str]):
+        super().__init__(f"{task_name} doesn't match its expected output: {'; '.join(errors[:10])}")
+        self.task_name = task_name
+        self.errors = errors
+
+
+def expected_schema(expected_output: str) -> Optional[Any]:
+    """The JSON template of ``expected_output``, None if it is free text"""
+    try:
+        return json.loads(expected_output)
+    except (TypeError, json.JSONDecodeError):
+        return None
+
+
+def _model_name(*parts: str) -> str:
+    return "".join(part.title() for part in re.split(r"[^0-9A-Za-z]+", "_".join(parts)) if part)
+
+
+def _annotation(template: Any, name: str):
+    if isinstance(template, dict):
+        return Optional[_compile(template, name)]
+    if isinstance(template, list):
+        item = _annotation(template[0], f"{name}_item") if template else Any
+        return Optional[List[item]]
+    leaf = LEAF_TYPES.get(template)
+    # Other leaves are examples or descriptions rather than types
+    return Optional[leaf] if leaf is not None else Any
+
+
+def _compile(template: dict, name: str) -> Type[BaseModel]:
+    fields = {key: (_annotation(value, f"{name}_{key}"), ...) for key, value in template.items()}
+    return create_model(
+        _model_name(name),
+        __config__=ConfigDict(extra="allow", protected_namespaces=()),
+        **fields
+    )
+
+
+@lru_cache(maxsize=None)
+def output_model(task_name: str, expected_output: str) -> Optional[Type[BaseModel]]:
+    """Model of the answer of ``task_name``, None if its ``expected_output`` isn't a JSON object template"""
+    template = expected_schema(expected_output)
+    if not isinstance(template, dict):
+        return None
+    return _compile(template, task_name.removesuffix("_task") + "_output")
+
+
+def _path(loc: tuple) -> str:
+    return "$" + "".join(f"[{part}]" if isinstance(part, int) else f".{part}" for part in loc)
+
+
+def parse_output(raw: str, model: Type[BaseModel]) -> Tuple[Optional[BaseModel], List[str]]:
+    """The answer ``raw`` as an instance of ``model``, or None and the mismatches"""
+    answer = extract_json(raw)
+    if answer is None:
+        return None, ["$: the answer is not a JSON object"]
+    try:
+        return model.model_validate(answer), []
+    except ValidationError as e:
+        return None, [f"{_path(error['loc'])}: {error['msg'].lower()}" for error in e.errors()]
+
+
+def validate_output(raw: str, expected_output: str, task_name: str = "task") -> List[str]:
+    """Mismatches of the answer ``raw`` with the template of ``expected_output``, empty when it matches"""
+    model = output_model(task_name, expected_output)
+    if model is None:
+        return []
+    return parse_output(raw, model)[1]
@@ -0,0 +1,24 @@
+from crewai.tools import BaseTool
+from typing import Any, Type
+from pydantic import BaseModel, Field
+
+
+class Auth0DocsLookupToolInput(BaseModel):
+    """Input schema for Auth0DocsLookupTool."""
+    query: str = Field(..., description="What to look up, e.g. 'flask authlib oauth register'.")
+
+class Auth0DocsLookupTool(BaseTool):
+    name: str = "Look up Auth0 documentation"
+    description: str = (
+        "Searches the local store of Auth0 quickstart and SDK documentation and returns the best matching "
+        "snippets with their source URL. Fast and free: use it before searching or scraping the web."
+    )
+    args_schema: Type[BaseModel] = Auth0DocsLookupToolInput
+    store: Any = None
+
+    def _run(self, query: str) -> str:
+        chunks = self.store.lookup(query)
+        if not chunks:
+            return "No local documentation matches this query, search the web instead."
+        return "\n\n---\n\n".join(f"Source: {chunk['url']}\n{chunk['content']}" for chunk in chunks)
+
@@ -0,0 +1,44 @@
+from crewai.tools import BaseTool
+from pathlib import Path
+from typing import Any, Type
+from pydantic import BaseModel, Field
+
+from autoauth0.compaction import count_tokens
+
+
+class CodeSearchToolInput(BaseModel):
+    """Input schema for CodeSearchTool."""
+    query: str = Field(..., description="What to look for, e.g. 'where are routes defined' or 'session configuration'.")
+    k: int = Field(5, description="Number of code chunks to return.")
+
+class CodeSearchTool(BaseTool):
+    name: str = "Search the codebase"
+    description: str = (
+        "Semantic search over the project's code, chunked per function and class. Returns the best matching "
+        "chunks with their file and line range. Use it to find where something is done in a large project "
+        "instead of reading files one at a time."
+    )
+    args_schema: Type[BaseModel] = CodeSearchToolInput
+    index: Any = None
+    ledger: Any = None
+    owner: str = "agent"
+
+    def _run(self, query: str, k: int = 5) -> str:
+        # The index is brought up to date on the first search of the run, runs that never search don't embed
+        self.index.ensure_updated()
+        chunks = self.index.query(query, k)
+        if not chunks:
+            return "The code index is empty, list and read the project's files instead."
+        text = "\n\n".join(
+            f"{chunk['file_path']}:{chunk['start_line']}-{chunk['end_line']} ({chunk['name']})\n{chunk['code']}"
+            for chunk in chunks
+        )
+        if self.ledger is None:
+            return text
+        # What reading the matching files whole would have cost
+        full_tokens = sum(
+            count_tokens((Path(self.index.project_path) / file_path).read_text(encoding="utf-8", errors="replace"))
+            for file_path in {chunk['file_path'] for chunk in chunks}
+            if (Path(self.index.project_path) / file_path).exists()
+        )
+        return self.ledger.charge(self.owner, text, full_tokens=full_tokens)
@@ -0,0 +1,53 @@
+from crewai.tools import BaseTool
+from pathlib import Path
+from typing import Any, Optional, Type
+from pydantic import BaseModel, Field
+
+from autoauth0.compaction import compact, count_tokens
+
+
+class CompactFileReadToolInput(BaseModel):
+    """Input schema for CompactFileReadTool."""
+    file_path: str = Field(..., description="Path of the file to read.")
+    full: bool = Field(False, description="Return the whole file instead of its outline.")
+    start_line: Optional[int] = Field(None, description="First line to return (1-based), implies full content.")
+    end_line: Optional[int] = Field(None, description="Last line to return (inclusive).")
+
+class CompactFileReadTool(BaseTool):
+    name: str = "Read a file's content"
+    description: str = (
+        "Reads a file. Large files are returned as an outline (imports, decorators, class and function "
+        "signatures with line numbers); pass full=true, or start_line/end_line, to read the code you need."
+    )
+    args_schema: Type[BaseModel] = CompactFileReadToolInput
+    ledger: Any = None
+    owner: str = "agent"
+    # Staged writes are read from the overlay when the integration is transactional
+    overlay: Any = None
+
+    def _run(
+        self,
+        file_path: str,
+        full: bool = False,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None
+    ) -> str:
+        try:
+            if self.overlay is not None:
+                content = self.overlay.read_text(file_path)
+            else:
+                content = Path(file_path).read_text(encoding="utf-8", errors="replace")
+        except OSError as e:
+            return f"Error reading {file_path}: {e}"
+        if start_line is not None or end_line is not None:
+            lines = content.splitlines()
+            first = max(1, start_line or 1)
+            last = min(len(lines), end_line or len(lines))
+            text = "\n".join(f"{number}: {lines[number - 1]}" for number in range(first, last + 1))
+        elif full:
+            text = content
+        else:
+            text = compact(file_path, content)
+        if self.ledger is None:
+            return text
+        return self.ledger.charge(self.owner, text, full_tokens=count_tokens(content))
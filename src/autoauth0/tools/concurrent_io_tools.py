@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import re
+from crewai.tools import BaseTool
+from typing import Any, List, Type
+from pydantic import BaseModel, Field
+
+from autoauth0.docstore import offline
+from autoauth0.http_pool import shared_client
+
+SERPER_URL = "https://google.serper.dev/search"
+
+
+class ConcurrentSearchToolInput(BaseModel):
+    """Input schema for ConcurrentSearchTool."""
+    queries: List[str] = Field(..., description="One or more web search queries, run concurrently.")
+
+class ConcurrentSearchTool(BaseTool):
+    """Serper web search over the pooled HTTP client, answering repeated queries from the local store."""
+    name: str = "Search the web"
+    description: str = (
+        "Searches the web for each of the given queries at once and returns the top results per query. "
+        "Pass every query you need in a single call."
+    )
+    args_schema: Type[BaseModel] = ConcurrentSearchToolInput
+    store: Any = None
+    n_results: int = 5
+
+    async def _search(self, query: str) -> Any:
+        cached = self.store.get_search(query) if self.store is not None else None
+        if cached is not None:
+            return json.loads(cached)
+        if offline():
+            return {"offline": True, "local_documentation": self.store.lookup(query) if self.store else []}
+        response = await shared_client().request(
+            "POST",
+            SERPER_URL,
+            json={"q": query, "num": self.n_results},
+            headers={"X-API-KEY": os.environ["SERPER_API_KEY"]}
+        )
+        response.raise_for_status()
+        results = [
+            {"title": result.get("title"), "link": result.get("link"), "snippet": result.get("snippet")}
+            for result in response.json().get("organic", [])[:self.n_results]
+        ]
+        if self.store is not None:
+            self.store.put_search(query, json.dumps(results))
+        return results
+
+    async def _arun(self, queries: List[str]) -> str:
+        results = await shared_client().gather(self._search(query) for query in queries)
+        return json.dumps({
+            query: f"Search failed: {result}" if isinstance(result, Exception) else result
+            for query, result in zip(queries, results)
+        }, indent=2)
+
+    def _run(self, queries: List[str]) -> str:
+        return shared_client().run(self._arun(queries))
+
+
+class ConcurrentScrapeToolInput(BaseModel):
+    """Input schema for ConcurrentScrapeTool."""
+    urls: List[str] = Field(..., description="One or more page URLs to read, fetched concurrently.")
+
+class ConcurrentScrapeTool(BaseTool):
+    """Page scraper over the pooled HTTP client, serving pages from the local store until their TTL expires."""
+    name: str = "Read web pages"
+    description: str = (
+        "Fetches each of the given URLs at once and returns their text content. "
+        "Pass every page you need in a single call."
+    )
+    args_schema: Type[BaseModel] = ConcurrentScrapeToolInput
+    store: Any = None
+
+    async def _scrape(self, url: str) -> str:
+        cached = self.store.get_page(url) if self.store is not None else None
+        if cached is not None:
+            return cached
+        if offline():
+            return f"{url} is not in the local documentation store and the network is disabled."
+        response = await shared_client().request("GET", url)
+        response.raise_for_status()
+        # Parsing is CPU bound, keep it off the I/O loop
+        content = await asyncio.to_thread(_html_text, response.text)
+        if self.store is not None:
+            self.store.put_page(url, content)
+        return content
+
+    async def _arun(self, urls: List[str]) -> str:
+        pages = await shared_client().gather(self._scrape(url) for url in urls)
+        return "\n\n---\n\n".join(
+            f"Source: {url}\n" + (f"Failed to fetch: {page}" if isinstance(page, Exception) else page)
+            for url, page in zip(urls, pages)
+        )
+
+    def _run(self, urls: List[str]) -> str:
+        return shared_client().run(self._arun(urls))
+
+
+def _html_text(html: str) -> str:
+    # Same extraction as crewai_tools' ScrapeWebsiteTool
+    from bs4 import BeautifulSoup
+
+    text = BeautifulSoup(html, "html.parser").get_text(" ")
+    text = re.sub("[ \t]+", " ", text)
+    return re.sub("\\s+\n\\s+", "\n", text)
+
+
+class ConcurrentFileReadToolInput(BaseModel):
+    """Input schema for ConcurrentFileReadTool."""
+    file_paths: List[str] = Field(..., description="Paths of the files to read.")
+
+class ConcurrentFileReadTool(BaseTool):
+    """Reads several files at once through a ``CompactFileReadTool``, sharing its token budget."""
+    name: str = "Read several files"
+    description: str = (
+        "Reads each of the given files at once and returns their outlines (imports, decorators, class and "
+        "function signatures with line numbers). Use 'Read a file's content' for the full code of one file."
+    )
+    args_schema: Type[BaseModel] = ConcurrentFileReadToolInput
+    reader: Any = None
+
+    async def _arun(self, file_paths: List[str]) -> str:
+        contents = await asyncio.gather(*(asyncio.to_thread(self.reader._run, path) for path in file_paths))
+        return "\n\n".join(f"=== {path} ===\n{content}" for path, content in zip(file_paths, contents))
+
+    def _run(self, file_paths: List[str]) -> str:
+        return shared_client().run(self._arun(file_paths))
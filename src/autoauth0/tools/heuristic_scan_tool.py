@@ -0,0 +1,27 @@
+from crewai.tools import BaseTool
+from typing import Any, List, Optional, Type
+from pydantic import BaseModel, Field
+
+from autoauth0.heuristics import scan_paths
+
+
+class HeuristicScanToolInput(BaseModel):
+    """Input schema for HeuristicScanTool."""
+    project_path: str = Field(..., description="Path of the project directory to scan.")
+    files: Optional[List[str]] = Field(
+        None,
+        description="Files to scan, relative to the project directory. Scans every Python file when omitted."
+    )
+
+class HeuristicScanTool(BaseTool):
+    name: str = "Heuristic Security Scanner"
+    description: str = (
+        "Scans Python files for common Auth0 integration pitfalls (hardcoded credentials, missing CSRF protection, "
+        "secret key from an unset environment variable, unvalidated redirect_uri, full tokens stored in the session, "
+        "missing logging) and returns a validation report. Only the files listed in files_to_review need a manual review."
+    )
+    args_schema: Type[BaseModel] = HeuristicScanToolInput
+    overlay: Any = None
+
+    def _run(self, project_path: str, files: Optional[List[str]] = None) -> str:
+        return scan_paths(project_path, files, overlay=self.overlay).to_context()
@@ -0,0 +1,30 @@
+import os
+from crewai.tools import BaseTool
+from typing import Any, Optional, Type
+from pydantic import BaseModel, Field
+
+
+class OverlayFileWriterToolInput(BaseModel):
+    """Input schema for OverlayFileWriterTool."""
+    filename: str = Field(..., description="Name of the file to write.")
+    directory: Optional[str] = Field("./", description="Directory of the file.")
+    overwrite: bool = Field(False, description="Replace the file if it already exists.")
+    content: str = Field(..., description="Full content of the file.")
+
+class OverlayFileWriterTool(BaseTool):
+    """Drop-in for crewai_tools' FileWriterTool staging the writes in an ``overlay.Overlay``."""
+    name: str = "File Writer Tool"
+    description: str = (
+        "A tool to write content to a specified file. Accepts filename, content, and optionally a directory "
+        "path and overwrite flag as input."
+    )
+    args_schema: Type[BaseModel] = OverlayFileWriterToolInput
+    overlay: Any = None
+
+    def _run(self, filename: str, content: str, directory: Optional[str] = "./", overwrite: bool = False) -> str:
+        file_path = os.path.join(directory or "", filename)
+        if self.overlay.exists(file_path) and not overwrite:
+            return f"File {file_path} already exists and overwrite option was not passed."
+        self.overlay.write(file_path, content)
+        # Reads and scans already see the new content, the project gets it once validation passes
+        return f"Content successfully written to {file_path}"